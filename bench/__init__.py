@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Module: bench
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+# Offline benchmarks for the PenguinSurf addons. The fake Kodi modules in
+# bench/fakekodi stand in for xbmc, xbmcgui, xbmcplugin, xbmcaddon and
+# xbmcvfs, so the plugins can be driven from a plain Python interpreter:
+#
+#     python -m bench.startup     cold-start imports and time-to-endOfDirectory
+#     python -m bench.suite       per-action latency, requests and allocations
+#     python -m bench.catalogue   TMDB ID export ingestion speed and memory
+#     python -m bench.epg         XMLTV guide import and now/next, grid queries
+#     python -m bench.installer   setup wizard install, cancel and Range resume
+#     python -m bench.probe       Archive.org derivative probing on throttled files
+#     python -m bench.nextepisode next-episode pre-resolution during playback
+#     python -m bench.snapshot    directory snapshot replay against rebuilding
+#     python -m bench.memory      peak memory per action under the memory budget
+#
+# bench/standin.py serves canned TMDB and Archive.org responses locally.
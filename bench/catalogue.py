@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Module: catalogue
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Ingestion benchmark for the TMDB daily ID export importer.
+
+Writes synthetic gzipped JSON-lines exports of growing size, imports each
+into a fresh CatalogueStore and reports rows/s and the peak traced
+allocations. The peak should stay flat as the export grows.
+
+    python -m bench.catalogue [--rows N ...] [--batch-size N]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench import harness
+
+
+def write_export(path, rows):
+    """Writes a synthetic movie_ids export with `rows` lines."""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for item_id in range(1, rows + 1):
+            f.write(json.dumps({
+                "adult": item_id % 50 == 0,
+                "id": item_id,
+                "original_title": "Public Domain Movie {0}".format(item_id),
+                "popularity": (item_id * 7919) % 1000 / 10.0,
+                "video": False,
+            }))
+            f.write('\n')
+
+
+def run(rows, batch_size):
+    from script.module.scrapepenguin.lib.catalogue import CatalogueStore
+    directory = tempfile.mkdtemp(prefix='catalogue-bench-')
+    export = os.path.join(directory, 'movie_ids.json.gz')
+    write_export(export, rows)
+    store = CatalogueStore(os.path.join(directory, 'catalogue.db'))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = store.import_file(export, 'movie', batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    store.close()
+    return {'rows': count, 'seconds': elapsed, 'rows_per_s': count / elapsed if elapsed else 0,
+            'peak_kib': peak / 1024.0, 'export_kib': os.path.getsize(export) / 1024.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 300000])
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    harness.install(tempfile.mkdtemp(prefix='catalogue-profile-'))
+    print('{0:>10} {1:>11} {2:>9} {3:>12} {4:>10}'.format('rows', 'export KiB', 'seconds', 'rows/s', 'peak KiB'))
+    for rows in args.rows:
+        result = run(rows, args.batch_size)
+        print('{rows:>10} {export_kib:>11.1f} {seconds:>9.2f} {rows_per_s:>12.0f} {peak_kib:>10.1f}'.format(**result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
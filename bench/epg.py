@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Module: epg
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Benchmark of the XMLTV guide importer and the guide queries.
+
+Writes a synthetic gzipped XMLTV guide (half-hour programmes for every
+channel and day), imports it into a fresh EpgStore, imports it again
+unchanged and once more with one channel edited. Reports the peak traced
+allocations of an import, the time of each import and how many
+channel-days it rewrote, and the latency of the now/next and 24-hour grid
+queries.
+
+    python -m bench.epg [--channels N] [--days N]
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from xml.sax.saxutils import escape
+
+from bench import harness
+
+# Start of the synthetic guide: a UTC midnight
+GUIDE_START = 1792195200
+
+
+def xmltv_time(epoch):
+    return time.strftime('%Y%m%d%H%M%S +0000', time.gmtime(epoch))
+
+
+def write_guide(path, channels, days, edited_channel=None):
+    """Writes channels x days x 48 programmes; edited_channel gets new titles."""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="bench">\n')
+        for channel in range(channels):
+            f.write('  <channel id="ch{0}.bench"><display-name>Channel {0}</display-name>'
+                    '<icon src="http://example.com/ch{0}.png"/></channel>\n'.format(channel))
+        for channel in range(channels):
+            for slot in range(days * 48):
+                start = GUIDE_START + slot * 1800
+                title = 'Show {0}-{1}'.format(channel, slot % 48)
+                if channel == edited_channel:
+                    title += ' (rescheduled)'
+                f.write('  <programme start="{0}" stop="{1}" channel="ch{2}.bench">'
+                        '<title lang="en">{3}</title><desc lang="en">{4}</desc>'
+                        '<category lang="en">News</category>'
+                        '<episode-num system="onscreen">E{5}</episode-num></programme>\n'.format(
+                            xmltv_time(start), xmltv_time(start + 1800), channel, escape(title),
+                            escape('Programme {0} of channel {1}, a day-long synthetic schedule.'.format(
+                                slot, channel)), slot))
+        f.write('</tv>\n')
+
+
+def timed_import(store, path):
+    start = time.perf_counter()
+    stats = store.import_file(path)
+    return stats, time.perf_counter() - start
+
+
+def traced_import(store, path):
+    """Peak traced allocations of an import (timed separately: tracing is slow)."""
+    tracemalloc.start()
+    store.import_file(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def timed_query(function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--channels', type=int, default=200)
+    parser.add_argument('--days', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    harness.install(tempfile.mkdtemp(prefix='epg-profile-'))
+    from script.module.scrapepenguin.lib.epg import EpgStore
+    directory = tempfile.mkdtemp(prefix='epg-bench-')
+    guide = os.path.join(directory, 'guide.xml.gz')
+    edited = os.path.join(directory, 'guide-edited.xml.gz')
+    write_guide(guide, args.channels, args.days)
+    write_guide(edited, args.channels, args.days, edited_channel=args.channels // 2)
+    with gzip.open(guide, 'rb') as f:
+        raw_mib = sum(len(chunk) for chunk in iter(lambda: f.read(1 << 20), b'')) / 1048576.0
+    print('guide: {0} channels x {1} days, {2:.1f} MiB of XML'.format(args.channels, args.days, raw_mib))
+
+    peak = traced_import(EpgStore(os.path.join(directory, 'traced.db')), guide)
+    print('peak traced allocations of an import: {0:.1f} KiB'.format(peak / 1024.0))
+
+    store = EpgStore(os.path.join(directory, 'epg.db'))
+    print('{0:<12} {1:>11} {2:>9} {3:>12} {4:>9} {5:>10}'.format(
+        'import', 'programmes', 'seconds', 'programmes/s', 'written', 'unchanged'))
+    for label, path in (('initial', guide), ('unchanged', guide), ('one channel', edited)):
+        stats, elapsed = timed_import(store, path)
+        print('{0:<12} {1:>11} {2:>9.2f} {3:>12.0f} {4:>9} {5:>10}'.format(
+            label, stats['programmes'], elapsed, stats['programmes'] / elapsed, stats['written'],
+            stats['unchanged']))
+
+    now = GUIDE_START + args.days * 86400 // 2 + 600
+    now_next, now_ms = timed_query(lambda: store.now_next(now))
+    grid, grid_ms = timed_query(lambda: store.grid(now, hours=24))
+    print('now/next for {0} channels: {1:.2f} ms'.format(len(now_next), now_ms))
+    print('24h grid, {0} programmes: {1:.2f} ms'.format(sum(len(p) for p in grid.values()), grid_ms))
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# Module: xbmc (offline stand-in)
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+# Minimal replacement for Kodi's xbmc module so addon code can run outside
+# Kodi. Log lines are kept in LOG instead of being written anywhere.
+
+import re
+import threading
+import weakref
+
+LOGDEBUG = 0
+LOGINFO = 1
+LOGWARNING = 2
+LOGERROR = 3
+LOGFATAL = 4
+LOGNONE = 5
+
+# (level, message) tuples of every xbmc.log call
+LOG = []
+# Commands passed to executebuiltin
+BUILTINS = []
+# Value returned by getLanguage()
+LANGUAGE = 'English'
+# JSON-RPC requests passed to executeJSONRPC, decoded
+JSONRPC = []
+# Seconds since the last user input, as returned by getGlobalIdleTime()
+IDLE_TIME = 3600
+# Conditions getCondVisibility() reports as true, besides System.HasAddon
+CONDITIONS = set()
+# Values returned by getInfoLabel(); unknown labels are empty, as in Kodi
+INFO_LABELS = {'System.Memory(total)': '4096MB'}
+
+
+def log(msg, level=LOGDEBUG):
+    LOG.append((level, msg))
+
+
+# Set to make every Monitor see an abort request
+ABORT = threading.Event()
+# Whether Player().isPlayingVideo() reports playback
+PLAYING_VIDEO = False
+# What the fake playback plays: path, position and length in seconds
+PLAYING_FILE = None
+PLAY_TIME = 0.0
+TOTAL_TIME = 0.0
+
+_monitors = weakref.WeakSet()
+_players = weakref.WeakSet()
+
+
+def executebuiltin(function, wait=False):
+    BUILTINS.append(function)
+    # NotifyAll(sender, message[, data]) reaches every live Monitor.
+    match = re.fullmatch(r'NotifyAll\(([^,]+),([^,)]+)(?:,(.*))?\)', function.strip())
+    if match:
+        sender, message, data = match.group(1).strip(), match.group(2).strip(), match.group(3) or ''
+        for monitor in list(_monitors):
+            monitor.onNotification(sender, 'Other.' + message, data)
+
+
+def getGlobalIdleTime():
+    return int(IDLE_TIME)
+
+
+def getCondVisibility(condition):
+    # System.HasAddon(id) checks the fake xbmcaddon; other conditions are looked up in CONDITIONS.
+    if condition.strip() in CONDITIONS:
+        return True
+    match = re.fullmatch(r'System\.HasAddon\((.+)\)', condition.strip())
+    if match:
+        import xbmcaddon
+        return match.group(1).strip() in xbmcaddon.ADDONS
+    return False
+
+
+def executeJSONRPC(request):
+    import json
+    request = json.loads(request)
+    JSONRPC.append(request)
+    return json.dumps({'id': request.get('id'), 'jsonrpc': '2.0', 'result': 'OK'})
+
+
+def getInfoLabel(label):
+    return INFO_LABELS.get(label, '')
+
+
+def getLanguage(format=None, region=False):
+    return LANGUAGE
+
+
+def sleep(milliseconds):
+    import time
+    time.sleep(milliseconds / 1000.0)
+
+
+class Monitor:
+    def __init__(self):
+        _monitors.add(self)
+
+    def abortRequested(self):
+        return ABORT.is_set()
+
+    def waitForAbort(self, timeout=None):
+        return ABORT.wait(timeout)
+
+    def onNotification(self, sender, method, data):
+        pass
+
+    def onSettingsChanged(self):
+        pass
+
+
+class Player:
+    def __init__(self):
+        _players.add(self)
+
+    def isPlaying(self):
+        return PLAYING_VIDEO
+
+    def isPlayingVideo(self):
+        return PLAYING_VIDEO
+
+    def _check_playing(self):
+        if not PLAYING_VIDEO:
+            raise RuntimeError('Kodi is not playing any media file')
+
+    def getPlayingFile(self):
+        self._check_playing()
+        return PLAYING_FILE
+
+    def getTime(self):
+        self._check_playing()
+        return PLAY_TIME
+
+    def getTotalTime(self):
+        self._check_playing()
+        return TOTAL_TIME
+
+    def onAVStarted(self):
+        pass
+
+    def onPlayBackStopped(self):
+        pass
+
+    def onPlayBackEnded(self):
+        pass
+
+    def onPlayBackError(self):
+        pass
+
+
+def start_playback(path, total_time):
+    """Plays path from the start and tells every live Player."""
+    global PLAYING_VIDEO, PLAYING_FILE, PLAY_TIME, TOTAL_TIME
+    PLAYING_VIDEO, PLAYING_FILE, PLAY_TIME, TOTAL_TIME = True, path, 0.0, float(total_time)
+    for player in list(_players):
+        player.onAVStarted()
+
+
+def stop_playback(ended=False):
+    """Ends the fake playback: stopped by the user, or played to the end."""
+    global PLAYING_VIDEO, PLAYING_FILE
+    PLAYING_VIDEO, PLAYING_FILE = False, None
+    for player in list(_players):
+        if ended:
+            player.onPlayBackEnded()
+        else:
+            player.onPlayBackStopped()
+
+
+def reset():
+    """Forgets everything recorded so far."""
+    global PLAYING_VIDEO, PLAYING_FILE, PLAY_TIME, TOTAL_TIME
+    del LOG[:]
+    del BUILTINS[:]
+    del JSONRPC[:]
+    ABORT.clear()
+    PLAYING_VIDEO, PLAYING_FILE, PLAY_TIME, TOTAL_TIME = False, None, 0.0, 0.0
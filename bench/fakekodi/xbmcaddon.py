@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcaddon (offline stand-in)
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import os
+import xml.etree.ElementTree as ET
+
+# addon id -> {'path': ..., 'profile': ..., 'name': ..., 'version': ...}
+ADDONS = {}
+# Addon returned by Addon() without an id
+CURRENT_ADDON = None
+# addon id -> {setting id: value}; overrides the defaults from settings.xml
+SETTINGS = {}
+
+
+def register(addon_id, path, profile, name=None, version='1.0.0'):
+    """Makes an addon known to Addon(); the first one registered becomes current."""
+    global CURRENT_ADDON
+    ADDONS[addon_id] = {'path': path, 'profile': profile, 'name': name or addon_id, 'version': version}
+    SETTINGS.setdefault(addon_id, {})
+    if CURRENT_ADDON is None:
+        CURRENT_ADDON = addon_id
+
+
+def _default_settings(path):
+    defaults = {}
+    settings_xml = os.path.join(path, 'resources', 'settings.xml')
+    if os.path.exists(settings_xml):
+        for setting in ET.parse(settings_xml).iter('setting'):
+            if setting.get('id') and setting.get('default') is not None:
+                defaults[setting.get('id')] = setting.get('default')
+    return defaults
+
+
+class Addon:
+    def __init__(self, id=None):
+        self._id = id or CURRENT_ADDON
+        info = ADDONS[self._id]
+        self._info = {
+            'id': self._id,
+            'name': info['name'],
+            'version': info['version'],
+            'path': info['path'],
+            'profile': info['profile'] + os.sep,
+        }
+        self._defaults = _default_settings(info['path'])
+
+    def getAddonInfo(self, key):
+        return self._info.get(key, '')
+
+    def getSetting(self, key):
+        value = SETTINGS[self._id].get(key, self._defaults.get(key, ''))
+        return str(value).lower() if isinstance(value, bool) else str(value)
+
+    def getSettingBool(self, key):
+        return self.getSetting(key) == 'true'
+
+    def getSettingInt(self, key):
+        value = self.getSetting(key)
+        return int(value) if value else 0
+
+    def getSettingString(self, key):
+        return self.getSetting(key)
+
+    def setSetting(self, key, value):
+        SETTINGS[self._id][key] = value
+
+    def getLocalizedString(self, string_id):
+        return ''
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcgui (offline stand-in)
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+NOTIFICATION_INFO = 'info'
+NOTIFICATION_WARNING = 'warning'
+NOTIFICATION_ERROR = 'error'
+
+# (heading, message, icon) tuples of every notification shown
+NOTIFICATIONS = []
+# Answers returned by Dialog().input, in order
+INPUT_RESPONSES = []
+# (percent, message) tuples of every DialogProgress update
+PROGRESS_UPDATES = []
+# DialogProgress reports a cancel once an update reaches this percentage
+CANCEL_AT_PERCENT = None
+
+
+class ListItem:
+    """Keeps everything set on it so tests can inspect rendered items."""
+
+    def __init__(self, label='', label2='', path='', offscreen=False):
+        self.label = label
+        self.label2 = label2
+        self.path = path
+        self.art = {}
+        self.info = {}
+        self.properties = {}
+
+    def getLabel(self):
+        return self.label
+
+    def setLabel(self, label):
+        self.label = label
+
+    def getPath(self):
+        return self.path
+
+    def setPath(self, path):
+        self.path = path
+
+    def setArt(self, values):
+        self.art.update(values)
+
+    def setInfo(self, type, infoLabels):
+        self.info.update(infoLabels)
+
+    def setProperty(self, key, value):
+        self.properties[key] = value
+
+    def getProperty(self, key):
+        return self.properties.get(key, '')
+
+    def __repr__(self):
+        return 'ListItem({0!r})'.format(self.label)
+
+
+class Dialog:
+    def notification(self, heading, message, icon=NOTIFICATION_INFO, time=5000, sound=True):
+        NOTIFICATIONS.append((heading, message, icon))
+
+    def ok(self, heading, message):
+        NOTIFICATIONS.append((heading, message, 'ok'))
+        return True
+
+    def yesno(self, heading, message, *args, **kwargs):
+        return True
+
+    def input(self, heading, defaultt='', type=0, option=0, autoclose=0):
+        return INPUT_RESPONSES.pop(0) if INPUT_RESPONSES else defaultt
+
+
+class DialogProgress:
+    def __init__(self):
+        self._percent = 0
+
+    def create(self, heading, message=''):
+        PROGRESS_UPDATES.append((0, message))
+
+    def update(self, percent, message=''):
+        self._percent = percent
+        PROGRESS_UPDATES.append((percent, message))
+
+    def iscanceled(self):
+        return CANCEL_AT_PERCENT is not None and self._percent >= CANCEL_AT_PERCENT
+
+    def close(self):
+        pass
+
+
+def reset():
+    """Forgets everything recorded so far."""
+    global CANCEL_AT_PERCENT
+    del NOTIFICATIONS[:]
+    del INPUT_RESPONSES[:]
+    del PROGRESS_UPDATES[:]
+    CANCEL_AT_PERCENT = None
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcplugin (offline stand-in)
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import time
+
+SORT_METHOD_NONE = 0
+SORT_METHOD_LABEL = 1
+SORT_METHOD_DATE = 3
+SORT_METHOD_VIDEO_YEAR = 18
+SORT_METHOD_VIDEO_RATING = 19
+SORT_METHOD_EPISODE = 24
+SORT_METHOD_UNSORTED = 40
+
+
+class DirectoryState:
+    """What the plugin handed to Kodi during one invocation."""
+
+    def __init__(self):
+        self.items = []
+        self.content = None
+        self.sort_methods = []
+        self.ended = False
+        self.succeeded = None
+        self.cache_to_disc = None
+        self.resolved = None
+        self.resolved_url = None
+        self.finished_at = None
+        # Number of addDirectoryItem(s) calls, i.e. Python -> Kodi crossings.
+        self.add_calls = 0
+
+
+STATE = DirectoryState()
+
+
+def reset():
+    """Starts a fresh invocation."""
+    global STATE
+    STATE = DirectoryState()
+    return STATE
+
+
+def addDirectoryItem(handle, url, listitem, isFolder=False, totalItems=0):
+    STATE.add_calls += 1
+    STATE.items.append((url, listitem, isFolder))
+    return True
+
+
+def addDirectoryItems(handle, items, totalItems=0):
+    STATE.add_calls += 1
+    STATE.items.extend(items)
+    return True
+
+
+def setContent(handle, content):
+    STATE.content = content
+
+
+def addSortMethod(handle, sortMethod, labelMask='', label2Mask=''):
+    STATE.sort_methods.append(sortMethod)
+
+
+def endOfDirectory(handle, succeeded=True, updateListing=False, cacheToDisc=True):
+    STATE.ended = True
+    STATE.succeeded = succeeded
+    STATE.cache_to_disc = cacheToDisc
+    STATE.finished_at = time.perf_counter()
+
+
+def setResolvedUrl(handle, succeeded, listitem):
+    STATE.resolved = succeeded
+    STATE.resolved_url = listitem.getPath()
+    STATE.finished_at = time.perf_counter()
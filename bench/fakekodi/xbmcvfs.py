@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Module: xbmcvfs (offline stand-in)
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import os
+
+# special:// prefix -> real directory, e.g. {'special://home': '/tmp/kodi-home'}
+SPECIAL_PATHS = {}
+
+
+def translatePath(path):
+    # Addon paths handed out by the fake xbmcaddon are already real paths.
+    for prefix, directory in SPECIAL_PATHS.items():
+        if path == prefix or path.startswith(prefix + '/'):
+            return os.path.join(directory, *path[len(prefix):].strip('/').split('/'))
+    return path
+
+
+def exists(path):
+    return os.path.exists(path)
+
+
+def mkdirs(path):
+    os.makedirs(path, exist_ok=True)
+    return True
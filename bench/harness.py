@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Module: harness
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import importlib
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_KODI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fakekodi')
+
+# Kodi addon directories contain dots, so they are mounted as nested packages
+# under the same dotted names the addons use to import each other.
+ADDON_PACKAGES = {
+    'script.module.scrapepenguin.lib': os.path.join(REPO_ROOT, 'script.module.scrapepenguin', 'lib'),
+    'plugin.video.penguinsurf': os.path.join(REPO_ROOT, 'plugin.video.penguinsurf'),
+    'plugin.video.penguindoc': os.path.join(REPO_ROOT, 'plugin.video.penguindoc'),
+    'plugin.program.penguinsurfwizard': os.path.join(REPO_ROOT, 'plugin.program.penguinsurfwizard'),
+}
+PLUGIN_ID = 'plugin.video.penguinsurf'
+PLUGIN_NAME = 'PenguinSurf'
+
+# (name, router paramstring)
+ACTIONS = [
+    ('root', ''),
+    ('list_movies', 'action=list_movies'),
+    ('list_tvshows', 'action=list_tvshows'),
+    ('movies/popular', 'action=list_items&category=movies&subcategory=popular'),
+    ('movies/trending', 'action=list_items&category=movies&subcategory=trending'),
+    ('movies/genres', 'action=list_items&category=movies&subcategory=genres'),
+    ('tvshows/popular', 'action=list_items&category=tvshows&subcategory=popular'),
+    ('tvshows/airingtoday', 'action=list_items&category=tvshows&subcategory=airingtoday'),
+    ('list_seasons', 'action=list_seasons&show_id=1009'),
+    ('list_episodes', 'action=list_episodes&show_id=1009&season=2'),
+    ('resolve_item', 'action=resolve_item&item_id=1&item_type=movie&title=Public+Domain+Movie+1'),
+    ('movies/popular p2', 'action=list_items&category=movies&subcategory=popular&page=2'),
+    ('search', 'action=search&query=domain+movie+1'),
+    ('clear_cache', 'action=clear_cache'),
+    ('diagnostics', 'action=diagnostics'),
+]
+
+
+def _mount_package(dotted_name, path):
+    parts = dotted_name.split('.')
+    for i in range(1, len(parts) + 1):
+        name = '.'.join(parts[:i])
+        if name not in sys.modules:
+            module = types.ModuleType(name)
+            module.__path__ = []
+            sys.modules[name] = module
+    sys.modules[dotted_name].__path__ = [path]
+
+
+def install(profile_dir=None, addon_id=PLUGIN_ID, name=PLUGIN_NAME):
+    """
+    Puts the fake Kodi modules on sys.path, mounts the addon packages and
+    registers the plugin with the fake xbmcaddon.
+    :param profile_dir: addon profile directory, a temporary one by default
+    :param addon_id: addon to register (it becomes the current addon)
+    :return: the profile directory in use
+    """
+    if FAKE_KODI_DIR not in sys.path:
+        sys.path.insert(0, FAKE_KODI_DIR)
+    for dotted_name, path in ADDON_PACKAGES.items():
+        _mount_package(dotted_name, path)
+
+    import xbmcaddon
+    if profile_dir is None:
+        profile_dir = tempfile.mkdtemp(prefix='penguinsurf-profile-')
+    xbmcaddon.register(addon_id, ADDON_PACKAGES[addon_id], profile_dir, name=name)
+    return profile_dir
+
+
+def unload_addons():
+    """
+    Forgets every imported addon module, so the next load behaves like a
+    fresh Kodi plugin invocation.
+    """
+    prefixes = tuple(name + '.' for name in ADDON_PACKAGES)
+    for name in list(sys.modules):
+        if name.startswith(prefixes):
+            del sys.modules[name]
+
+
+def load_plugin(paramstring='', handle=1):
+    """
+    Imports the plugin's default.py with sys.argv set up the way Kodi does.
+    :return: the freshly executed default module
+    """
+    sys.argv = ['plugin://{0}/'.format(PLUGIN_ID), str(handle), '?' + paramstring]
+    sys.modules.pop(PLUGIN_ID + '.default', None)
+    return importlib.import_module(PLUGIN_ID + '.default')
+
+
+def point_at(base_url, api_key='bench'):
+    """
+    Sends the plugin's TMDB and Archive.org requests to base_url (e.g. a
+    StandInServer) instead of the real APIs. Must be called again after
+    unload_addons().
+    """
+    scraper = importlib.import_module(PLUGIN_ID + '.scraper')
+    scraper.TMDB_BASE_URL = base_url + '/3'
+    scraper.TMDB_API_KEY = api_key
+    scraper.ARCHIVE_BASE_URL = base_url
+    scraper.TMDB_IMAGE_ROOT = base_url + '/t/p'
+    return scraper
+
+
+def wait_for_background(timeout=30.0):
+    """
+    Waits for the non-daemon threads an invocation left behind (prefetch,
+    cache refresh), like the interpreter does before a plugin process exits.
+    """
+    deadline = time.monotonic() + timeout
+    for thread in threading.enumerate():
+        if thread is threading.current_thread() or thread.daemon:
+            continue
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+
+def prepare_action(paramstring='', cold=False, base_url=None):
+    """
+    Sets up one router invocation without running it.
+    :param cold: unload all addon modules first, like a new plugin process
+    :param base_url: if given, API requests go there (see point_at)
+    :return: (default module, xbmcplugin.DirectoryState of the invocation)
+    """
+    import xbmc
+    import xbmcgui
+    import xbmcplugin
+    if cold:
+        unload_addons()
+    if base_url is not None:
+        point_at(base_url)
+    xbmc.reset()
+    xbmcgui.reset()
+    state = xbmcplugin.reset()
+    return load_plugin(paramstring), state
+
+
+def run_action(paramstring='', cold=False, base_url=None):
+    """
+    Runs one router invocation and returns what it handed to Kodi.
+    See prepare_action() for the parameters.
+    :return: xbmcplugin.DirectoryState of the invocation
+    """
+    module, state = prepare_action(paramstring, cold=cold, base_url=base_url)
+    module.router(paramstring)
+    return state
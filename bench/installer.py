@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Module: installer
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+End-to-end run of the setup wizard's installer against a local repository.
+
+Builds repository_files with generate_repo.py in a scratch copy of the
+tree, serves it from a bandwidth-limited stand-in, cancels the first
+wizard run part way through and then runs it again, which has to resume
+the partial downloads with Range requests. A third run must find
+everything up to date.
+
+    python -m bench.installer [--bandwidth-kib N] [--cancel-at PERCENT]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from bench import harness
+from bench.standin import StandInServer
+
+WIZARD_ID = 'plugin.program.penguinsurfwizard'
+
+
+def build_repository(directory):
+    """Runs generate_repo.py on a copy of the tree; returns repository_files."""
+    ignore = shutil.ignore_patterns('.git', '__pycache__', '*.pyc', 'repository_files', 'bench')
+    shutil.copytree(harness.REPO_ROOT, directory, ignore=ignore)
+    subprocess.run([sys.executable, 'generate_repo.py', '--force'], cwd=directory, check=True,
+                   stdout=subprocess.DEVNULL)
+    return os.path.join(directory, 'repository_files')
+
+
+def register_installed(addons_dir):
+    """Does what Kodi's UpdateLocalAddons would: makes unpacked addons known."""
+    import xbmcaddon
+    for addon_id in os.listdir(addons_dir):
+        addon_xml = os.path.join(addons_dir, addon_id, 'addon.xml')
+        if os.path.exists(addon_xml):
+            root = ET.parse(addon_xml).getroot()
+            xbmcaddon.register(addon_id, os.path.dirname(addon_xml), tempfile.mkdtemp(),
+                               name=root.get('name'), version=root.get('version'))
+
+
+def run_wizard(server, cancel_at=None):
+    import xbmc
+    import xbmcgui
+    xbmc.reset()
+    xbmcgui.reset()
+    xbmcgui.CANCEL_AT_PERCENT = cancel_at
+    sys.modules.pop(WIZARD_ID + '.default', None)
+    from plugin.program.penguinsurfwizard import default
+    start = time.perf_counter()
+    installed = default.run_wizard(server.base_url + '/repo')
+    return default, installed, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bandwidth-kib', type=int, default=256, help='per-response bandwidth in KiB/s')
+    parser.add_argument('--cancel-at', type=int, default=40, help='cancel the first run at this percentage')
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix='wizard-bench-')
+    repository_files = build_repository(os.path.join(scratch, 'tree'))
+    harness.install(os.path.join(scratch, 'profile'), addon_id=WIZARD_ID, name='PenguinSurf Setup Wizard')
+    import xbmcvfs
+    xbmcvfs.SPECIAL_PATHS['special://home'] = os.path.join(scratch, 'home')
+
+    server = StandInServer(bandwidth=args.bandwidth_kib * 1024)
+    server.serve_directory('/repo', repository_files)
+    failures = []
+    with server:
+        default, installed, seconds = run_wizard(server, cancel_at=args.cancel_at)
+        partial = [name for name in os.listdir(default.DOWNLOAD_DIR) if name.endswith('.part')]
+        partial_bytes = sum(os.path.getsize(os.path.join(default.DOWNLOAD_DIR, name)) for name in partial)
+        print('cancelled run: {0:.2f}s, {1} partial downloads ({2:.1f} KiB kept)'.format(
+            seconds, len(partial), partial_bytes / 1024.0))
+        if installed or not partial:
+            failures.append('the cancelled run should leave partial downloads and install nothing')
+
+        server.reset_counters()
+        server.ranges_served = 0
+        default, installed, seconds = run_wizard(server)
+        print('resumed run:   {0:.2f}s, {1} requests, {2} ranged, {3:.1f} KiB sent'.format(
+            seconds, server.request_count, server.ranges_served, server.bytes_sent / 1024.0))
+        print('install order: {0}'.format(', '.join(installed)))
+        if partial and server.ranges_served == 0:
+            failures.append('partial downloads were not resumed')
+        for addon_id in installed:
+            if not os.path.exists(os.path.join(default.ADDONS_DIR, addon_id, 'addon.xml')):
+                failures.append('{0} was not unpacked'.format(addon_id))
+        if installed.index('script.module.scrapepenguin') > installed.index('plugin.video.penguinsurf'):
+            failures.append('script.module.scrapepenguin must be installed before its users')
+
+        register_installed(default.ADDONS_DIR)
+        default, again, seconds = run_wizard(server)
+        print('second run:    {0:.2f}s, {1} addons to install'.format(seconds, len(again)))
+        if again:
+            failures.append('a second run should find everything up to date')
+
+    for failure in failures:
+        print('FAIL: ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
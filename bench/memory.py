@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Module: memory
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Memory use per router action, with the automatic and the smallest memory
+budget.
+
+Runs every action in a fresh plugin process under tracemalloc, background
+prefetching included, and reports the peak of traced allocations next to
+what the stores registered with the budget estimate for themselves
+(SQLite page caches, prefetch queue, import batches). Then imports a
+synthetic TMDB ID export under each budget. The budgeted estimate must
+stay within the limit, and the import peak must drop with the small one.
+SQLite's own page cache is allocated outside Python and does not show up
+in the traced peak, only in the estimate.
+
+    python -m bench.memory [--latency-ms MS] [--rows N]
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from bench import harness
+from bench.catalogue import write_export
+from bench.standin import StandInServer
+
+ACTIONS = harness.ACTIONS + [
+    ('export_diagnostics', 'action=export_diagnostics'),
+    ('reset_diagnostics', 'action=reset_diagnostics'),
+]
+# memory_budget setting values compared: Automatic, 4 MB
+BUDGETS = [('auto', '0'), ('4 MB', '1')]
+
+
+def set_budget(value):
+    import xbmcaddon
+    xbmcaddon.SETTINGS[harness.PLUGIN_ID]['memory_budget'] = value
+
+
+def current_budget():
+    return sys.modules['script.module.scrapepenguin.lib.memory'].budget
+
+
+def traced_action(server, paramstring):
+    """Runs an action cold; returns (peak KiB, budget limit, budgeted bytes)."""
+    tracemalloc.start()
+    module, _ = harness.prepare_action(paramstring, cold=True, base_url=server.base_url)
+    module.router(paramstring)
+    harness.wait_for_background()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    budget = current_budget()
+    return peak / 1024.0, budget.limit, sum(budget.usage().values())
+
+
+def traced_import(export, value):
+    """
+    Imports an export into a fresh catalogue under a budget setting, with
+    the plugin's response cache and prefetch queue open as in its process.
+    :return: (batch size, peak KiB)
+    """
+    set_budget(value)
+    harness.unload_addons()
+    harness.load_plugin('')
+    scraper = importlib.import_module(harness.PLUGIN_ID + '.scraper')
+    scraper.get_response_cache().get('warm')
+    len(scraper.get_prefetch_queue())
+    from script.module.scrapepenguin.lib.catalogue import CatalogueStore
+    store = CatalogueStore(os.path.join(tempfile.mkdtemp(prefix='memory-bench-'), 'catalogue.db'))
+    store.count()
+    tracemalloc.start()
+    store.import_file(export, 'movie')
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    batch_size = store.batch_size
+    store.close()
+    return batch_size, peak / 1024.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='stand-in latency per request')
+    parser.add_argument('--rows', type=int, default=50000, help='rows of the synthetic catalogue export')
+    args = parser.parse_args(argv)
+
+    harness.install()
+    failures = 0
+    with StandInServer(latency=args.latency_ms / 1000.0) as server:
+        print('{0:<20} {1:>6} {2:>10} {3:>10} {4:>12}'.format('action', 'budget', 'peak KiB', 'limit KiB',
+                                                              'budgeted KiB'))
+        for label, value in BUDGETS:
+            set_budget(value)
+            for name, paramstring in ACTIONS:
+                peak, limit, used = traced_action(server, paramstring)
+                failures += used > limit
+                print('{0:<20} {1:>6} {2:>10.1f} {3:>10.0f} {4:>12.1f}{5}'.format(
+                    name, label, peak, limit / 1024.0, used / 1024.0, '  (over budget)' if used > limit else ''))
+
+    import xbmc
+    set_budget('0')
+    xbmc.INFO_LABELS['System.Memory(total)'] = '1024MB'
+    harness.run_action('', cold=True)
+    low_ram = current_budget().limit
+    print('automatic budget with 1024 MB of RAM: {0:.0f} KiB'.format(low_ram / 1024.0))
+    failures += low_ram >= sys.modules['script.module.scrapepenguin.lib.memory'].DEFAULT_BUDGET
+
+    export = os.path.join(tempfile.mkdtemp(prefix='memory-bench-'), 'movie_ids.json.gz')
+    write_export(export, args.rows)
+    xbmc.INFO_LABELS['System.Memory(total)'] = '4096MB'
+    results = []
+    for label, value in BUDGETS:
+        batch_size, peak = traced_import(export, value)
+        results.append(peak)
+        print('catalogue import of {0} rows, budget {1}: batch {2}, peak {3:.1f} KiB'.format(
+            args.rows, label, batch_size, peak))
+    failures += results[1] >= results[0]
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# Module: nextepisode
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Next-episode pre-resolution by the service's EpisodePlayer.
+
+Lists a season, plays its first episode through resolve_item and drives
+the fake player past PRELOAD_AT, then plays the second episode and
+compares its resolve_item with a cold one. Only the derivative probe,
+which belongs to playback start, may go to the network then; lookups
+must all come from the cache. A second run, with probing off so streams
+are cached in the background, stops playback while the pre-resolution
+is waiting on a slow Archive.org and checks that it gives up at once,
+caching nothing.
+
+    python -m bench.nextepisode [--latency-ms MS] [--archive-latency-ms MS]
+"""
+
+import argparse
+import sys
+import time
+
+from bench import harness
+from bench.standin import StandInServer
+
+SHOW_ID = 1009
+EPISODE_SECONDS = 1320
+
+
+def timed_resolve(server, paramstring):
+    """Runs resolve_item; returns (state, ms, lookup requests, probe requests)."""
+    server.reset_counters()
+    start = time.perf_counter()
+    state = harness.run_action(paramstring)
+    probes = sum(1 for path in server.requests if path.startswith('/download/'))
+    return state, (state.finished_at - start) * 1000, server.request_count - probes, probes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='stand-in latency per request')
+    parser.add_argument('--archive-latency-ms', type=float, default=2000.0,
+                        help='Archive.org latency while the cancelled pre-resolution runs')
+    args = parser.parse_args(argv)
+
+    harness.install()
+    import xbmc
+    failures = 0
+    with StandInServer(latency=args.latency_ms / 1000.0) as server:
+        state = harness.run_action('action=list_episodes&show_id={0}&season=1'.format(SHOW_ID), cold=True,
+                                   base_url=server.base_url)
+        episodes = [url.split('?', 1)[1] for url, _, _ in state.items]
+        from plugin.video.penguinsurf import player as player_module
+
+        _, cold_ms, cold_requests, cold_probes = timed_resolve(server, episodes[2])
+        print('cold resolve_item (E3): {0:.1f} ms, {1} lookups, {2} probes'.format(cold_ms, cold_requests,
+                                                                                    cold_probes))
+
+        # Play E1 to 80%: E2 is resolved in the background.
+        player = player_module.EpisodePlayer()
+        state = timed_resolve(server, episodes[0])[0]
+        xbmc.start_playback(state.resolved_url, EPISODE_SECONDS)
+        xbmc.PLAY_TIME = EPISODE_SECONDS * (player_module.PRELOAD_AT - 0.05)
+        early = player.check_progress()
+        xbmc.PLAY_TIME = EPISODE_SECONDS * player_module.PRELOAD_AT
+        started = player.check_progress()
+        start = time.perf_counter()
+        player.shutdown(wait=True)
+        print('pre-resolution of E2 started at {0:.0%}: {1} (not before: {2}), took {3:.1f} ms'.format(
+            player_module.PRELOAD_AT, started, not early, (time.perf_counter() - start) * 1000))
+        xbmc.stop_playback(ended=True)
+
+        _, next_ms, next_requests, next_probes = timed_resolve(server, episodes[1])
+        print('resolve_item of the next episode (E2): {0:.1f} ms, {1} lookups, {2} probes'.format(
+            next_ms, next_requests, next_probes))
+        failures += not started or early or next_requests != 0
+
+        # Play E4 to 80% with a slow Archive.org, then stop.
+        harness.point_at(server.base_url).get_archive_resolver().probe = False
+        player = player_module.EpisodePlayer()
+        state = timed_resolve(server, episodes[3])[0]
+        xbmc.start_playback(state.resolved_url, EPISODE_SECONDS)
+        server.route_latency['/advancedsearch.php'] = args.archive_latency_ms / 1000.0
+        xbmc.PLAY_TIME = EPISODE_SECONDS * 0.9
+        player.check_progress()
+        time.sleep(0.2)
+        start = time.perf_counter()
+        xbmc.stop_playback()
+        player.shutdown(wait=True)
+        stopped_ms = (time.perf_counter() - start) * 1000
+        scraper = harness.point_at(server.base_url)
+        show = scraper.get_show_tree(SHOW_ID, 1)
+        cached = scraper.get_cached_stream(scraper.episode_item(show, 1, show['seasons'][0]['episodes'][4]))
+        print('stop during pre-resolution of E5: worker done {0:.1f} ms after stop, stream cached: {1}'.format(
+            stopped_ms, cached is not None))
+        failures += cached is not None or stopped_ms > 500
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
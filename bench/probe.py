@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Module: probe
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Playback-start probing of Archive.org derivatives against throttled files.
+
+Resolves one item per scenario through ArchiveResolver with probing on,
+with the stand-in's download route throttled in different ways (a fast
+link, a slow link, one slow file host, one file answering late). Prints
+the derivative picked, the bandwidth measured and how long the probe
+took, then resolves the item again to show the choice is served from the
+cache without probing.
+
+    python -m bench.probe
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from bench import harness
+from bench.standin import StandInServer
+
+KIB = 1024
+
+# name -> (route_bandwidth by file suffix, route_latency by file suffix, expected format)
+SCENARIOS = (
+    ('fast link', {}, {}, '.mp4'),
+    ('slow link', {'': 25 * KIB}, {}, '_512kb.mp4'),
+    ('slow h.264 host', {'.mp4': 15 * KIB}, {}, '_512kb.mp4'),
+    ('h.264 answers late', {}, {'.mp4': 2.5}, '_512kb.mp4'),
+)
+
+
+def resolve(resolver, identifier):
+    start = time.perf_counter()
+    url = resolver.stream_url(identifier)
+    return url, (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args(argv)
+
+    profile = tempfile.mkdtemp(prefix='probe-profile-')
+    harness.install(profile)
+    from script.module.scrapepenguin.lib.archive import ArchiveResolver
+    from script.module.scrapepenguin.lib.cache import ResponseCache, make_key
+    from script.module.scrapepenguin.lib.httpclient import HttpClient
+
+    failures = 0
+    print('{0:<20} {1:<28} {2:>10} {3:>9} {4:>10}'.format('scenario', 'picked', 'kbit/s', 'probe ms',
+                                                          'cached ms'))
+    with StandInServer() as server:
+        for number, (label, bandwidths, latencies, expected) in enumerate(SCENARIOS):
+            identifier = 'probe_item_{0}'.format(number)
+            prefix = '/download/{0}/{0}'.format(identifier)
+            server.route_bandwidth = {prefix + suffix: rate for suffix, rate in bandwidths.items()}
+            server.route_latency = {prefix + suffix: delay for suffix, delay in latencies.items()}
+            cache = ResponseCache(os.path.join(profile, 'probe-{0}.db'.format(number)))
+            resolver = ArchiveResolver(cache, HttpClient(), base_url=server.base_url, probe=True)
+
+            url, probe_ms = resolve(resolver, identifier)
+            entry = cache.get(make_key('archive/probe', {'identifier': identifier}))
+            bandwidth = entry[0]['bandwidth'] if entry else 0
+            server.reset_counters()
+            again, cached_ms = resolve(resolver, identifier)
+            downloads = sum(1 for path in server.requests if path.startswith('/download/'))
+
+            picked = url.rsplit('/', 1)[-1]
+            ok = url.endswith(identifier + expected) and again == url and downloads == 0
+            failures += not ok
+            print('{0:<20} {1:<28} {2:>10.0f} {3:>9.0f} {4:>10.1f}{5}'.format(
+                label, picked, bandwidth / 1000, probe_ms, cached_ms,
+                '' if ok else '  (expected {0}{1})'.format(identifier, expected)))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Module: snapshot
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Directory snapshots: a repeat visit of a listing against building it.
+
+Opens each listing once (filling the response cache and the snapshot),
+then runs it again in a fresh plugin process twice: with the snapshot
+dropped, so it is built from the response cache, and replayed from the
+snapshot. Reports both times, whether the replay had to import the
+scraper (and with it the network stack) and the stored size of the
+snapshot next to its JSON size. Saving the settings and switching the
+language must each invalidate the snapshots.
+
+    python -m bench.snapshot [--latency-ms MS]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.parse
+
+from bench import harness
+from bench.standin import StandInServer
+
+LISTINGS = [name_params for name_params in harness.ACTIONS
+            if name_params[1].startswith(('action=list_items', 'action=list_seasons', 'action=list_episodes'))]
+
+
+def cold_run(paramstring, base_url=None):
+    """Runs an action in a fresh plugin process; returns (state, ms, whether the scraper was imported)."""
+    start = time.perf_counter()
+    state = harness.run_action(paramstring, cold=True, base_url=base_url)
+    elapsed = (state.finished_at - start) * 1000
+    return state, elapsed, harness.PLUGIN_ID + '.scraper' in sys.modules
+
+
+def counters():
+    from script.module.scrapepenguin.lib.metrics import metrics
+    return metrics.summary()[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='stand-in latency per request')
+    args = parser.parse_args(argv)
+
+    profile = harness.install()
+    failures = 0
+    with StandInServer(latency=args.latency_ms / 1000.0) as server:
+        print('{0:<20} {1:>9} {2:>9} {3:>10} {4:>10} {5:>10}'.format(
+            'listing', 'built ms', 'replay ms', 'scraper', 'snap B', 'JSON B'))
+        for name, paramstring in LISTINGS:
+            harness.run_action(paramstring, cold=True, base_url=server.base_url)
+            harness.wait_for_background()
+            module = sys.modules[harness.PLUGIN_ID + '.default']
+            url = module.get_url(**dict(urllib.parse.parse_qsl(paramstring)))
+            snapshots = module.get_snapshots()
+            items, options = snapshots.get(url)
+            with snapshots._lock:
+                size = len(snapshots._connect().execute(
+                    'SELECT body FROM snapshots WHERE url = ?', (url,)).fetchone()[0])
+            snapshots.invalidate(url)
+
+            # Built from the response cache: no requests, but the scraper is imported.
+            _, built_ms, _ = cold_run(paramstring, base_url=server.base_url)
+            harness.wait_for_background()
+            hits = counters().get('snapshot.hit', 0)
+            _, replay_ms, imported = cold_run(paramstring)
+            replayed = counters().get('snapshot.hit', 0) == hits + 1
+            failures += not replayed or imported
+            print('{0:<20} {1:>9.1f} {2:>9.1f} {3:>10} {4:>10} {5:>10}{6}'.format(
+                name, built_ms, replay_ms, 'imported' if imported else 'skipped', size,
+                len(json.dumps([items, options])), '' if replayed else '  (not replayed)'))
+
+        name, paramstring = LISTINGS[0]
+        for change in ('settings saved', 'language changed'):
+            if change == 'settings saved':
+                with open(os.path.join(profile, 'settings.xml'), 'w', encoding='utf-8') as f:
+                    f.write('<settings version="2"><setting id="debug_mode">false</setting></settings>')
+            else:
+                import xbmc
+                xbmc.LANGUAGE = 'French'
+            misses = counters().get('snapshot.miss', 0)
+            harness.run_action(paramstring, cold=True, base_url=server.base_url)
+            harness.wait_for_background()
+            invalidated = counters().get('snapshot.miss', 0) == misses + 1
+            failures += not invalidated
+            print('{0}: snapshot {1}'.format(change, 'invalidated' if invalidated else 'STILL REPLAYED'))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+# Module: standin
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Local HTTP stand-in for the TMDB and Archive.org APIs.
+
+Serves deterministic canned responses from a background thread with a
+configurable per-request latency, and counts every request it receives so
+benchmarks can report how many round trips an action needed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Shape of the canned TMDB catalogue
+RESULTS_PER_PAGE = 20
+TOTAL_PAGES = 5
+GENRES = [
+    {"id": 18, "name": "Drama"},
+    {"id": 35, "name": "Comedy"},
+    {"id": 99, "name": "Documentary"},
+]
+
+
+def tmdb_list_item(media, item_id):
+    """Canned TMDB list entry for a movie or TV show."""
+    if media == 'tv':
+        return {
+            "id": item_id,
+            "name": "Public Domain Show {0}".format(item_id),
+            "original_name": "Public Domain Show {0}".format(item_id),
+            "first_air_date": "19{0:02d}-01-01".format(50 + item_id % 40),
+            "overview": "A classic public domain TV series number {0}.".format(item_id),
+            "poster_path": "/tv{0}.jpg".format(item_id),
+            "backdrop_path": "/tvbackdrop{0}.jpg".format(item_id),
+        }
+    return {
+        "id": item_id,
+        "title": "Public Domain Movie {0}".format(item_id),
+        "original_title": "Public Domain Movie {0}".format(item_id),
+        "release_date": "19{0:02d}-05-15".format(30 + item_id % 60),
+        "overview": "A classic public domain film number {0}.".format(item_id),
+        "poster_path": "/movie{0}.jpg".format(item_id),
+        "backdrop_path": "/backdrop{0}.jpg".format(item_id),
+    }
+
+
+def tmdb_season_count(show_id):
+    """Number of seasons of a canned show (1 to 25)."""
+    return 1 + show_id % 25
+
+
+def tmdb_first_season(show_id):
+    """0 if a canned show lists Specials (season 0), as most TMDB shows do, else 1."""
+    return 0 if show_id % 2 else 1
+
+
+def tmdb_episode_count(show_id, season_number):
+    return 6 + (show_id + season_number) % 7
+
+
+def tmdb_season(show_id, season_number):
+    """Canned TMDB season details with its episode list."""
+    return {
+        "season_number": season_number,
+        "name": "Season {0}".format(season_number),
+        "episodes": [
+            {"id": show_id * 10000 + season_number * 100 + n, "episode_number": n, "season_number": season_number,
+             "name": "Episode {0}".format(n), "overview": "Episode {0} of season {1}.".format(n, season_number),
+             "air_date": "19{0:02d}-01-{1:02d}".format(50 + season_number, n), "runtime": 25,
+             "still_path": "/tv{0}s{1}e{2}.jpg".format(show_id, season_number, n)}
+            for n in range(1, tmdb_episode_count(show_id, season_number) + 1)
+        ],
+    }
+
+
+# Languages of the canned Archive.org collection served by the scrape API
+COLLECTION_LANGUAGES = ("English", "Arabic", "French", "Japanese", "Korean")
+
+
+def archive_collection_doc(n):
+    """Canned scrape API result for the n-th item of the collection."""
+    return {
+        "identifier": "documentary_{0:05d}".format(n),
+        "title": "Public Domain Documentary {0}".format(n),
+        "description": "An educational film, number {0} of the collection.".format(n),
+        "language": COLLECTION_LANGUAGES[n % len(COLLECTION_LANGUAGES)],
+        "year": str(1930 + n % 50),
+        "addeddate": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1420070400 + n * 3600)),
+        "downloads": (n * 7919) % 100000,
+    }
+
+
+def archive_identifier(title):
+    """Archive.org identifier the stand-in uses for a title."""
+    return re.sub(r'[^a-z0-9]+', '_', title.lower()).strip('_')
+
+
+class StandInServer:
+    """
+    Threaded HTTP server answering TMDB (/3/...) and Archive.org requests.
+
+    Extra routes can be added with add_route(pattern, handler); a handler
+    receives (match, query, headers) and returns (status, headers, body).
+    """
+
+    def __init__(self, latency=0.0, host='127.0.0.1', port=0, etags=True, bandwidth=None):
+        self.latency = latency
+        # Bytes per second each response body is trickled out at (None: no limit)
+        self.bandwidth = bandwidth
+        # Send ETags and answer matching If-None-Match requests with 304
+        self.etags = etags
+        # path prefix -> latency override in seconds
+        self.route_latency = {}
+        # path prefix -> bandwidth override in bytes per second
+        self.route_bandwidth = {}
+        self.routes = []
+        self.requests = []
+        self.bytes_sent = 0
+        # Items in the canned collection behind the Archive.org scrape API
+        self.collection_size = 2500
+        # 206 responses sent by serve_directory and Archive.org download routes
+        self.ranges_served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+        self._add_default_routes()
+
+    # --- Lifecycle ---
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='standin', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --- Accounting ---
+
+    def reset_counters(self):
+        with self._lock:
+            del self.requests[:]
+            self.bytes_sent = 0
+
+    @property
+    def request_count(self):
+        return len(self.requests)
+
+    def _record(self, path, size):
+        with self._lock:
+            self.requests.append(path)
+            self.bytes_sent += size
+
+    def _latency_for(self, path):
+        for prefix, latency in self.route_latency.items():
+            if path.startswith(prefix):
+                return latency
+        return self.latency
+
+    def _bandwidth_for(self, path):
+        for prefix, bandwidth in self.route_bandwidth.items():
+            if path.startswith(prefix):
+                return bandwidth
+        return self.bandwidth
+
+    def _write_body(self, wfile, body, path=''):
+        bandwidth = self._bandwidth_for(path)
+        if not bandwidth:
+            wfile.write(body)
+            return
+        chunk = max(1024, int(bandwidth / 20))
+        for start in range(0, len(body), chunk):
+            time.sleep(chunk / float(bandwidth))
+            wfile.write(body[start:start + chunk])
+
+    # --- Routing ---
+
+    def add_route(self, pattern, handler):
+        """Registers a handler for paths matching the regular expression."""
+        self.routes.insert(0, (re.compile(pattern), handler))
+
+    def serve_directory(self, prefix, directory):
+        """
+        Serves the files below directory at prefix, with single-range
+        support (Range: bytes=N-) like a static file host.
+        """
+        directory = os.path.abspath(directory)
+
+        def handler(match, query, headers):
+            path = os.path.abspath(os.path.join(directory, urllib.parse.unquote(match.group(1))))
+            if not path.startswith(directory + os.sep) or not os.path.isfile(path):
+                return 404, {}, b'Not found'
+            with open(path, 'rb') as f:
+                body = f.read()
+            byte_range = re.fullmatch(r'bytes=(\d+)-', headers.get('Range') or '')
+            if byte_range is None:
+                return 200, {'Accept-Ranges': 'bytes'}, body
+            start = int(byte_range.group(1))
+            if start >= len(body):
+                return 416, {'Content-Range': 'bytes */{0}'.format(len(body))}, b''
+            with self._lock:
+                self.ranges_served += 1
+            return 206, {'Accept-Ranges': 'bytes', 'Content-Range': 'bytes {0}-{1}/{2}'.format(
+                start, len(body) - 1, len(body))}, body[start:]
+
+        self.add_route(re.escape(prefix.rstrip('/')) + r'/(.+)', handler)
+
+    def _dispatch(self, path, query, headers):
+        for pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                return handler(match, query, headers)
+        return 404, {}, b'{"status_message": "Not found"}'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def _respond(self, send_body):
+                parsed = urllib.parse.urlsplit(self.path)
+                query = urllib.parse.parse_qs(parsed.query)
+                delay = server._latency_for(parsed.path)
+                if delay:
+                    time.sleep(delay)
+                status, headers, body = server._dispatch(parsed.path, query, self.headers)
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode('utf-8')
+                    headers.setdefault('Content-Type', 'application/json')
+                if status == 200 and server.etags:
+                    # Like the real APIs: an unchanged body is answered with a 304.
+                    etag = '"{0}"'.format(hashlib.md5(body).hexdigest())
+                    headers.setdefault('ETag', etag)
+                    if self.headers.get('If-None-Match') == headers['ETag']:
+                        status, body = 304, b''
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    try:
+                        server._write_body(self.wfile, body, parsed.path)
+                    except ConnectionError:
+                        # The client gave up half way (e.g. a cancelled download).
+                        server._record(self.path, 0)
+                        return
+                server._record(self.path, len(body) if send_body else 0)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _add_default_routes(self):
+        self.add_route(r'/3/genre/(movie|tv)/list', lambda match, query, headers: (200, {}, {"genres": GENRES}))
+        self.add_route(r'/3/(movie|tv)/(\d+)', self._tmdb_details)
+        self.add_route(r'/3/tv/(\d+)/season/(\d+)', self._tmdb_season)
+        self.add_route(r'/3/search/(movie|tv|multi)', self._tmdb_search)
+        self.add_route(r'/3/(?:trending/)?(movie|tv)(?:/[a-z_]+)*', self._tmdb_list)
+        self.add_route(r'/3/discover/(movie|tv)', self._tmdb_list)
+        self.add_route(r'/t/p/(w\d+|original)/(.+)', self._tmdb_image)
+        self.add_route(r'/advancedsearch\.php', self._archive_search)
+        self.add_route(r'/services/search/v1/scrape', self._archive_scrape)
+        self.add_route(r'/metadata/([^/]+)', self._archive_metadata)
+        self.add_route(r'/download/([^/]+)/(.+)', self._archive_download)
+
+    # --- TMDB ---
+
+    def _tmdb_list(self, match, query, headers):
+        media = match.group(1)
+        page = int(query.get('page', ['1'])[0])
+        offset = 1000 if media == 'tv' else 0
+        first = offset + (page - 1) * RESULTS_PER_PAGE + 1
+        results = [tmdb_list_item(media, item_id) for item_id in range(first, first + RESULTS_PER_PAGE)]
+        return 200, {}, {
+            "page": page,
+            "results": results if page <= TOTAL_PAGES else [],
+            "total_pages": TOTAL_PAGES,
+            "total_results": TOTAL_PAGES * RESULTS_PER_PAGE,
+        }
+
+    def _tmdb_details(self, match, query, headers):
+        media, item_id = match.group(1), int(match.group(2))
+        details = tmdb_list_item(media, item_id)
+        if media == 'tv':
+            details["seasons"] = [
+                {"season_number": n, "name": "Season {0}".format(n), "episode_count": tmdb_episode_count(item_id, n),
+                 "poster_path": "/tv{0}s{1}.jpg".format(item_id, n)}
+                for n in range(tmdb_first_season(item_id), tmdb_season_count(item_id) + 1)
+            ]
+            # Like TMDB: appended seasons that don't exist are left out.
+            for name in query.get('append_to_response', [''])[0].split(','):
+                season = re.fullmatch(r'season/(\d+)', name)
+                if season and tmdb_first_season(item_id) <= int(season.group(1)) <= tmdb_season_count(item_id):
+                    details[name] = tmdb_season(item_id, int(season.group(1)))
+        return 200, {}, details
+
+    def _tmdb_season(self, match, query, headers):
+        item_id, number = int(match.group(1)), int(match.group(2))
+        if not tmdb_first_season(item_id) <= number <= tmdb_season_count(item_id):
+            return 404, {}, {"status_message": "Not found"}
+        return 200, {}, tmdb_season(item_id, number)
+
+    def _tmdb_search(self, match, query, headers):
+        needle = query.get('query', [''])[0].lower()
+        media = 'tv' if match.group(1) == 'tv' else 'movie'
+        offset = 1000 if media == 'tv' else 0
+        results = [
+            tmdb_list_item(media, item_id)
+            for item_id in range(offset + 1, offset + TOTAL_PAGES * RESULTS_PER_PAGE + 1)
+        ]
+        title_field = 'name' if media == 'tv' else 'title'
+        results = [item for item in results if needle in item[title_field].lower()]
+        return 200, {}, {"page": 1, "results": results[:RESULTS_PER_PAGE], "total_pages": 1}
+
+    def _tmdb_image(self, match, query, headers):
+        # Roughly proportional to the pixel count of the requested size
+        size = match.group(1)
+        width = 2000 if size == 'original' else int(size[1:])
+        return 200, {'Content-Type': 'image/jpeg'}, b'\xff' * (width * width * 3 // 20)
+
+    # --- Archive.org ---
+
+    def _archive_search(self, match, query, headers):
+        q = query.get('q', [''])[0]
+        titles = re.findall(r'title:\("((?:[^"\\]|\\.)*)"\)', q)
+        docs = [
+            {"identifier": archive_identifier(title), "title": title, "year": "1950",
+             "format": ["h.264", "512Kb MPEG4", "Ogg Video"]}
+            for title in titles
+            if title.startswith('Public Domain')
+        ]
+        return 200, {}, {"response": {"numFound": len(docs), "start": 0, "docs": docs}}
+
+    def _archive_scrape(self, match, query, headers):
+        # Cursor-based paging like the real API; the cursor is an opaque string.
+        docs = [archive_collection_doc(n) for n in range(1, self.collection_size + 1)]
+        since = re.search(r'addeddate:\[(\S+) TO null\]', query.get('q', [''])[0])
+        if since:
+            docs = [doc for doc in docs if doc['addeddate'] >= since.group(1)]
+        count = max(100, min(10000, int(query.get('count', ['5000'])[0])))
+        offset = int(query.get('cursor', ['0'])[0])
+        page = {"items": docs[offset:offset + count], "count": len(docs[offset:offset + count]), "total": len(docs)}
+        if offset + count < len(docs):
+            page["cursor"] = str(offset + count)
+        return 200, {}, page
+
+    def _archive_metadata(self, match, query, headers):
+        identifier = match.group(1)
+        return 200, {}, {
+            "metadata": {"identifier": identifier, "mediatype": "movies"},
+            "files": [
+                {"name": identifier + ".mpeg", "format": "MPEG2", "source": "original", "size": "900000000",
+                 "length": "3600.00"},
+                {"name": identifier + ".mp4", "format": "h.264", "source": "derivative", "size": "300000000",
+                 "length": "3600.00"},
+                {"name": identifier + "_512kb.mp4", "format": "512Kb MPEG4", "source": "derivative",
+                 "size": "90000000", "length": "3600.00"},
+                {"name": identifier + ".ogv", "format": "Ogg Video", "source": "derivative", "size": "120000000",
+                 "length": "60:00"},
+            ],
+        }
+
+    def _archive_download(self, match, query, headers):
+        # Stands in for a video file: a ranged request gets that many zero bytes.
+        byte_range = re.fullmatch(r'bytes=(\d+)-(\d+)', headers.get('Range') or '')
+        if byte_range is None:
+            return 200, {'Content-Type': 'video/mp4'}, b'\0' * 1024
+        start, end = int(byte_range.group(1)), int(byte_range.group(2))
+        with self._lock:
+            self.ranges_served += 1
+        return 206, {'Content-Type': 'video/mp4', 'Accept-Ranges': 'bytes',
+                     'Content-Range': 'bytes {0}-{1}/*'.format(start, end)}, b'\0' * (end - start + 1)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Module: startup
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+Cold-start benchmark for plugin.video.penguinsurf.
+
+Every router action runs in its own interpreter, like a Kodi plugin
+invocation, and reports the time spent importing default.py and the time
+until endOfDirectory/setResolvedUrl. Static menus must not load any of the
+network or parsing stack; the run fails if they do or if an action is over
+its time budget.
+
+    python -m bench.startup [--repeat N] [--budget-ms MS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.harness import ACTIONS, REPO_ROOT
+
+# Actions that only show fixed menus and must stay free of heavy imports
+STATIC_ACTIONS = ('root', 'list_movies', 'list_tvshows')
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'sqlite3', 'ssl', 'http.client', 'concurrent.futures')
+# Default time-to-endOfDirectory budget per static action (ms)
+DEFAULT_BUDGET_MS = 150.0
+
+
+def _child(paramstring, profile_dir):
+    """Runs inside the measured interpreter; prints one result line."""
+    start = time.perf_counter()
+    from bench import harness
+    harness.install(profile_dir)
+    import xbmcplugin
+    state = xbmcplugin.reset()
+    import_start = time.perf_counter()
+    module = harness.load_plugin(paramstring)
+    import_end = time.perf_counter()
+    module.router(paramstring)
+    finished = state.finished_at or time.perf_counter()
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+    print('RESULT\t{0:.3f}\t{1:.3f}\t{2}'.format(
+        (import_end - import_start) * 1000, (finished - start) * 1000, ','.join(heavy)))
+
+
+def _measure(paramstring, profile_dir):
+    output = subprocess.run(
+        [sys.executable, '-m', 'bench.startup', '--child', paramstring, '--profile', profile_dir],
+        check=True, capture_output=True, text=True, cwd=REPO_ROOT
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith('RESULT\t'):
+            _, import_ms, total_ms, heavy = line.split('\t')
+            return float(import_ms), float(total_ms), [name for name in heavy.split(',') if name]
+    raise RuntimeError('No result from child process for {0!r}'.format(paramstring))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per action (median is reported)')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='time-to-endOfDirectory budget for static menus')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--profile', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        _child(args.child, args.profile)
+        return 0
+
+    profile_dir = tempfile.mkdtemp(prefix='penguinsurf-startup-')
+    failures = []
+    print('{0:<22} {1:>10} {2:>12}  {3}'.format('action', 'import ms', 'to-end ms', 'heavy modules'))
+    for name, paramstring in ACTIONS:
+        runs = [_measure(paramstring, profile_dir) for _ in range(args.repeat)]
+        import_ms = statistics.median(run[0] for run in runs)
+        total_ms = statistics.median(run[1] for run in runs)
+        heavy = runs[-1][2]
+        print('{0:<22} {1:>10.1f} {2:>12.1f}  {3}'.format(name, import_ms, total_ms, ', '.join(heavy) or '-'))
+        if name in STATIC_ACTIONS:
+            if heavy:
+                failures.append('{0} imports {1}'.format(name, ', '.join(heavy)))
+            if total_ms > args.budget_ms:
+                failures.append('{0} took {1:.1f} ms (budget {2:.1f} ms)'.format(name, total_ms, args.budget_ms))
+
+    for failure in failures:
+        print('FAIL: ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Module: suite
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+"""
+End-to-end benchmark of every router action in plugin.video.penguinsurf.
+
+Each action is driven through router() against the fake Kodi modules,
+with TMDB served by a local stand-in that adds a fixed latency per request.
+Every invocation starts from unloaded addon modules, like a real plugin
+process. For each action the suite reports:
+
+  cold ms / reqs  first run with an empty profile (no response cache)
+  warm ms / reqs  median of the following runs with the cache filled
+  KiB sent        response bytes served to the cold run
+  import KiB      peak traced allocations while loading the plugin (warm)
+  router KiB      peak traced allocations inside router() (warm)
+
+    python -m bench.suite [--latency-ms MS] [--repeat N] [--json FILE]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench import harness
+from bench.standin import StandInServer
+
+
+def _invoke(paramstring, server, trace=False):
+    server.reset_counters()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    module, state = harness.prepare_action(paramstring, cold=True, base_url=server.base_url)
+    import_peak = None
+    if trace:
+        import_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+    module.router(paramstring)
+    finished = state.finished_at or time.perf_counter()
+    router_peak = tracemalloc.get_traced_memory()[1] if trace else None
+    # Background prefetches belong to this invocation's request count.
+    harness.wait_for_background()
+    if trace:
+        tracemalloc.stop()
+    return {
+        'ms': (finished - start) * 1000,
+        'requests': server.request_count,
+        'bytes': server.bytes_sent,
+        'import_peak_bytes': import_peak,
+        'router_peak_bytes': router_peak,
+        'items': len(state.items),
+        'add_calls': state.add_calls,
+    }
+
+
+def bench_action(paramstring, server, repeat):
+    """Runs one action cold, then `repeat` times warm; returns its report row."""
+    harness.install(tempfile.mkdtemp(prefix='penguinsurf-bench-'))
+    cold = _invoke(paramstring, server)
+    warm = [_invoke(paramstring, server) for _ in range(repeat)]
+    traced = _invoke(paramstring, server, trace=True)
+    return {
+        'cold_ms': cold['ms'],
+        'cold_requests': cold['requests'],
+        'cold_bytes': cold['bytes'],
+        'warm_ms': statistics.median(run['ms'] for run in warm) if warm else None,
+        'warm_requests': max((run['requests'] for run in warm), default=None),
+        'import_peak_bytes': traced['import_peak_bytes'],
+        'router_peak_bytes': traced['router_peak_bytes'],
+        'items': cold['items'],
+        'add_calls': cold['add_calls'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='stand-in latency per request')
+    parser.add_argument('--repeat', type=int, default=5, help='warm runs per action')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--action', action='append', help='only run the named action(s)')
+    args = parser.parse_args(argv)
+
+    harness.install()
+    results = {}
+    with StandInServer(latency=args.latency_ms / 1000.0) as server:
+        header = '{0:<22} {1:>9} {2:>5} {3:>9} {4:>5} {5:>9} {6:>10} {7:>10} {8:>6}'
+        row = '{0:<22} {1:>9.1f} {2:>5} {3:>9.1f} {4:>5} {5:>9.1f} {6:>10.1f} {7:>10.1f} {8:>6}'
+        print(header.format('action', 'cold ms', 'reqs', 'warm ms', 'reqs', 'KiB sent',
+                            'import KiB', 'router KiB', 'items'))
+        for name, paramstring in harness.ACTIONS:
+            if args.action and name not in args.action:
+                continue
+            result = bench_action(paramstring, server, args.repeat)
+            results[name] = result
+            print(row.format(
+                name, result['cold_ms'], result['cold_requests'], result['warm_ms'] or 0.0,
+                result['warm_requests'] or 0, result['cold_bytes'] / 1024.0,
+                result['import_peak_bytes'] / 1024.0, result['router_peak_bytes'] / 1024.0,
+                result['items']))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'latency_ms': args.latency_ms, 'repeat': args.repeat, 'actions': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,121 +1,330 @@
 import os
+import sys
+import json
+import gzip
+import shutil
 import hashlib
+import zipfile
+import argparse
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from concurrent.futures import ProcessPoolExecutor
 
 # --- Configuration ---
-# The directory where the video addon is located
-ADDON_DIR = "plugin.video.penguinsurf"
+# The directory that contains one sub-directory per addon
+ADDONS_ROOT = "."
 # The directory where the repository files will be generated
 REPO_FILES_DIR = "repository_files"
 # The ID of the repository addon
 REPO_ID = "repository.penguinsurf"
+# Build state of the previous run, used to skip unchanged addons
+MANIFEST_FILE = "manifest.json"
+# Files and directories that never go into an addon zip
+EXCLUDED_DIRS = {"__pycache__", ".git", ".idea", ".vscode"}
+EXCLUDED_SUFFIXES = (".pyc", ".pyo", ".zip")
+# Artwork copied next to the zip so Kodi can show it before installing
+ASSET_FILES = ("icon.png", "fanart.jpg")
+# Fixed timestamp for zip entries, so identical content gives identical zips
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
 
-def generate_addons_xml():
+def discover_addons(root=ADDONS_ROOT):
     """
-    Reads the addon.xml from the video addon and generates the repository's addons.xml.
+    Finds every addon directory (a direct sub-directory with an addon.xml).
+    :return: list of directory paths, sorted by name
     """
-    print(f"--- Generating addons.xml for {ADDON_DIR} ---")
-    
-    # 1. Read the video addon's addon.xml
-    addon_xml_path = os.path.join(ADDON_DIR, "addon.xml")
-    if not os.path.exists(addon_xml_path):
-        print(f"Error: Addon XML not found at {addon_xml_path}")
-        return False
+    addon_dirs = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if name == REPO_FILES_DIR or name.startswith("."):
+            continue
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, "addon.xml")):
+            addon_dirs.append(path)
+    return addon_dirs
+
+def list_addon_files(addon_dir):
+    """Lists the files of an addon that belong in its zip, as sorted relative paths."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(addon_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in EXCLUDED_DIRS)
+        for filename in filenames:
+            if filename.endswith(EXCLUDED_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, filename)
+            files.append(os.path.relpath(path, addon_dir).replace(os.sep, "/"))
+    return sorted(files)
+
+def stat_signature(addon_dir, files):
+    """Cheap fingerprint (names, sizes, mtimes) used to skip re-hashing untouched addons."""
+    digest = hashlib.sha1()
+    for rel in files:
+        st = os.stat(os.path.join(addon_dir, rel))
+        digest.update("{0}\0{1}\0{2}\n".format(rel, st.st_size, st.st_mtime_ns).encode("utf-8"))
+    return digest.hexdigest()
+
+def content_hash(addon_dir, files):
+    """SHA-256 over the relative paths and contents of all addon files."""
+    digest = hashlib.sha256()
+    for rel in files:
+        digest.update(rel.encode("utf-8") + b"\0")
+        with open(os.path.join(addon_dir, rel), "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def read_addon_info(addon_dir):
+    """
+    Parses an addon's addon.xml.
+    :return: (addon id, version, repository index entry as an XML string)
+    """
+    addon_root = ET.parse(os.path.join(addon_dir, "addon.xml")).getroot()
+
+    # We need to remove the 'assets' tag as it's not needed in the repository index
+    # and copy the rest of the addon's XML structure.
+    addon_element = ET.Element(addon_root.tag, addon_root.attrib)
+    for child in addon_root:
+        if child.tag != "extension" or child.attrib.get("point") != "xbmc.addon.metadata":
+            addon_element.append(child)
+        else:
+            # Copy metadata extension, but remove assets
+            metadata_element = ET.Element(child.tag, child.attrib)
+            for meta_child in child:
+                if meta_child.tag != "assets":
+                    metadata_element.append(meta_child)
+            addon_element.append(metadata_element)
+
+    entry = ET.tostring(addon_element, encoding="unicode")
+    return addon_root.get("id"), addon_root.get("version"), entry
+
+def build_addon_zip(addon_dir, addon_id, version, files, out_root):
+    """
+    Packages one addon as <out_root>/<id>/<id>-<version>.zip (plus .md5 and
+    artwork). Runs in a worker process.
+    :return: path of the zip
+    """
+    out_dir = os.path.join(out_root, addon_id)
+    os.makedirs(out_dir, exist_ok=True)
+    zip_path = os.path.join(out_dir, "{0}-{1}.zip".format(addon_id, version))
+    tmp_path = zip_path + ".tmp"
+
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for rel in files:
+            info = zipfile.ZipInfo("{0}/{1}".format(addon_id, rel), date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with open(os.path.join(addon_dir, rel), "rb") as f:
+                archive.writestr(info, f.read())
+    os.replace(tmp_path, zip_path)
 
+    hash_md5 = hashlib.md5()
+    with open(zip_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            hash_md5.update(chunk)
+    with open(zip_path + ".md5", "w") as f:
+        f.write(hash_md5.hexdigest())
+
+    for asset in ASSET_FILES:
+        source = os.path.join(addon_dir, asset)
+        if os.path.exists(source):
+            shutil.copyfile(source, os.path.join(out_dir, asset))
+    return zip_path
+
+def load_manifest():
+    path = os.path.join(REPO_FILES_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
     try:
-        # Parse the video addon's addon.xml
-        addon_tree = ET.parse(addon_xml_path)
-        addon_root = addon_tree.getroot()
-        
-        # 2. Create the root element for the repository's addons.xml
-        addons_root = ET.Element("addons")
-        
-        # 3. Copy the video addon's XML content into the repository's addons.xml
-        # We need to remove the 'assets' tag as it's not needed in the repository index
-        # and copy the rest of the addon's XML structure.
-        
-        # Create a deep copy of the addon element
-        addon_element = ET.Element(addon_root.tag, addon_root.attrib)
-        for child in addon_root:
-            if child.tag != "extension" or child.attrib.get("point") != "xbmc.addon.metadata":
-                addon_element.append(child)
-            else:
-                # Copy metadata extension, but remove assets
-                metadata_element = ET.Element(child.tag, child.attrib)
-                for meta_child in child:
-                    if meta_child.tag != "assets":
-                        metadata_element.append(meta_child)
-                addon_element.append(metadata_element)
-        
-        addons_root.append(addon_element)
-        
-        # 4. Add the repository addon's own metadata (if needed, but usually not)
-        # For simplicity, we'll only include the video addon for now.
-        
-        # 5. Write the final addons.xml file
-        addons_xml_path = os.path.join(REPO_FILES_DIR, "addons.xml")
-        
-        # Use minidom to pretty-print the XML
-        xml_string = ET.tostring(addons_root, encoding="utf-8")
-        dom = minidom.parseString(xml_string)
-        pretty_xml = dom.toprettyxml(indent="    ", encoding="utf-8")
-        
-        # Remove the extra blank lines minidom adds
-        pretty_xml_lines = pretty_xml.decode().split('\n')
-        clean_xml = '\n'.join([line for line in pretty_xml_lines if line.strip()])
-        
-        with open(addons_xml_path, "w", encoding="utf-8") as f:
-            f.write(clean_xml)
-            
-        print(f"Successfully created {addons_xml_path}")
-        return True
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest {path}: {e}")
+        return {}
 
-    except Exception as e:
-        print(f"An error occurred during XML generation: {e}")
-        return False
+def save_manifest(manifest):
+    path = os.path.join(REPO_FILES_DIR, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+class _ChecksumWriter:
+    """
+    Writes the same bytes to a plain and a gzip file and hashes both on the
+    way through, so the outputs never have to be read back.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.plain = open(path + ".tmp", "wb")
+        self.raw_gz = open(path + ".gz.tmp", "wb")
+        # mtime=0 and no file name keep the .gz byte-identical between runs
+        self.gz_out = _HashingFile(self.raw_gz)
+        self.gz = gzip.GzipFile(filename="", mode="wb", fileobj=self.gz_out, mtime=0)
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.plain.write(data)
+        self.gz.write(data)
+        self.md5.update(data)
+        self.size += len(data)
+
+    def close(self):
+        self.gz.close()
+        self.plain.close()
+        self.raw_gz.close()
+        os.replace(self.path + ".tmp", self.path)
+        os.replace(self.path + ".gz.tmp", self.path + ".gz")
+
+    def abort(self):
+        for handle in (self.gz, self.plain, self.raw_gz):
+            try:
+                handle.close()
+            except Exception:
+                pass
+        for tmp in (self.path + ".tmp", self.path + ".gz.tmp"):
+            if os.path.exists(tmp):
+                os.remove(tmp)
 
-def generate_md5_checksum():
+class _HashingFile:
+    """File wrapper that counts and MD5-hashes what is written to it."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def write(self, data):
+        self.md5.update(data)
+        self.size += len(data)
+        return self.handle.write(data)
+
+    def flush(self):
+        self.handle.flush()
+
+def generate_addons_xml(entries):
     """
-    Calculates the MD5 checksum of addons.xml and writes it to addons.xml.md5.
+    Writes addons.xml, addons.xml.gz (the index Kodi fetches, as the
+    repository declares compressed="true") and their .md5 files in one pass.
+    Each entry is parsed, indented and written on its own, so memory use
+    does not grow with the number of addons.
+    :param entries: addon XML strings, in output order
     """
-    print("--- Generating MD5 Checksum ---")
+    print(f"--- Generating addons.xml for {len(entries)} addons ---")
+
     addons_xml_path = os.path.join(REPO_FILES_DIR, "addons.xml")
-    md5_path = os.path.join(REPO_FILES_DIR, "addons.xml.md5")
-    
-    if not os.path.exists(addons_xml_path):
-        print(f"Error: addons.xml not found at {addons_xml_path}")
-        return False
-        
+    writer = _ChecksumWriter(addons_xml_path)
     try:
-        hash_md5 = hashlib.md5()
-        with open(addons_xml_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        
-        checksum = hash_md5.hexdigest()
-        
-        with open(md5_path, "w") as f:
-            f.write(checksum)
-            
-        print(f"Successfully created {md5_path} with checksum: {checksum}")
-        return True
-        
+        writer.write('<?xml version="1.0" encoding="utf-8"?>\n<addons>\n')
+        for entry in entries:
+            addon_element = ET.fromstring(entry)
+            ET.indent(addon_element, space="    ", level=1)
+            writer.write("    " + ET.tostring(addon_element, encoding="unicode").rstrip() + "\n")
+        writer.write("</addons>\n")
+        writer.close()
     except Exception as e:
-        print(f"An error occurred during MD5 generation: {e}")
+        writer.abort()
+        print(f"An error occurred during XML generation: {e}")
         return False
 
+    checksums = (
+        (addons_xml_path + ".md5", writer.md5.hexdigest(), writer.size),
+        (addons_xml_path + ".gz.md5", writer.gz_out.md5.hexdigest(), writer.gz_out.size),
+    )
+    for md5_path, checksum, size in checksums:
+        with open(md5_path, "w") as f:
+            f.write(checksum)
+        print(f"Successfully created {md5_path[:-4]} ({size} bytes) with checksum: {checksum}")
+    return True
+
+def build_repository(force=False, jobs=None):
+    """
+    Brings repository_files up to date with the addon directories.
+    Only addons whose content hash changed are re-zipped (in parallel), and
+    addons.xml is only rewritten when an index entry changed.
+    :return: True on success
+    """
+    manifest = load_manifest()
+    new_manifest = {}
+    to_build = []
+
+    for addon_dir in discover_addons():
+        try:
+            addon_id, version, entry = read_addon_info(addon_dir)
+        except ET.ParseError as e:
+            print(f"Skipping {addon_dir}: invalid addon.xml ({e})")
+            continue
+        if addon_id in new_manifest:
+            print(f"Skipping {addon_dir}: duplicate addon id {addon_id}")
+            continue
+
+        files = list_addon_files(addon_dir)
+        previous = manifest.get(addon_id, {})
+        signature = stat_signature(addon_dir, files)
+        if signature == previous.get("stat") and not force:
+            digest = previous.get("hash")
+        else:
+            digest = content_hash(addon_dir, files)
+
+        record = {"dir": addon_dir, "version": version, "hash": digest, "stat": signature, "entry": entry,
+                  "zip": os.path.join(addon_id, "{0}-{1}.zip".format(addon_id, version))}
+        new_manifest[addon_id] = record
+
+        unchanged = (previous.get("hash") == digest and previous.get("version") == version
+                     and os.path.exists(os.path.join(REPO_FILES_DIR, record["zip"])))
+        if force or not unchanged:
+            to_build.append((addon_dir, addon_id, version, files))
+        else:
+            print(f"Unchanged: {addon_id} {version}")
+
+    ok = True
+    if to_build:
+        print(f"--- Packaging {len(to_build)} addon(s) ---")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(build_addon_zip, addon_dir, addon_id, version, files, REPO_FILES_DIR): addon_id
+                for addon_dir, addon_id, version, files in to_build
+            }
+            for future, addon_id in futures.items():
+                try:
+                    print(f"Built {future.result()}")
+                except Exception as e:
+                    print(f"An error occurred while packaging {addon_id}: {e}")
+                    # The last published zip is still there; keep offering it.
+                    previous = manifest.get(addon_id) or {}
+                    if previous.get("zip") and os.path.isfile(os.path.join(REPO_FILES_DIR, previous["zip"])):
+                        print(f"Keeping the published {previous['zip']} in addons.xml")
+                        new_manifest[addon_id] = previous
+                    else:
+                        new_manifest.pop(addon_id, None)
+                    ok = False
+
+    old_entries = [manifest[addon_id].get("entry") for addon_id in sorted(manifest)]
+    new_entries = [new_manifest[addon_id]["entry"] for addon_id in sorted(new_manifest)]
+    addons_xml_missing = not os.path.exists(os.path.join(REPO_FILES_DIR, "addons.xml"))
+    if force or addons_xml_missing or old_entries != new_entries:
+        ok = generate_addons_xml(new_entries) and ok
+    else:
+        print("addons.xml is up to date")
+
+    save_manifest(new_manifest)
+    return ok
+
 def main():
     """
     Main function to run the repository generation process.
     """
+    parser = argparse.ArgumentParser(description="Builds the PenguinSurf Kodi repository files.")
+    parser.add_argument("--force", action="store_true", help="rebuild every addon and addons.xml")
+    parser.add_argument("--jobs", type=int, default=None, help="packaging processes (default: CPU count)")
+    args = parser.parse_args()
+
     # Ensure the repository files directory exists
     os.makedirs(REPO_FILES_DIR, exist_ok=True)
-    
-    if generate_addons_xml():
-        generate_md5_checksum()
-    
+
+    ok = build_repository(force=args.force, jobs=args.jobs)
+
     print("--- Repository Generation Complete ---")
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
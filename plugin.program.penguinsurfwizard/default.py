@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Module: default
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import json
+import os
+import xbmc
+import xbmcaddon
+import xbmcgui
+import xbmcvfs
+from . import installer
+
+# Get addon info
+ADDON = xbmcaddon.Addon()
+ADDON_ID = ADDON.getAddonInfo('id')
+ADDON_NAME = ADDON.getAddonInfo('name')
+ADDON_PROFILE = xbmcvfs.translatePath(ADDON.getAddonInfo('profile'))
+
+# --- Configuration ---
+# Where Kodi looks for installed addons
+ADDONS_DIR = xbmcvfs.translatePath('special://home/addons')
+# Partial downloads are kept here so a cancelled run can resume
+DOWNLOAD_DIR = os.path.join(ADDON_PROFILE, 'downloads')
+
+
+def installed_version(addon_id):
+    """Version of an installed addon, or None when it is not installed."""
+    if not xbmc.getCondVisibility('System.HasAddon({0})'.format(addon_id)):
+        return None
+    try:
+        return xbmcaddon.Addon(addon_id).getAddonInfo('version')
+    except RuntimeError:
+        # Installed but disabled
+        return None
+
+
+def enable_addon(addon_id):
+    """Addons unpacked by hand start out disabled in Kodi 19+."""
+    xbmc.executeJSONRPC(json.dumps({
+        'jsonrpc': '2.0', 'id': 1, 'method': 'Addons.SetAddonEnabled',
+        'params': {'addonid': addon_id, 'enabled': True},
+    }))
+
+
+def run_wizard(base_url=installer.REPO_BASE_URL):
+    """
+    Installs or updates every PenguinSurf addon, dependencies first, behind
+    a single progress dialog.
+    :return: ids of the installed addons
+    """
+    dialog = xbmcgui.Dialog()
+    engine = installer.Installer(ADDONS_DIR, DOWNLOAD_DIR, base_url, installed_version)
+    try:
+        plan = engine.plan(skip=(ADDON_ID,))
+    except (installer.InstallError, OSError) as e:
+        xbmc.log(f"Could not read the PenguinSurf repository: {e}", xbmc.LOGERROR)
+        dialog.ok(ADDON_NAME, 'Could not read the PenguinSurf repository.')
+        return []
+    if not plan:
+        dialog.ok(ADDON_NAME, 'Every PenguinSurf addon is up to date.')
+        return []
+    if not dialog.yesno(ADDON_NAME, 'Install or update: {0}?'.format(', '.join(p.name for p in plan))):
+        return []
+
+    progress = xbmcgui.DialogProgress()
+    progress.create(ADDON_NAME, 'Downloading...')
+
+    def on_progress(percent, finished, total):
+        if progress.iscanceled():
+            return False
+        if percent < 90:
+            progress.update(percent, 'Downloaded {0} of {1} addons'.format(finished, total))
+        else:
+            progress.update(percent, 'Installing...')
+        return True
+
+    try:
+        installed = engine.run(plan, on_progress)
+    except installer.InstallCancelled:
+        dialog.notification(ADDON_NAME, 'Installation cancelled; it will resume next time.',
+                            xbmcgui.NOTIFICATION_INFO, 5000)
+        return []
+    except (installer.InstallError, OSError) as e:
+        xbmc.log(f"PenguinSurf installation failed: {e}", xbmc.LOGERROR)
+        dialog.ok(ADDON_NAME, 'Installation failed: {0}'.format(e))
+        return []
+    finally:
+        progress.close()
+
+    xbmc.executebuiltin('UpdateLocalAddons', True)
+    for addon_id in installed:
+        enable_addon(addon_id)
+    dialog.ok(ADDON_NAME, 'Installed {0} addons.'.format(len(installed)))
+    return installed
+
+
+if __name__ == '__main__':
+    run_wizard()
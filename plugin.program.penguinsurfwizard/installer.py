@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+# Module: installer
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import hashlib
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# NOTE: The wizard is what installs script.module.requests & co., so this
+# module only uses the standard library.
+
+# --- Configuration ---
+# Where generate_repo.py publishes addons.xml and the addon zips
+REPO_BASE_URL = "https://hadimariaali-droid.github.io/PenguinSurf/repository_files/"
+# Zips downloaded at the same time
+DEFAULT_WORKERS = 3
+# Attempts per zip; every retry resumes where the last one stopped
+DOWNLOAD_ATTEMPTS = 4
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 20
+USER_AGENT = "PenguinSurfWizard/1.0"
+
+
+class InstallError(Exception):
+    """Raised when the suite cannot be installed (bad index, checksum, cycle...)."""
+
+
+class InstallCancelled(InstallError):
+    """Raised when the user cancels the installation."""
+
+
+class AddonPackage:
+    """One <addon> entry of the repository's addons.xml."""
+
+    __slots__ = ('id', 'version', 'requires', 'name')
+
+    def __init__(self, addon_id, version, requires=(), name=None):
+        self.id = addon_id
+        self.version = version
+        self.requires = tuple(requires)
+        self.name = name or addon_id
+
+    @property
+    def zip_path(self):
+        """Path of the zip below the repository base URL."""
+        return '{0}/{0}-{1}.zip'.format(self.id, self.version)
+
+    def __repr__(self):
+        return 'AddonPackage({0!r}, {1!r})'.format(self.id, self.version)
+
+
+def parse_addons_xml(data):
+    """
+    Reads a repository index.
+    :return: dict {addon id: AddonPackage}
+    """
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        raise InstallError('Invalid addons.xml: {0}'.format(e))
+    packages = {}
+    for addon in root.iter('addon'):
+        requires = [imp.get('addon') for imp in addon.findall('./requires/import')
+                    if imp.get('addon') and imp.get('optional') != 'true']
+        packages[addon.get('id')] = AddonPackage(addon.get('id'), addon.get('version'), requires, addon.get('name'))
+    return packages
+
+
+def version_tuple(version):
+    parts = []
+    for part in (version or '').split('.'):
+        digits = ''.join(ch for ch in part if ch.isdigit())
+        parts.append(int(digits) if digits else 0)
+    return tuple(parts)
+
+
+def install_order(packages, targets):
+    """
+    Orders the targets and their dependencies so every addon comes after
+    the addons it imports. Dependencies that are not in this repository
+    (xbmc.python, script.module.requests...) are left to Kodi.
+    :return: list of AddonPackage
+    :raises InstallError: on a dependency cycle or an unknown target
+    """
+    order = []
+    state = {}
+
+    def visit(addon_id, path):
+        if state.get(addon_id) == 'done':
+            return
+        if state.get(addon_id) == 'visiting':
+            raise InstallError('Dependency cycle: {0}'.format(' -> '.join(path + [addon_id])))
+        state[addon_id] = 'visiting'
+        package = packages[addon_id]
+        for dependency in package.requires:
+            if dependency in packages:
+                visit(dependency, path + [addon_id])
+        state[addon_id] = 'done'
+        order.append(package)
+
+    for target in targets:
+        if target not in packages:
+            raise InstallError('{0} is not in the repository'.format(target))
+        visit(target, [])
+    return order
+
+
+class Progress:
+    """
+    Byte counters shared by the download threads. The UI thread reads
+    snapshot(); the workers only add to it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = {}
+        self.done = {}
+        self.finished = set()
+        self.cancelled = threading.Event()
+
+    def expect(self, addon_id, size):
+        with self._lock:
+            self.total[addon_id] = size
+
+    def advance(self, addon_id, count):
+        with self._lock:
+            self.done[addon_id] = self.done.get(addon_id, 0) + count
+
+    def restart(self, addon_id, count=0):
+        with self._lock:
+            self.done[addon_id] = count
+
+    def finish(self, addon_id):
+        with self._lock:
+            self.finished.add(addon_id)
+
+    def snapshot(self):
+        """:return: (bytes done, bytes expected so far, finished addon ids)"""
+        with self._lock:
+            return sum(self.done.values()), sum(self.total.values()), set(self.finished)
+
+
+def _open(url, headers=None):
+    request = urllib.request.Request(url, headers=dict({'User-Agent': USER_AGENT}, **(headers or {})))
+    return urllib.request.urlopen(request, timeout=TIMEOUT)
+
+
+def _hash_file(path, digest):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+
+def download(url, path, expected_md5, progress=None, key=None):
+    """
+    Downloads url to path, resuming a previous partial download with an
+    HTTP Range request and computing the MD5 while the bytes arrive.
+    :raises InstallError: if the checksum does not match or the transfer fails
+    :raises InstallCancelled: if progress.cancelled is set
+    """
+    part_path = path + '.part'
+    if expected_md5 and os.path.exists(path):
+        # Finished by a run that was cancelled before unpacking
+        digest = hashlib.md5()
+        _hash_file(path, digest)
+        if digest.hexdigest() == expected_md5:
+            return path
+    last_error = None
+    for _ in range(DOWNLOAD_ATTEMPTS):
+        digest = hashlib.md5()
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': 'bytes={0}-'.format(offset)} if offset else {}
+        try:
+            response = _open(url, headers)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # The part file already holds the whole zip.
+                response = None
+            else:
+                last_error = e
+                continue
+        except (urllib.error.URLError, OSError) as e:
+            last_error = e
+            continue
+
+        if response is not None and response.status == 206:
+            # Resuming: hash what we already have, then append.
+            _hash_file(part_path, digest)
+            mode = 'ab'
+            length = int(response.headers.get('Content-Length') or 0)
+            if progress:
+                progress.expect(key, offset + length)
+                progress.restart(key, offset)
+        elif response is not None:
+            # Full body (no Range support, or a fresh start)
+            offset = 0
+            mode = 'wb'
+            if progress:
+                progress.expect(key, int(response.headers.get('Content-Length') or 0))
+                progress.restart(key)
+        else:
+            _hash_file(part_path, digest)
+            mode = None
+
+        try:
+            if mode is not None:
+                with response, open(part_path, mode) as f:
+                    for chunk in iter(lambda: response.read(CHUNK_SIZE), b''):
+                        if progress and progress.cancelled.is_set():
+                            raise InstallCancelled('Cancelled')
+                        f.write(chunk)
+                        digest.update(chunk)
+                        if progress:
+                            progress.advance(key, len(chunk))
+        except (urllib.error.URLError, OSError) as e:
+            last_error = e
+            continue
+
+        if expected_md5 and digest.hexdigest() != expected_md5:
+            # Corrupt (or changed upstream): start from scratch next time.
+            os.remove(part_path)
+            last_error = InstallError('Checksum mismatch for {0}'.format(url))
+            continue
+        os.replace(part_path, path)
+        return path
+    raise InstallError('Download of {0} failed: {1}'.format(url, last_error))
+
+
+def extract_addon(zip_path, addon_id, addons_dir):
+    """
+    Unpacks an addon zip into addons_dir/<addon_id>, replacing an older
+    copy only once the new one is fully extracted.
+    """
+    target = os.path.join(addons_dir, addon_id)
+    staging = os.path.join(addons_dir, '.{0}.installing'.format(addon_id))
+    shutil.rmtree(staging, ignore_errors=True)
+    with zipfile.ZipFile(zip_path) as archive:
+        for name in archive.namelist():
+            parts = name.replace('\\', '/').split('/')
+            if parts[0] != addon_id or '..' in parts or name.startswith('/'):
+                raise InstallError('Unexpected path {0!r} in {1}'.format(name, os.path.basename(zip_path)))
+        archive.extractall(staging)
+    old = target + '.old'
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(target):
+        os.rename(target, old)
+    os.rename(os.path.join(staging, addon_id), target)
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+class Installer:
+    """
+    Installs the PenguinSurf suite from the repository.
+
+    plan() reads addons.xml and orders the missing or outdated addons by
+    their dependencies; run() downloads all of their zips concurrently
+    (resumable, MD5-checked while streaming) and then unpacks them in
+    dependency order.
+    """
+
+    def __init__(self, addons_dir, download_dir, base_url=REPO_BASE_URL,
+                 installed_version=None, workers=DEFAULT_WORKERS):
+        self.addons_dir = addons_dir
+        self.download_dir = download_dir
+        self.base_url = base_url.rstrip('/') + '/'
+        self.installed_version = installed_version or (lambda addon_id: None)
+        self.workers = workers
+        self.packages = None
+
+    def load_index(self):
+        with _open(self.base_url + 'addons.xml') as response:
+            self.packages = parse_addons_xml(response.read())
+        return self.packages
+
+    def plan(self, targets=None, skip=()):
+        """
+        :param targets: addon ids to install, every addon of the repository by default
+        :param skip: addon ids never to install (e.g. the wizard itself)
+        :return: AddonPackages to install, dependencies first
+        """
+        packages = self.packages or self.load_index()
+        if targets is None:
+            targets = sorted(addon_id for addon_id in packages if addon_id not in skip)
+        plan = []
+        for package in install_order(packages, targets):
+            installed = self.installed_version(package.id)
+            if installed is None or version_tuple(installed) < version_tuple(package.version):
+                plan.append(package)
+        return plan
+
+    def _expected_md5(self, package):
+        try:
+            with _open(self.base_url + package.zip_path + '.md5') as response:
+                return response.read().decode('ascii', 'ignore').split()[0].lower()
+        except (urllib.error.URLError, OSError, IndexError):
+            # Older repositories have no per-zip checksums.
+            return None
+
+    def _download(self, package, progress):
+        expected = self._expected_md5(package)
+        path = os.path.join(self.download_dir, os.path.basename(package.zip_path))
+        download(self.base_url + package.zip_path, path, expected, progress, package.id)
+        progress.finish(package.id)
+        return path
+
+    def run(self, plan, on_progress=None, poll_interval=0.25):
+        """
+        Downloads and installs the planned addons.
+        :param on_progress: called as on_progress(percent, finished, total) from
+            the calling thread; returning False cancels the installation
+        :return: ids of the installed addons, in installation order
+        :raises InstallCancelled: if on_progress asked to stop
+        """
+        if not plan:
+            return []
+        os.makedirs(self.download_dir, exist_ok=True)
+        os.makedirs(self.addons_dir, exist_ok=True)
+        progress = Progress()
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='wizard-download')
+        try:
+            futures = {pool.submit(self._download, package, progress): package for package in plan}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Surface the first failure right away.
+                    future.result()
+                if on_progress is not None:
+                    done_bytes, total_bytes, finished = progress.snapshot()
+                    # Downloads take 90% of the bar, unpacking the rest.
+                    percent = int(90 * done_bytes / total_bytes) if total_bytes else 0
+                    if on_progress(percent, len(finished), len(plan)) is False:
+                        progress.cancelled.set()
+                        raise InstallCancelled('Cancelled')
+            paths = {futures[future].id: future.result() for future in futures}
+        except BaseException:
+            # Stop the other downloads; their .part files stay for a resume.
+            progress.cancelled.set()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+        installed = []
+        for position, package in enumerate(plan):
+            extract_addon(paths[package.id], package.id, self.addons_dir)
+            os.remove(paths[package.id])
+            installed.append(package.id)
+            if on_progress is not None:
+                on_progress(90 + int(10 * (position + 1) / len(plan)), len(plan), len(plan))
+        return installed
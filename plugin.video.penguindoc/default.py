@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+# Module: default
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import os
+import sys
+import threading
+import time
+import urllib.parse
+import xbmc
+import xbmcaddon
+import xbmcgui
+import xbmcplugin
+import xbmcvfs
+from script.module.scrapepenguin.lib.archivesync import CollectionStore
+from script.module.scrapepenguin.lib.directory import render_directory
+from script.module.scrapepenguin.lib.memory import budget, budget_from_setting
+from script.module.scrapepenguin.lib.metrics import METRICS_FILE, metrics, set_debug
+
+# Get the plugin url in proper encoding
+__url__ = sys.argv[0]
+# Get the plugin handle as an integer number
+__handle__ = int(sys.argv[1])
+
+# Get addon info
+ADDON = xbmcaddon.Addon()
+ADDON_ID = ADDON.getAddonInfo('id')
+ADDON_NAME = ADDON.getAddonInfo('name')
+ADDON_PROFILE = xbmcvfs.translatePath(ADDON.getAddonInfo('profile'))
+
+set_debug(ADDON.getSetting('debug_mode') == 'true')
+# PenguinDoc has no settings: the budget is always picked automatically
+budget.configure(budget_from_setting(''))
+metrics.configure(os.path.join(ADDON_PROFILE, METRICS_FILE))
+
+# --- Configuration ---
+ARCHIVE_BASE_URL = "https://archive.org"
+# Archive.org collection browsed by the addon, and the clause narrowing it to videos
+COLLECTION = "prelinger"
+COLLECTION_QUERY = "mediatype:(movies)"
+# Local copy of the collection
+COLLECTION_FILE = "collection.db"
+# Cached item metadata, used to pick a playable file
+CACHE_FILE = "archive_cache.db"
+# Seconds after which opening the addon refreshes the collection in the background
+SYNC_INTERVAL = 24 * 60 * 60
+ITEMS_PER_PAGE = 50
+
+_store = None
+
+def get_store():
+    """Returns the local collection store, opening it on first use."""
+    global _store
+    if _store is None:
+        _store = CollectionStore(os.path.join(ADDON_PROFILE, COLLECTION_FILE), base_url=ARCHIVE_BASE_URL)
+    return _store
+
+def get_url(**kwargs):
+    """
+    Create a URL for calling the plugin recursively from the Kodi interface.
+    :param kwargs: keyword arguments to be passed as URL parameters
+    :return: plugin URL
+    :rtype: str
+    """
+    return '{0}?{1}'.format(__url__, urllib.parse.urlencode(kwargs))
+
+def sync_collection(full=None):
+    """
+    Runs a sync of the collection (incremental unless a full pass is due).
+    :return: the sync statistics, or None if Archive.org could not be reached
+    """
+    from script.module.scrapepenguin.lib.scrapepenguin import Scraper
+    try:
+        return get_store().sync(Scraper.http(), COLLECTION, query=COLLECTION_QUERY, full=full)
+    except IOError as e:
+        xbmc.log(f"{ADDON_ID}: {e}", xbmc.LOGWARNING)
+        return None
+
+def _refresh_if_due():
+    state = get_store().state(COLLECTION)
+    if state['synced_at'] is None:
+        # Nothing to browse yet: the first pass has to finish before listing.
+        xbmcgui.Dialog().notification(ADDON_NAME, 'Downloading the catalogue...', xbmcgui.NOTIFICATION_INFO, 3000)
+        sync_collection()
+    elif time.time() - state['synced_at'] > SYNC_INTERVAL:
+        # Not a daemon thread: the plugin process waits for it before exiting.
+        threading.Thread(target=sync_collection, name='collection-sync').start()
+
+def list_root_menu():
+    """
+    Lists the browsing orders and the languages of the synced collection.
+    """
+    _refresh_if_due()
+    items = [
+        {'label': 'Most Popular', 'url': get_url(action='list_items', order='downloads'), 'is_folder': True,
+         'art': {'icon': 'DefaultMovies.png'}},
+        {'label': 'Recently Added', 'url': get_url(action='list_items', order='added'), 'is_folder': True,
+         'art': {'icon': 'DefaultRecentlyAddedMovies.png'}},
+        {'label': 'A-Z', 'url': get_url(action='list_items', order='title'), 'is_folder': True,
+         'art': {'icon': 'DefaultMovieTitle.png'}},
+    ]
+    for language, count in get_store().languages(COLLECTION):
+        items.append({'label': '{0} ({1})'.format(language.title(), count), 'is_folder': True,
+                      'url': get_url(action='list_items', order='downloads', language=language),
+                      'art': {'icon': 'DefaultLanguage.png'}})
+    items.append({'label': 'Refresh Catalogue', 'url': get_url(action='refresh'),
+                  'art': {'icon': 'DefaultAddonsUpdates.png'}, 'properties': {'IsPlayable': 'false'}})
+    render_directory(__handle__, items, cache_to_disc=False)
+
+def list_items(order='downloads', language=None, page=1):
+    """
+    Lists one page of documentaries from the local store; no request is made.
+    """
+    offset = (page - 1) * ITEMS_PER_PAGE
+    documentaries = get_store().browse(COLLECTION, language=language, order=order,
+                                       limit=ITEMS_PER_PAGE + 1, offset=offset)
+    items = [
+        {'label': doc.title, 'url': get_url(action='play', identifier=doc.identifier), 'playable': True,
+         'art': {'thumb': '{0}/services/img/{1}'.format(ARCHIVE_BASE_URL, doc.identifier)},
+         'info': {'title': doc.title, 'plot': doc.description, 'year': doc.year, 'mediatype': 'movie'}}
+        for doc in documentaries[:ITEMS_PER_PAGE]
+    ]
+    if len(documentaries) > ITEMS_PER_PAGE:
+        next_params = {'action': 'list_items', 'order': order, 'page': page + 1}
+        if language:
+            next_params['language'] = language
+        items.append({'label': 'Next page ({0})'.format(page + 1), 'url': get_url(**next_params),
+                      'is_folder': True, 'art': {'icon': 'DefaultFolder.png'}})
+    render_directory(__handle__, items, content='movies',
+                     sort_methods=(xbmcplugin.SORT_METHOD_UNSORTED, xbmcplugin.SORT_METHOD_LABEL,
+                                   xbmcplugin.SORT_METHOD_VIDEO_YEAR))
+
+def play(identifier):
+    """
+    Resolves the playable file of an item that this connection streams best.
+    """
+    from script.module.scrapepenguin.lib.archive import ArchiveResolver
+    from script.module.scrapepenguin.lib.cache import ResponseCache
+    from script.module.scrapepenguin.lib.scrapepenguin import Scraper
+    resolver = ArchiveResolver(ResponseCache(os.path.join(ADDON_PROFILE, CACHE_FILE)), Scraper.http(),
+                               base_url=ARCHIVE_BASE_URL, probe=True)
+    stream_url = resolver.stream_url(identifier)
+    if stream_url:
+        xbmcplugin.setResolvedUrl(__handle__, True, xbmcgui.ListItem(path=stream_url))
+    else:
+        xbmcgui.Dialog().notification(ADDON_NAME, 'No playable file found.', xbmcgui.NOTIFICATION_INFO, 5000)
+        xbmcplugin.setResolvedUrl(__handle__, False, xbmcgui.ListItem())
+
+def refresh():
+    """
+    Syncs the collection now, in the foreground.
+    """
+    result = sync_collection()
+    if result is None:
+        xbmcgui.Dialog().notification(ADDON_NAME, 'Archive.org could not be reached.', xbmcgui.NOTIFICATION_ERROR, 5000)
+        return
+    xbmcgui.Dialog().notification(ADDON_NAME, '{0} new or updated documentaries.'.format(result['items']),
+                                  xbmcgui.NOTIFICATION_INFO, 5000)
+    xbmc.executebuiltin('Container.Refresh')
+
+def router(paramstring):
+    """
+    Router function that calls the appropriate action function.
+    :param paramstring: URL parameter string
+    :type paramstring: str
+    """
+    params = dict(urllib.parse.parse_qsl(paramstring))
+    action = params.get('action')
+    with metrics.timer('action ' + (action or 'root')):
+        # A play URL without an identifier falls back to the root listing.
+        if action is None or (action == 'play' and not params.get('identifier')):
+            list_root_menu()
+        elif action == 'list_items':
+            page = params.get('page', '1')
+            page = int(page) if page.isdigit() and int(page) > 0 else 1
+            list_items(params.get('order', 'downloads'), params.get('language'), page)
+        elif action == 'play':
+            play(params['identifier'])
+        elif action == 'refresh':
+            refresh()
+        else:
+            xbmcgui.Dialog().notification(ADDON_NAME, 'Unknown action: {0}'.format(action),
+                                          xbmcgui.NOTIFICATION_ERROR, 5000)
+    metrics.flush()
+
+if __name__ == '__main__':
+    router(sys.argv[2][1:])
@@ -4,14 +4,20 @@
 # Created: 2025-12-16
 # License: GPL-3.0-or-later
 
+import os
 import sys
 import xbmcaddon
 import xbmcplugin
 import xbmcgui
 import urllib.parse
 import xbmc
-from . import scraper
-from script.module.scrapepenguin.lib.scrapepenguin import Scraper
+import xbmcvfs
+from script.module.scrapepenguin.lib.directory import render_directory
+from script.module.scrapepenguin.lib.memory import budget, budget_from_setting
+from script.module.scrapepenguin.lib.metrics import METRICS_FILE, cache_hit_ratio, log_debug, metrics, set_debug
+# NOTE: scraper and ScrapePenguin pull in the network stack (requests, SQLite
+# cache, thread pools). They are imported inside the actions that need them so
+# the root and category menus open without paying for those imports.
 
 # Get the plugin url in proper encoding
 __url__ = sys.argv[0]
@@ -24,6 +30,15 @@ ADDON_ID = ADDON.getAddonInfo('id')
 ADDON_NAME = ADDON.getAddonInfo('name')
 ADDON_VERSION = ADDON.getAddonInfo('version')
 ADDON_PATH = ADDON.getAddonInfo('path')
+ADDON_PROFILE = xbmcvfs.translatePath(ADDON.getAddonInfo('profile'))
+
+# Verbose logging only costs anything when debug_mode is on
+set_debug(ADDON.getSetting('debug_mode') == 'true')
+# Caches and loaders opened by this invocation shrink to fit
+budget.configure(budget_from_setting(ADDON.getSetting('memory_budget')))
+metrics.configure(os.path.join(ADDON_PROFILE, METRICS_FILE))
+# Where the Diagnostics view exports its numbers
+DIAGNOSTICS_EXPORT_FILE = "diagnostics.json"
 
 def get_url(**kwargs):
     """
@@ -34,149 +49,306 @@ def get_url(**kwargs):
     """
     return '{0}?{1}'.format(__url__, urllib.parse.urlencode(kwargs))
 
+# --- Directory Snapshots ---
+# Listings built from TMDB data are stored as rendered, keyed by their plugin
+# URL, and replayed on the next visit (e.g. going back) without the scraper.
+# Replays skip the prefetching the listing would trigger; it ran the first time.
+SNAPSHOT_FILE = "snapshots.db"
+SNAPSHOT_ACTIONS = ('list_items', 'list_seasons', 'list_episodes')
+SNAPSHOT_TTL = 30 * 60
+
+_snapshots = None
+# URL of the listing this invocation builds, if it is to be snapshotted
+_snapshot_url = None
+
+def _snapshot_fingerprint():
+    # Changes when the addon is updated, its settings are saved or the interface language changes.
+    try:
+        settings_mtime = os.path.getmtime(os.path.join(ADDON_PROFILE, 'settings.xml'))
+    except OSError:
+        settings_mtime = 0
+    return '{0}|{1}|{2}'.format(ADDON_VERSION, xbmc.getLanguage(), settings_mtime)
+
+def get_snapshots():
+    """Returns the snapshot cache, opening it on first use."""
+    global _snapshots
+    if _snapshots is None:
+        from script.module.scrapepenguin.lib.snapshot import SnapshotCache
+        _snapshots = SnapshotCache(os.path.join(ADDON_PROFILE, SNAPSHOT_FILE), _snapshot_fingerprint(),
+                                   ttl=SNAPSHOT_TTL)
+    return _snapshots
+
+def _local_art(items):
+    # Posters in the local cache are served from disk; checked on every render,
+    # as the cache may have evicted files since a snapshot was stored.
+    from script.module.scrapepenguin.lib.artwork import ARTWORK_DIR, local_art
+    return local_art(items, os.path.join(ADDON_PROFILE, ARTWORK_DIR))
+
+def _render_listing(items, **options):
+    """Renders a listing and snapshots it if this invocation is one of SNAPSHOT_ACTIONS."""
+    items = list(items)
+    render_directory(__handle__, _local_art(items), **options)
+    # After endOfDirectory: storing it does not delay the listing. The
+    # snapshot keeps the remote artwork URLs.
+    if _snapshot_url is not None:
+        get_snapshots().put(_snapshot_url, items, options)
+
+def _replay_snapshot(url):
+    """Renders the snapshot of a URL; returns False if there is none."""
+    snapshot = get_snapshots().get(url)
+    if snapshot is None:
+        metrics.increment('snapshot.miss')
+        return False
+    items, options = snapshot
+    metrics.increment('snapshot.hit')
+    log_debug("Replaying snapshot of {0}", url)
+    render_directory(__handle__, _local_art(items), **options)
+    return True
+
 def list_root_menu():
     """
     Create the main menu for the addon.
     """
     # The Crew features include: Movies, TV Shows, Sports, IPTV, Kids, Collections, Tools
     # We will start with the core features: Movies and TV Shows
-    
-    # Movies
-    list_item = xbmcgui.ListItem('Movies')
-    list_item.setArt({'icon': 'DefaultVideo.png'})
-    url = get_url(action='list_movies')
-    xbmcplugin.addDirectoryItem(__handle__, url, list_item, isFolder=True)
-
-    # TV Shows
-    list_item = xbmcgui.ListItem('TV Shows')
-    list_item.setArt({'icon': 'DefaultVideo.png'})
-    url = get_url(action='list_tvshows')
-    xbmcplugin.addDirectoryItem(__handle__, url, list_item, isFolder=True)
-
-    # Add-on Settings
-    list_item = xbmcgui.ListItem('Settings')
-    list_item.setArt({'icon': 'DefaultAddon.png'})
-    list_item.setProperty('IsPlayable', 'false')
-    xbmcplugin.addDirectoryItem(__handle__, 'plugin://{0}/settings'.format(ADDON_ID), list_item, isFolder=False)
-
-    # End of the list
-    xbmcplugin.endOfDirectory(__handle__)
+    items = [
+        {'label': 'Movies', 'url': get_url(action='list_movies'), 'is_folder': True,
+         'art': {'icon': 'DefaultVideo.png'}},
+        {'label': 'TV Shows', 'url': get_url(action='list_tvshows'), 'is_folder': True,
+         'art': {'icon': 'DefaultVideo.png'}},
+        {'label': 'Search', 'url': get_url(action='search'), 'is_folder': True,
+         'art': {'icon': 'DefaultAddonsSearch.png'}},
+        {'label': 'Diagnostics', 'url': get_url(action='diagnostics'), 'is_folder': True,
+         'art': {'icon': 'DefaultAddonInfoProvider.png'}},
+        # Add-on Settings
+        {'label': 'Settings', 'url': 'plugin://{0}/settings'.format(ADDON_ID),
+         'art': {'icon': 'DefaultAddon.png'}, 'properties': {'IsPlayable': 'false'}},
+    ]
+    render_directory(__handle__, items)
+
+def _list_categories(category, categories):
+    items = [
+        {'label': title, 'url': get_url(action='list_items', category=category, subcategory=slug),
+         'is_folder': True, 'art': {'icon': 'DefaultVideo.png'}}
+        for title, slug in categories
+    ]
+    render_directory(__handle__, items)
 
 def list_movies():
     """
-    Placeholder for listing movie categories/genres.
+    Lists the movie categories.
     """
-    # Example categories
-    categories = [
+    _list_categories('movies', [
         ('Popular Movies', 'popular'),
         ('Trending Movies', 'trending'),
         ('In Theaters', 'intheatres'),
         ('Genres', 'genres')
-    ]
-
-    for title, slug in categories:
-        list_item = xbmcgui.ListItem(title)
-        list_item.setArt({'icon': 'DefaultVideo.png'})
-        url = get_url(action='list_items', category='movies', subcategory=slug)
-        xbmcplugin.addDirectoryItem(__handle__, url, list_item, isFolder=True)
-
-    xbmcplugin.endOfDirectory(__handle__)
+    ])
 
 def list_tvshows():
     """
-    Placeholder for listing TV show categories/genres.
+    Lists the TV show categories.
     """
-    # Example categories
-    categories = [
+    _list_categories('tvshows', [
         ('Popular TV Shows', 'popular'),
         ('Trending TV Shows', 'trending'),
         ('Airing Today', 'airingtoday'),
         ('Genres', 'genres')
+    ])
+
+# Media type, title field, date field and Kodi content type for each category
+CATEGORY_MEDIA = {
+    'movies': ('movie', 'title', 'release_date', 'movies'),
+    'tvshows': ('tvshow', 'name', 'first_air_date', 'tvshows'),
+}
+
+# Sort methods offered on movie and TV show listings
+LISTING_SORT_METHODS = (
+    xbmcplugin.SORT_METHOD_UNSORTED,
+    xbmcplugin.SORT_METHOD_LABEL,
+    xbmcplugin.SORT_METHOD_VIDEO_YEAR,
+)
+
+def list_genres(category):
+    """
+    Lists the TMDB genres of a category as folders.
+    """
+    from . import scraper
+    items = [
+        {'label': genre.get('name'), 'is_folder': True, 'art': {'icon': 'DefaultGenre.png'},
+         'url': get_url(action='list_items', category=category, subcategory='genre', genre_id=genre.get('id'))}
+        for genre in scraper.get_genres(category)
     ]
+    _render_listing(items, sort_methods=(xbmcplugin.SORT_METHOD_LABEL,))
 
-    for title, slug in categories:
-        list_item = xbmcgui.ListItem(title)
-        list_item.setArt({'icon': 'DefaultVideo.png'})
-        url = get_url(action='list_items', category='tvshows', subcategory=slug)
-        xbmcplugin.addDirectoryItem(__handle__, url, list_item, isFolder=True)
+def _release_year(item, date_field):
+    year = (item.get(date_field) or '')[:4]
+    return int(year) if year.isdigit() else None
 
-    xbmcplugin.endOfDirectory(__handle__)
+def _media_item(item, mediatype, title_field, date_field, artwork):
+    title = item.get(title_field)
+    info = {'title': title, 'plot': item.get('overview'), 'mediatype': mediatype}
+    year = _release_year(item, date_field)
+    if year:
+        info['year'] = year
+    if mediatype == 'tvshow':
+        # Shows open into their seasons
+        return {'label': title, 'url': get_url(action='list_seasons', show_id=item.get('id')),
+                'is_folder': True, 'art': artwork(item), 'info': info}
+    url_params = {'action': 'resolve_item', 'item_id': item.get('id'), 'item_type': mediatype, 'title': title}
+    if year:
+        url_params['year'] = year
+    return {
+        'label': title,
+        # The URL for a playable item will point to the resolve_item action
+        'url': get_url(**url_params),
+        'playable': True,
+        'art': artwork(item),
+        'info': info,
+    }
 
-def list_items(category, subcategory):
+def list_items(category, subcategory, page=1, genre_id=None):
     """
     Lists actual movies or TV shows based on category and subcategory.
+    Every subcategory is served by the category engine in scraper, which
+    also prefetches the following pages.
+    """
+    log_debug("Listing items for category: {0}, subcategory: {1}, page: {2}", category, subcategory, page)
+
+    if subcategory == 'genres':
+        list_genres(category)
+        return
+
+    from . import scraper
+    if category not in CATEGORY_MEDIA or (category, subcategory) not in scraper.CATEGORY_ENDPOINTS:
+        xbmc.log(f"Unknown category: {category}/{subcategory}", xbmc.LOGWARNING)
+        xbmcplugin.endOfDirectory(__handle__, succeeded=False)
+        return
+    params = {'with_genres': genre_id} if genre_id else None
+    data = scraper.get_category_page(category, subcategory, page=page, params=params)
+    if data is None:
+        xbmc.log(f"Could not fetch {category}/{subcategory} page {page}", xbmc.LOGWARNING)
+        xbmcplugin.endOfDirectory(__handle__, succeeded=False)
+        return
+
+    mediatype, title_field, date_field, content = CATEGORY_MEDIA[category]
+    items = [_media_item(item, mediatype, title_field, date_field, scraper.artwork_for)
+             for item in data.get('results', [])]
+
+    # TMDB serves at most TMDB_MAX_PAGE pages, whatever total_pages says.
+    if page < min(data.get('total_pages', 1), scraper.TMDB_MAX_PAGE):
+        next_params = {'action': 'list_items', 'category': category, 'subcategory': subcategory, 'page': page + 1}
+        if genre_id:
+            next_params['genre_id'] = genre_id
+        items.append({'label': 'Next page ({0})'.format(page + 1), 'url': get_url(**next_params),
+                      'is_folder': True, 'art': {'icon': 'DefaultFolder.png'}})
+
+    # Listings change over time; freshness is handled by the response cache.
+    _render_listing(items, content=content, sort_methods=LISTING_SORT_METHODS, cache_to_disc=False)
+
+    # The directory is already shown; let the service resolve these streams
+    # and cache the thumbnails for the next visit. For shows, the first
+    # season of the top entries is loaded as well.
+    if mediatype == 'tvshow':
+        scraper.prefetch_first_seasons(item.get('id') for item in data.get('results', []))
+    scraper.queue_prefetch([
+        {'item_id': item.get('id'), 'item_type': mediatype, 'title': item.get(title_field),
+         'year': _release_year(item, date_field), 'poster_path': item.get('poster_path')}
+        for item in data.get('results', [])
+    ])
+
+def list_seasons(show_id):
+    """
+    Lists the seasons of a TV show. The whole season/episode tree is cached
+    per show, so this and the episode listings rarely need a request.
+    """
+    from . import scraper
+    show = scraper.get_show_tree(show_id)
+    if show is None:
+        xbmcplugin.endOfDirectory(__handle__, succeeded=False)
+        return
+    items = []
+    for season in show['seasons']:
+        art = scraper.artwork_for(dict(show, poster_path=season.get('poster_path') or show.get('poster_path')))
+        items.append({
+            'label': season.get('name') or 'Season {0}'.format(season['season_number']),
+            'url': get_url(action='list_episodes', show_id=show_id, season=season['season_number']),
+            'is_folder': True,
+            'art': art,
+            'info': {'title': season.get('name'), 'plot': season.get('overview') or show.get('overview'),
+                     'tvshowtitle': show.get('name'), 'season': season['season_number'], 'mediatype': 'season'},
+        })
+    _render_listing(items, content='seasons', cache_to_disc=False)
+
+def list_episodes(show_id, season):
+    """
+    Lists the episodes of one season as playable items.
     """
-    xbmc.log(f"Listing items for category: {category}, subcategory: {subcategory}", xbmc.LOGINFO)
-
-    if category == 'movies':
-        # For now, we only implement the 'popular' subcategory
-        if subcategory == 'popular':
-            data = scraper.get_popular_movies()
-            items = data.get('results', [])
-            
-            for item in items:
-                title = item.get('title')
-                item_id = item.get('id')
-                plot = item.get('overview')
-                poster = scraper.TMDB_IMAGE_BASE_URL + item.get('poster_path', '')
-                
-                list_item = xbmcgui.ListItem(title)
-                list_item.setArt({'icon': poster, 'thumb': poster})
-                list_item.setInfo('video', {'title': title, 'plot': plot, 'mediatype': 'movie'})
-                
-                # The URL for a playable item will point to the resolve_item action
-                url = get_url(action='resolve_item', item_id=item_id, item_type='movie', title=title)
-                xbmcplugin.addDirectoryItem(__handle__, url, list_item, isFolder=False)
-        else:
-            # Placeholder for other movie subcategories
-            list_item = xbmcgui.ListItem(f'Placeholder for {subcategory} Movies')
-            xbmcplugin.addDirectoryItem(__handle__, get_url(), list_item, isFolder=False)
-
-    elif category == 'tvshows':
-        # For now, we only implement the 'popular' subcategory
-        if subcategory == 'popular':
-            data = scraper.get_popular_tvshows()
-            items = data.get('results', [])
-            
-            for item in items:
-                title = item.get('name')
-                item_id = item.get('id')
-                plot = item.get('overview')
-                poster = scraper.TMDB_IMAGE_BASE_URL + item.get('poster_path', '')
-                
-                list_item = xbmcgui.ListItem(title)
-                list_item.setArt({'icon': poster, 'thumb': poster})
-                list_item.setInfo('video', {'title': title, 'plot': plot, 'mediatype': 'tvshow'})
-                
-                # The URL for a playable item will point to the resolve_item action
-                url = get_url(action='resolve_item', item_id=item_id, item_type='tvshow', title=title)
-                xbmcplugin.addDirectoryItem(__handle__, url, list_item, isFolder=False)
-        else:
-            # Placeholder for other TV show subcategories
-            list_item = xbmcgui.ListItem(f'Placeholder for {subcategory} TV Shows')
-            xbmcplugin.addDirectoryItem(__handle__, get_url(), list_item, isFolder=False)
-
-    xbmcplugin.endOfDirectory(__handle__)
-
-def resolve_item(item_id, item_type, title):
+    from . import scraper
+    show = scraper.get_show_tree(show_id, season)
+    episodes = next((s['episodes'] for s in (show or {}).get('seasons', [])
+                     if s['season_number'] == season), None)
+    if episodes is None:
+        xbmcplugin.endOfDirectory(__handle__, succeeded=False)
+        return
+    items = []
+    for episode in episodes:
+        number = episode.get('episode_number')
+        item = scraper.episode_item(show, season, episode)
+        info = {'title': episode.get('name'), 'plot': episode.get('overview'), 'tvshowtitle': show.get('name'),
+                'season': season, 'episode': number, 'aired': episode.get('air_date'), 'mediatype': 'episode'}
+        items.append({
+            'label': '{0}. {1}'.format(number, episode.get('name')),
+            'url': get_url(action='resolve_item', item_id=item['item_id'], item_type='episode', title=item['title'],
+                           show_id=show_id, season=season, episode=number),
+            'playable': True,
+            'art': scraper.episode_artwork(episode, show),
+            'info': info,
+        })
+    _render_listing(items, content='episodes', sort_methods=(xbmcplugin.SORT_METHOD_EPISODE,), cache_to_disc=False)
+
+# Category of each TMDB media type, for rendering search hits
+SEARCH_MEDIA = {'movie': 'movies', 'tv': 'tvshows'}
+
+def search(query=None):
+    """
+    Searches movies and TV shows by title. Titles already seen by the addon
+    are found in the local index without going to the network.
+    """
+    if not query:
+        query = xbmcgui.Dialog().input('Search')
+        if not query:
+            xbmcplugin.endOfDirectory(__handle__, succeeded=False)
+            return
+
+    from . import scraper
+    items = []
+    for media, result in scraper.search_titles(query):
+        mediatype, title_field, date_field, _ = CATEGORY_MEDIA[SEARCH_MEDIA[media]]
+        items.append(_media_item(result, mediatype, title_field, date_field, scraper.artwork_for))
+    render_directory(__handle__, _local_art(items), content='videos', sort_methods=LISTING_SORT_METHODS,
+                     cache_to_disc=False)
+
+def resolve_item(item_id, item_type, title, year=None, show_id=None, season=None, episode=None):
     """
     Resolves the stream URL for a selected item.
+    All enabled sources are asked at once; the best-ranked answer wins.
+    For an episode, the service is told where it sits in its show so the
+    next one can be resolved while this one plays.
     """
-    xbmc.log(f"Resolving stream for {item_type} ID: {item_id}, Title: {title}", xbmc.LOGINFO)
+    from . import scraper
+    log_debug("Resolving stream for {0} ID: {1}, Title: {2}", item_type, item_id, title)
     
-    # Use the scraper to find a stream URL
-    # Conceptual region-locked stream URL
-region_locked_url = "http://geo-restricted.example.com/stream/movie_id_{0}".format(item_id)
-# Use ScrapePenguin to get the unblocked URL
-stream_url = Scraper.get_unblocked_url(region_locked_url)
-
-# In a real scenario, you would still need to resolve the actual stream,
-# but for this conceptual implementation, we use the unblocked URL directly.
-# stream_url = scraper.resolve_stream_url(title) # Original line for reference
+    item = {'item_id': item_id, 'item_type': item_type, 'title': title, 'year': year}
+    result = scraper.resolve_item_stream(item, probe=True)
     
-    if stream_url:
-        xbmc.log(f"Stream found: {stream_url}", xbmc.LOGINFO)
+    if result:
+        provider, stream_url = result
+        log_debug("Stream found via {0}: {1}", provider, stream_url)
         # Create a list item with the stream URL
+        if item_type == 'episode' and show_id and season is not None and episode is not None:
+            # Before playback starts, so the service finds it when Kodi reports the start.
+            scraper.write_now_playing(item, stream_url, show_id, season, episode)
         list_item = xbmcgui.ListItem(path=stream_url)
         # Set the item as playable
         xbmcplugin.setResolvedUrl(__handle__, True, list_item)
@@ -187,13 +359,60 @@ stream_url = Scraper.get_unblocked_url(region_locked_url)
         # Must call setResolvedUrl with success=False to prevent Kodi from hanging
         xbmcplugin.setResolvedUrl(__handle__, False, xbmcgui.ListItem())
 
-# The 
+def clear_cache():
+    """
+    Drops all cached TMDB responses and rendered listings. Triggered from
+    the addon settings.
+    """
+    from . import scraper
+    scraper.clear_cache()
+    get_snapshots().invalidate()
+    xbmcgui.Dialog().notification(ADDON_NAME, 'Cache cleared.', xbmcgui.NOTIFICATION_INFO, 3000)
+
+def _diagnostics_row(label, action='diagnostics'):
+    return {'label': label, 'url': get_url(action=action), 'properties': {'IsPlayable': 'false'}}
+
+def list_diagnostics():
+    """
+    Shows the recorded timings: cache hit ratio, HTTP totals, then one row
+    per histogram (router actions, TMDB endpoints, providers, rendering).
+    """
+    rows, counters = metrics.summary()
+    ratio = cache_hit_ratio(counters)
+    items = [
+        _diagnostics_row('Cache hit ratio: {0} ({1} hits, {2} stale, {3} misses)'.format(
+            '{0:.0%}'.format(ratio) if ratio is not None else 'n/a', counters.get('cache.hit', 0),
+            counters.get('cache.stale', 0), counters.get('cache.miss', 0))),
+        _diagnostics_row('HTTP: {0} requests, {1:.1f} KiB, {2} errors'.format(
+            counters.get('http.requests', 0), counters.get('http.bytes', 0) / 1024.0, counters.get('http.errors', 0))),
+        _diagnostics_row('Memory budget: {0:.0f} MiB'.format(budget.limit / 1048576.0)),
+    ]
+    for name, count, mean, p50, p95, max_ms in rows:
+        items.append(_diagnostics_row('{0}: n={1}, mean {2:.0f} ms, p50 <= {3:.0f} ms, p95 <= {4:.0f} ms, max {5:.0f} ms'.format(
+            name, count, mean, p50, p95, max_ms)))
+    items.append(_diagnostics_row('Export as JSON', 'export_diagnostics'))
+    items.append(_diagnostics_row('Reset', 'reset_diagnostics'))
+    render_directory(__handle__, items, cache_to_disc=False)
 
+def export_diagnostics():
+    """
+    Writes the diagnostics to a JSON file in the addon profile.
+    """
+    path = metrics.export(os.path.join(ADDON_PROFILE, DIAGNOSTICS_EXPORT_FILE))
+    xbmcgui.Dialog().notification(ADDON_NAME, 'Saved to {0}'.format(path), xbmcgui.NOTIFICATION_INFO, 5000)
 
+def reset_diagnostics():
+    """
+    Forgets all recorded timings.
+    """
+    metrics.reset()
+    xbmcgui.Dialog().notification(ADDON_NAME, 'Diagnostics reset.', xbmcgui.NOTIFICATION_INFO, 3000)
+    xbmc.executebuiltin('Container.Refresh')
 
 def router(paramstring):
     """
     Router function that calls the appropriate action function.
+    The wall time of every action is recorded for the Diagnostics view.
     :param paramstring: URL parameter string
     :type paramstring: str
     """
@@ -203,6 +422,15 @@ def router(paramstring):
     # Check the action parameter to determine which function to call
     action = params.get('action')
 
+    global _snapshot_url
+    with metrics.timer('action ' + (action or 'root')):
+        url = get_url(**params) if action in SNAPSHOT_ACTIONS else None
+        if url is None or not _replay_snapshot(url):
+            _snapshot_url = url
+            _dispatch(action, params)
+    metrics.flush()
+
+def _dispatch(action, params):
     if action is None:
         # Default action is to list the root menu
         list_root_menu()
@@ -213,14 +441,41 @@ def router(paramstring):
     elif action == 'list_items':
         category = params.get('category')
         subcategory = params.get('subcategory')
+        page = params.get('page', '1')
+        page = int(page) if page.isdigit() and int(page) > 0 else 1
+        genre_id = params.get('genre_id')
         if category and subcategory:
-            list_items(category, subcategory)
+            list_items(category, subcategory, page, genre_id)
+    elif action == 'list_seasons':
+        show_id = params.get('show_id')
+        if show_id:
+            list_seasons(show_id)
+    elif action == 'list_episodes':
+        show_id = params.get('show_id')
+        season = params.get('season')
+        if show_id and season and season.isdigit():
+            list_episodes(show_id, int(season))
     elif action == 'resolve_item':
         item_id = params.get('item_id')
         item_type = params.get('item_type')
         title = params.get('title')
+        year = params.get('year')
+        season = params.get('season')
+        episode = params.get('episode')
         if item_id and item_type and title:
-            resolve_item(item_id, item_type, title)
+            resolve_item(item_id, item_type, title, year, params.get('show_id'),
+                         int(season) if season and season.isdigit() else None,
+                         int(episode) if episode and episode.isdigit() else None)
+    elif action == 'search':
+        search(params.get('query'))
+    elif action == 'clear_cache':
+        clear_cache()
+    elif action == 'diagnostics':
+        list_diagnostics()
+    elif action == 'export_diagnostics':
+        export_diagnostics()
+    elif action == 'reset_diagnostics':
+        reset_diagnostics()
     else:
         # Unknown action
         xbmcgui.Dialog().notification(ADDON_NAME, 'Unknown action: {0}'.format(action), xbmcgui.NOTIFICATION_ERROR, 5000)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Module: player
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import xbmc
+from script.module.scrapepenguin.lib.metrics import log_debug, metrics
+from . import scraper
+
+# --- Configuration ---
+# Share of an episode played before the next one is resolved
+PRELOAD_AT = 0.8
+# Next-episode resolutions running at the same time
+MAX_WORKERS = 1
+# Provider deadline of a pre-resolution
+PRELOAD_DEADLINE = 6.0
+
+
+class EpisodePlayer(xbmc.Player):
+    """
+    Follows playback of PenguinSurf episodes and resolves the next episode
+    while the current one is still playing.
+
+    resolve_item leaves a record of the episode it hands to Kodi; when Kodi
+    starts playing that stream, the player adopts it. Once PRELOAD_AT of
+    the episode has played (see check_progress), the next episode's season
+    and stream are loaded into the caches, so autoplay or "play next"
+    starts at once. Stopping playback, or starting another video, cancels
+    a pre-resolution that has not finished yet.
+    """
+
+    def __init__(self, workers=MAX_WORKERS):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._current = None
+        self._preloaded = False
+        self._cancel = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='next-episode')
+
+    def _switch(self, record):
+        with self._lock:
+            self._cancel.set()
+            self._cancel = threading.Event()
+            self._current = record
+            self._preloaded = False
+
+    def onAVStarted(self):
+        record = scraper.read_now_playing()
+        try:
+            playing = self.getPlayingFile()
+        except RuntimeError:
+            playing = None
+        # The record only counts if it describes what actually started.
+        if record is not None and record.get('url') != playing:
+            record = None
+        self._switch(record)
+        if record is not None:
+            log_debug("{0}: playing {1}", scraper.ADDON_ID, record['item'].get('title'))
+
+    def onPlayBackStopped(self):
+        self._switch(None)
+
+    def onPlayBackError(self):
+        self._switch(None)
+
+    def onPlayBackEnded(self):
+        # Not cancelled: this is when the next episode is about to be played.
+        with self._lock:
+            self._current = None
+
+    def check_progress(self):
+        """
+        Starts the next-episode resolution once enough of the current
+        episode has played. Called periodically by the service.
+        :return: True if a resolution was started
+        """
+        with self._lock:
+            record, cancel = self._current, self._cancel
+            if record is None or self._preloaded:
+                return False
+        try:
+            position, total = self.getTime(), self.getTotalTime()
+        except RuntimeError:
+            return False
+        if total <= 0 or position < total * PRELOAD_AT:
+            return False
+        with self._lock:
+            if cancel is not self._cancel:
+                return False
+            self._preloaded = True
+        self._pool.submit(self._preload, record, cancel)
+        return True
+
+    def _preload(self, record, cancel):
+        if cancel.is_set():
+            return
+        try:
+            with metrics.timer('next episode'):
+                item = scraper.warm_next_episode(record['show_id'], record['season'], record['episode'],
+                                                 cancelled=cancel.is_set, deadline=PRELOAD_DEADLINE)
+        except Exception as e:
+            xbmc.log(f"{scraper.ADDON_ID}: next episode resolution failed: {e}", xbmc.LOGWARNING)
+            return
+        if cancel.is_set():
+            log_debug("{0}: playback stopped, next episode abandoned", scraper.ADDON_ID)
+        elif item is not None:
+            metrics.increment('player.next_episode')
+            log_debug("{0}: next episode ready: {1}", scraper.ADDON_ID, item['title'])
+
+    def shutdown(self, wait=False):
+        """Stops the worker pool; pending work is cancelled, unless wait lets it finish first."""
+        if not wait:
+            self._switch(None)
+        self._pool.shutdown(wait=wait)
@@ -4,45 +4,150 @@
 # Created: 2025-12-16
 # License: GPL-3.0-or-later
 
-import requests
-from bs4 import BeautifulSoup
 import json
+import os
+import re
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 import xbmcaddon
+import xbmcvfs
 import xbmc
+from script.module.scrapepenguin.lib.archive import ArchiveResolver
+from script.module.scrapepenguin.lib.artwork import ARTWORK_DIR, PosterCache, art_urls, image_url
+from script.module.scrapepenguin.lib.cache import ResponseCache, Validated, make_key
+from script.module.scrapepenguin.lib.metrics import log_debug, metrics
+from script.module.scrapepenguin.lib.prefetch import PrefetchQueue
+from script.module.scrapepenguin.lib.scrapepenguin import Scraper
+from script.module.scrapepenguin.lib.searchindex import SearchIndex
+from script.module.scrapepenguin.lib.throttle import SingleFlight
 
 # Get addon info
 ADDON = xbmcaddon.Addon()
 ADDON_ID = ADDON.getAddonInfo('id')
 ADDON_NAME = ADDON.getAddonInfo('name')
+ADDON_PROFILE = xbmcvfs.translatePath(ADDON.getAddonInfo('profile'))
 
 # --- Configuration ---
 # NOTE: In a real-world scenario, you would need a valid TMDB API key.
 # For this demonstration, we will use a placeholder and mock the API calls.
-TMDB_API_KEY = "YOUR_TMDB_API_KEY"
+TMDB_API_KEY_PLACEHOLDER = "YOUR_TMDB_API_KEY"
+TMDB_API_KEY = TMDB_API_KEY_PLACEHOLDER
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
-TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
+TMDB_IMAGE_ROOT = "https://image.tmdb.org/t/p"
+ARCHIVE_BASE_URL = "https://archive.org"
+
+# --- Response Cache ---
+# Cache lifetimes (in seconds) per TMDB endpoint prefix. Lists that change
+# during the day get short TTLs, reference data such as genres long ones.
+TMDB_CACHE_FILE = "tmdb_cache.db"
+TMDB_CACHE_TTLS = {
+    "movie/popular": 6 * 60 * 60,
+    "tv/popular": 6 * 60 * 60,
+    "trending": 60 * 60,
+    "movie/now_playing": 6 * 60 * 60,
+    "tv/airing_today": 60 * 60,
+    "discover": 6 * 60 * 60,
+    "genre": 7 * 24 * 60 * 60,
+    "search": 24 * 60 * 60,
+    "tv_tree": 24 * 60 * 60,
+}
+# Local full-text index of every title seen, used by the search action
+SEARCH_INDEX_FILE = "search.db"
+# Results shown per media type in a search listing
+SEARCH_LIMIT = 50
+# Local copies of list posters (artwork.ARTWORK_DIR), bounded to ARTWORK_CACHE_BYTES
+ARTWORK_CACHE_BYTES = 64 * 1024 * 1024
+
+# --- Category Engine ---
+# Maps every (category, subcategory) of the router to its TMDB list endpoint.
+CATEGORY_ENDPOINTS = {
+    ("movies", "popular"): "movie/popular",
+    ("movies", "trending"): "trending/movie/week",
+    ("movies", "intheatres"): "movie/now_playing",
+    ("movies", "genre"): "discover/movie",
+    ("tvshows", "popular"): "tv/popular",
+    ("tvshows", "trending"): "trending/tv/week",
+    ("tvshows", "airingtoday"): "tv/airing_today",
+    ("tvshows", "genre"): "discover/tv",
+}
+GENRE_ENDPOINTS = {
+    "movies": "genre/movie/list",
+    "tvshows": "genre/tv/list",
+}
+# Pages fetched ahead of the displayed one, and the threads used to fetch them.
+PREFETCH_PAGES = 2
+PREFETCH_WORKERS = 3
+# TMDB refuses page numbers above this.
+TMDB_MAX_PAGE = 500
+# Seasons one tv/{id} request can carry via append_to_response (TMDB's limit)
+APPEND_SEASONS_MAX = 20
+# Shows at the top of a listing whose first season is fetched ahead
+SEASON_PREFETCH_SHOWS = 5
+
+_response_cache = None
+
+def get_response_cache():
+    """Returns the persistent TMDB response cache, opening it on first use."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(os.path.join(ADDON_PROFILE, TMDB_CACHE_FILE), ttls=TMDB_CACHE_TTLS)
+    return _response_cache
+
+def clear_cache():
+    """Drops every cached TMDB response and the search index (used by the settings action)."""
+    get_response_cache().clear()
+    get_search_index().clear()
+    get_poster_cache().clear()
 
 # --- TMDB Functions (Metadata) ---
 
 def _tmdb_request(endpoint, params=None):
-    """Helper function to make TMDB API requests."""
-    if not params:
-        params = {}
-    params['api_key'] = TMDB_API_KEY
+    """Helper function to make TMDB API requests, served from the response cache when possible."""
+    params = dict(params or {})
+    return get_response_cache().fetch(
+        endpoint, params, lambda validators: _index_response(endpoint, _tmdb_fetch(endpoint, params, validators)),
+        conditional=True)
+
+def _index_response(endpoint, result):
+    """Feeds the titles of a fresh TMDB response into the search index."""
+    data = result.value if isinstance(result, Validated) else result
+    if isinstance(data, dict) and data.get('results'):
+        try:
+            get_search_index().add_results(endpoint, data['results'])
+        except Exception as e:
+            # The index is an optimisation; never fail a listing because of it.
+            xbmc.log(f"Search index update failed: {e}", xbmc.LOGWARNING)
+    return result
+
+# Identical TMDB requests running at the same time share one network call.
+_tmdb_flights = SingleFlight()
+
+def _endpoint_metric(endpoint):
+    # One histogram per endpoint shape, not per id: tv/1399 -> tv/{id}
+    return 'tmdb ' + re.sub(r'/\d+(?=/|$)', '/{id}', endpoint.strip('/'))
+
+def _tmdb_fetch(endpoint, params, validators=None):
+    """
+    Performs the actual TMDB API request, bypassing the cache.
+    With the validators of a cached copy the request is conditional.
+    :return: cache.Validated, cache.NOT_MODIFIED, a plain dict (mock) or None
+    """
     url = f"{TMDB_BASE_URL}/{endpoint}"
     
-    # Mocking the request since we don't have a real API key or internet access in this context
-    # In a real addon, you would use:
-    # try:
-    #     response = requests.get(url, params=params, timeout=10)
-    #     response.raise_for_status()
-    #     return response.json()
-    # except requests.exceptions.RequestException as e:
-    #     xbmc.log(f"TMDB Request Error: {e}", xbmc.LOGERROR)
-    #     return None
+    if TMDB_API_KEY != TMDB_API_KEY_PLACEHOLDER:
+        # Goes through the shared keep-alive session; None on failure.
+        def load():
+            with metrics.timer(_endpoint_metric(endpoint)):
+                return Scraper.http().get_json_validated(url, params=dict(params, api_key=TMDB_API_KEY),
+                                                         validators=validators)
+        data, shared = _tmdb_flights.do((make_key(endpoint, params), tuple(sorted((validators or {}).items()))), load)
+        if shared:
+            metrics.increment('tmdb.coalesced')
+        return data
     
-    # Mocked response for demonstration
-    xbmc.log(f"MOCK: TMDB Request to {url} with params {params}", xbmc.LOGINFO)
+    # Mocked response for demonstration, used until a real API key is configured.
+    # The api_key is only added to real requests, so it never reaches the log.
+    log_debug("MOCK: TMDB Request to {0} with params {1}", url, params)
     
     if 'movie/popular' in endpoint:
         return {
@@ -57,61 +162,480 @@ def _tmdb_request(endpoint, params=None):
                 {"id": 101, "name": "Public Domain Show 1", "first_air_date": "1955-01-01", "overview": "A classic public domain TV series.", "poster_path": "/mock_tvposter1.jpg"},
             ]
         }
+    elif re.fullmatch(r'tv/\d+', endpoint):
+        show = {
+            "id": int(endpoint.split('/')[1]), "name": "Public Domain Show 1", "first_air_date": "1955-01-01",
+            "overview": "A classic public domain TV series.", "poster_path": "/mock_tvposter1.jpg",
+            "seasons": [{"season_number": 1, "name": "Season 1", "episode_count": 2}],
+        }
+        if 'season/1' in params.get('append_to_response', '').split(','):
+            show["season/1"] = {"season_number": 1, "episodes": [
+                {"id": 1001, "episode_number": 1, "name": "Pilot", "overview": "The first episode."},
+                {"id": 1002, "episode_number": 2, "name": "Episode 2", "overview": "The second episode."},
+            ]}
+        return show
+    elif endpoint.startswith('genre/'):
+        return {
+            "genres": [
+                {"id": 18, "name": "Drama"},
+                {"id": 35, "name": "Comedy"},
+            ]
+        }
     
     return {"results": []}
 
-def get_popular_movies():
+def get_popular_movies(page=1):
     """Fetches a list of popular movies (mocked)."""
-    return _tmdb_request("movie/popular")
+    return _tmdb_request("movie/popular", {"page": page})
 
-def get_popular_tvshows():
+def get_popular_tvshows(page=1):
     """Fetches a list of popular TV shows (mocked)."""
-    return _tmdb_request("tv/popular")
+    return _tmdb_request("tv/popular", {"page": page})
+
+def get_category_page(category, subcategory, page=1, params=None, prefetch=PREFETCH_PAGES):
+    """
+    Fetches one page of a category listing.
+    The next `prefetch` pages are requested at the same time on a bounded
+    thread pool, so paging forward is answered from the response cache.
+    :return: TMDB response dict, or None for an unknown category, a page
+        past TMDB_MAX_PAGE or a failed request
+    """
+    endpoint = CATEGORY_ENDPOINTS.get((category, subcategory))
+    if endpoint is None or page > TMDB_MAX_PAGE:
+        return None
+
+    params = dict(params or {})
+    # Open the cache and index here so the worker threads don't race to create them.
+    get_response_cache()
+    get_search_index()
+    pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='tmdb-prefetch')
+    last_page = min(page + prefetch, TMDB_MAX_PAGE)
+    futures = [pool.submit(_tmdb_request, endpoint, dict(params, page=p)) for p in range(page, last_page + 1)]
+    # The workers finish the queued pages and then exit on their own. Only the
+    # current page is waited for; the rest land in the cache in the background.
+    pool.shutdown(wait=False)
+    return futures[0].result()
+
+def get_genres(category):
+    """Fetches the TMDB genre list for 'movies' or 'tvshows'."""
+    endpoint = GENRE_ENDPOINTS.get(category)
+    if endpoint is None:
+        return []
+    data = _tmdb_request(endpoint) or {}
+    return data.get('genres', [])
+
+# --- TV Shows ---
+# A show's seasons and episodes are cached as one tree. Seasons that are not
+# loaded yet are requested together through append_to_response, so a show
+# with up to APPEND_SEASONS_MAX seasons costs one request, not one per season.
+
+SHOW_FIELDS = ('id', 'name', 'overview', 'first_air_date', 'poster_path', 'backdrop_path')
+SEASON_FIELDS = ('season_number', 'name', 'overview', 'air_date', 'poster_path', 'episode_count')
+EPISODE_FIELDS = ('id', 'episode_number', 'name', 'overview', 'air_date', 'still_path', 'runtime')
+
+def _pick(data, fields):
+    return {field: data.get(field) for field in fields}
+
+def _fetch_seasons(show_id, numbers):
+    """
+    Requests tv/{show_id} with the given seasons appended, APPEND_SEASONS_MAX
+    per request.
+    :return: (show details or None, {season number: season details})
+    """
+    show = None
+    seasons = {}
+    numbers = list(numbers)
+    for start in range(0, max(len(numbers), 1), APPEND_SEASONS_MAX):
+        batch = numbers[start:start + APPEND_SEASONS_MAX]
+        params = {"append_to_response": ",".join(f"season/{n}" for n in batch)} if batch else {}
+        result = _tmdb_fetch(f"tv/{show_id}", params)
+        data = result.value if isinstance(result, Validated) else result
+        if not isinstance(data, dict):
+            break
+        show = show or data
+        for n in batch:
+            if data.get(f"season/{n}"):
+                seasons[n] = data[f"season/{n}"]
+    return show, seasons
+
+def _season_loaded(tree, number):
+    return any(season['season_number'] == number and season['episodes'] is not None
+               for season in tree['seasons'])
+
+def _load_show_tree(show_id, tree=None, first_season_only=False):
+    """
+    Completes a show tree: builds it if there is none and loads the episodes
+    of every season still missing them (only season 1 for a prefetch).
+    """
+    seasons = {}
+    if tree is None:
+        # The season count is unknown until the first answer, so ask for as
+        # many seasons as one request carries and fetch the rest afterwards.
+        # Season 0 (Specials) is listed by most shows, so it is part of it.
+        first = [1] if first_season_only else range(0, APPEND_SEASONS_MAX)
+        show, seasons = _fetch_seasons(show_id, first)
+        if show is None:
+            return None
+        tree = dict(_pick(show, SHOW_FIELDS), seasons=[
+            dict(_pick(season, SEASON_FIELDS), episodes=None) for season in show.get('seasons', [])
+        ])
+    if not first_season_only:
+        missing = [season['season_number'] for season in tree['seasons']
+                   if season['episodes'] is None and season['season_number'] not in seasons]
+        if missing:
+            seasons.update(_fetch_seasons(show_id, missing)[1])
+    for season in tree['seasons']:
+        data = seasons.get(season['season_number'])
+        if data is not None:
+            season['episodes'] = [_pick(episode, EPISODE_FIELDS) for episode in data.get('episodes', [])]
+    return tree
+
+def get_show_tree(show_id, season=None):
+    """
+    Returns a TV show with its seasons; each season's 'episodes' is a list
+    once loaded and None before. A tree built by the first-season prefetch
+    already lists every season.
+    :param season: season number whose episodes are needed. Every season
+        still missing is fetched with it, so the next one opens from the cache.
+    :return: tree dict, or None if TMDB has no answer
+    """
+    cache = get_response_cache()
+    endpoint = f"tv_tree/{show_id}"
+    key = make_key(endpoint)
+    entry = cache.get(key)
+    tree = entry[0] if entry is not None and entry[1] else None
+    if tree is not None and (season is None or _season_loaded(tree, season)
+                             or all(s['season_number'] != season for s in tree['seasons'])):
+        metrics.increment('cache.hit')
+        return tree
+
+    metrics.increment('cache.miss')
+    tree = _load_show_tree(show_id, tree)
+    if tree is not None:
+        cache.set(key, endpoint, tree)
+    return tree
+
+def _prefetch_first_season(show_id):
+    endpoint = f"tv_tree/{show_id}"
+    key = make_key(endpoint)
+    entry = get_response_cache().get(key)
+    if entry is not None and entry[1]:
+        return
+    tree = _load_show_tree(show_id, first_season_only=True)
+    if tree is not None:
+        get_response_cache().set(key, endpoint, tree)
+
+def prefetch_first_seasons(show_ids):
+    """
+    Loads the seasons and first-season episodes of the given shows in the
+    background, so opening one of them needs no request.
+    """
+    show_ids = list(show_ids)[:SEASON_PREFETCH_SHOWS]
+    if not show_ids:
+        return
+    get_response_cache()
+    pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='season-prefetch')
+    for show_id in show_ids:
+        pool.submit(_prefetch_first_season, show_id)
+    # Like the page prefetch, the workers finish on their own.
+    pool.shutdown(wait=False)
+
+def episode_item(show, season, episode):
+    """Item descriptor of an episode, with the title list_episodes gives it."""
+    return {'item_id': episode.get('id'), 'item_type': 'episode', 'year': None,
+            'title': '{0} S{1:02d}E{2:02d}'.format(show.get('name'), season, episode.get('episode_number') or 0)}
+
+def next_episode(show_id, season, number):
+    """
+    Finds the episode after (season, number): the next one of the same
+    season, else the first episode of a later season (specials excluded).
+    :return: (show tree, season number, episode) or None
+    """
+    tree = get_show_tree(show_id, season)
+    if tree is None:
+        return None
+    for candidate in sorted(s['season_number'] for s in tree['seasons'] if s['season_number'] >= max(season, 1)):
+        season_tree = tree if candidate == season else get_show_tree(show_id, candidate)
+        if season_tree is None:
+            # That season could not be loaded; try the one after it.
+            continue
+        episodes = next((s['episodes'] for s in season_tree['seasons'] if s['season_number'] == candidate), None) or []
+        for episode in sorted(episodes, key=lambda e: e.get('episode_number') or 0):
+            if candidate > season or (episode.get('episode_number') or 0) > number:
+                return season_tree, candidate, episode
+    return None
+
+def episode_artwork(episode, show):
+    """Art of an episode: its still as thumbnail, the show's poster and backdrop."""
+    art = art_urls(show, roles=('poster', 'fanart'), root=TMDB_IMAGE_ROOT)
+    still = image_url(episode.get('still_path'), 'landscape', TMDB_IMAGE_ROOT)
+    if still:
+        art['thumb'] = art['icon'] = still
+    return art
+
+# --- Search ---
+
+_search_index = None
+
+def get_search_index():
+    """Returns the local title index, opening it on first use."""
+    global _search_index
+    if _search_index is None:
+        _search_index = SearchIndex(os.path.join(ADDON_PROFILE, SEARCH_INDEX_FILE))
+    return _search_index
+
+def search_titles(query, limit=SEARCH_LIMIT):
+    """
+    Searches movies and TV shows, answering from the local index when it has
+    any hit and asking TMDB (whose results are indexed in turn) otherwise.
+    :return: list of (media type, TMDB result dict), best match first
+    """
+    hits = get_search_index().search(query, limit=limit)
+    if hits:
+        return hits
+
+    log_debug("No local search hits for {0!r}, asking TMDB", query)
+    hits = []
+    for media in ("movie", "tv"):
+        data = _tmdb_request(f"search/{media}", {"query": query}) or {}
+        hits.extend((media, result) for result in data.get('results', [])[:limit])
+    return hits
+
+# --- Artwork ---
+
+_poster_cache = None
+
+def get_poster_cache():
+    """Returns the on-disk poster cache."""
+    global _poster_cache
+    if _poster_cache is None:
+        _poster_cache = PosterCache(os.path.join(ADDON_PROFILE, ARTWORK_DIR), Scraper.http(),
+                                    max_bytes=ARTWORK_CACHE_BYTES)
+    return _poster_cache
+
+def artwork_for(item):
+    """
+    Builds the art dict of a TMDB result with a size per role (small
+    thumbnails, larger fanart). The URLs stay remote; listings swap in
+    cached posters with artwork.local_art() when they are rendered.
+    """
+    return art_urls(item, root=TMDB_IMAGE_ROOT)
+
+def prefetch_artwork(items, workers=2):
+    """
+    Downloads the list thumbnails of queued item descriptors into the poster cache.
+    :return: number of thumbnails available locally
+    """
+    urls = [image_url(item.get('poster_path'), 'thumb', TMDB_IMAGE_ROOT) for item in items]
+    return get_poster_cache().prefetch(urls, workers=workers)
 
 # --- Archive.org Functions (Stream Scraping) ---
 
-def _archive_org_search(title):
+_archive_resolver = None
+
+def get_archive_resolver():
+    """Returns the Archive.org resolver, sharing the response cache and HTTP session."""
+    global _archive_resolver
+    if _archive_resolver is None:
+        _archive_resolver = ArchiveResolver(get_response_cache(), Scraper.http(), base_url=ARCHIVE_BASE_URL,
+                                            probe=ADDON.getSetting('probe_streams') != 'false')
+    return _archive_resolver
+
+def _archive_org_search(title, year=None):
     """
     Searches Archive.org for a public domain video based on title.
-    NOTE: This is a simplified, conceptual scraping function.
-    Real-world scraping requires robust error handling and structure parsing.
+    Uses the JSON advancedsearch API; the answer is cached per title and year.
+    :return: URL of the item's details page, or None
     """
-    search_url = f"https://archive.org/details/movies?and%5B%5D=publicdomain&and%5B%5D=title%3A%28{requests.utils.quote(title)}%29"
-    
-    # Mocking the request
-    xbmc.log(f"MOCK: Archive.org Search for {title} at {search_url}", xbmc.LOGINFO)
-    
-    # Simulate a successful find for the first movie
-    if "Public Domain Movie 1" in title:
-        # Simulate the URL to the item's page
-        return "https://archive.org/details/mock_public_domain_movie_1"
-    
+    identifier = get_archive_resolver().find_identifiers([(title, year)]).get((title, year))
+    if identifier:
+        return f"{ARCHIVE_BASE_URL}/details/{identifier}"
     return None
 
-def resolve_archive_org_stream(item_page_url):
+def resolve_archive_org_stream(item_page_url, probe=False):
     """
-    Resolves the direct stream URL from the Archive.org item page.
-    NOTE: This is a highly simplified mock.
+    Resolves the direct stream URL of an Archive.org item page, picking the
+    best playable derivative from the item's metadata.
+    :param probe: measure the derivatives first (playback start only)
     """
-    # Mocking the resolution
-    xbmc.log(f"MOCK: Resolving stream from {item_page_url}", xbmc.LOGINFO)
-    
-    if "mock_public_domain_movie_1" in item_page_url:
-        # Simulate a direct stream URL (e.g., an MP4 file hosted on Archive.org)
-        # This URL must be a direct link to a playable video file.
-        return "https://archive.org/download/mock_public_domain_movie_1/mock_movie_1.mp4"
-    
-    return None
+    identifier = urllib.parse.urlsplit(item_page_url).path.rstrip('/').rsplit('/', 1)[-1]
+    if not identifier:
+        return None
+    return get_archive_resolver().stream_url(identifier, probe=probe)
+
+def find_archive_items(titles):
+    """
+    Looks up a whole page of titles on Archive.org with a single search.
+    :param titles: iterable of (title, year) tuples
+    :return: dict {(title, year): identifier or None}
+    """
+    return get_archive_resolver().find_identifiers(titles)
 
-def resolve_stream_url(title):
+def resolve_stream_url(title, year=None, probe=False):
     """
     Main function to find and resolve a stream URL for a given title.
     """
-    item_page_url = _archive_org_search(title)
+    item_page_url = _archive_org_search(title, year)
     
     if item_page_url:
-        stream_url = resolve_archive_org_stream(item_page_url)
+        stream_url = resolve_archive_org_stream(item_page_url, probe)
         if stream_url:
             return stream_url
             
     return None
+
+# --- Stream Providers ---
+# Values of the source_priority setting, in order. The chosen source is
+# asked first; the other enabled sources follow in this order.
+SOURCE_PRIORITY = ("archive", "penguinproxy")
+# Seconds a click-to-play may spend waiting on providers
+RESOLVE_DEADLINE = 8.0
+# Seconds a resolved stream URL is reused before asking the providers again
+STREAM_CACHE_TTL = 2 * 60 * 60
+# File shared with service.py, and the notification that wakes it up
+PREFETCH_QUEUE_FILE = "prefetch.db"
+PREFETCH_NOTIFICATION = "prefetch"
+
+def _resolve_archive(item, probe=False):
+    return resolve_stream_url(item['title'], item.get('year'), probe)
+
+def _resolve_penguinproxy(item, probe=False):
+    # Conceptual region-locked stream URL, unblocked through ScrapePenguin
+    region_locked_url = "http://geo-restricted.example.com/stream/movie_id_{0}".format(item['item_id'])
+    return Scraper.get_unblocked_url(region_locked_url)
+
+Scraper.register_provider("archive", _resolve_archive, "Archive.org")
+Scraper.register_provider("penguinproxy", _resolve_penguinproxy, "PenguinProxy")
+
+def get_provider_order():
+    """
+    Reads the source_priority setting and the per-source switches.
+    :return: (preferred provider names, enabled provider names)
+    """
+    priority = ADDON.getSetting('source_priority')
+    index = int(priority) if priority.isdigit() else 0
+    preferred = [SOURCE_PRIORITY[index]] if index < len(SOURCE_PRIORITY) else []
+    enabled = [name for name in SOURCE_PRIORITY if ADDON.getSetting('provider_' + name) != 'false']
+    return preferred, enabled
+
+def _stream_cache_key(item, preferred, enabled):
+    # The source settings are part of the key: changing them re-resolves.
+    return make_key("stream", {
+        "item_type": item.get('item_type'),
+        "item_id": item.get('item_id'),
+        "sources": ','.join(preferred + [name for name in enabled if name not in preferred]),
+    })
+
+def get_cached_stream(item):
+    """Returns the cached (provider name, url) for an item, or None."""
+    preferred, enabled = get_provider_order()
+    entry = get_response_cache().get(_stream_cache_key(item, preferred, enabled))
+    if entry is None or not entry[0]:
+        return None
+    return tuple(entry[0])
+
+def resolve_item_stream(item, deadline=RESOLVE_DEADLINE, cancelled=None, probe=False):
+    """
+    Resolves a stream for an item descriptor by querying all enabled
+    providers concurrently, honouring the source priority. Results that the
+    background service (or an earlier play) already found are reused.
+    :param cancelled: optional callable; a resolution called off caches nothing
+    :param probe: True when playback is about to start. Archive.org streams
+        found without probing are not cached while probing is enabled, so
+        the derivative is picked on the link as it is at playback start;
+        their identifier and metadata are cached all the same.
+    :return: (provider name, url) or None
+    """
+    preferred, enabled = get_provider_order()
+    key = _stream_cache_key(item, preferred, enabled)
+    cache = get_response_cache()
+    entry = cache.get(key)
+    if entry is not None and entry[0] and entry[1]:
+        return tuple(entry[0])
+
+    result = Scraper.resolve_stream(item, preferred=preferred, enabled=enabled, deadline=deadline,
+                                    cancelled=cancelled, probe=probe)
+    if result and (probe or result[0] != "archive" or not get_archive_resolver().probe):
+        cache.set(key, "stream", list(result), STREAM_CACHE_TTL)
+    return result
+
+# --- Next Episode ---
+# Written by resolve_item when an episode starts; the service's player reads it.
+NOW_PLAYING_FILE = "now_playing.json"
+
+def write_now_playing(item, url, show_id, season, episode):
+    """
+    Records the episode being handed to Kodi, so the service can tell
+    which show is playing once playback of url starts.
+    """
+    record = {'item': item, 'url': url, 'show_id': show_id, 'season': season, 'episode': episode}
+    path = os.path.join(ADDON_PROFILE, NOW_PLAYING_FILE)
+    os.makedirs(ADDON_PROFILE, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+def read_now_playing():
+    """Returns the record of the last episode started, or None."""
+    try:
+        with open(os.path.join(ADDON_PROFILE, NOW_PLAYING_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def warm_next_episode(show_id, season, number, cancelled=lambda: False, deadline=RESOLVE_DEADLINE):
+    """
+    Loads the episode after (season, number) and resolves its stream, so
+    playing it next needs no lookup (see resolve_item_stream for what is
+    left to playback start).
+    :param cancelled: callable; once it returns True nothing more is fetched or cached
+    :return: item descriptor of the next episode if a stream was found, else None
+    """
+    found = next_episode(show_id, season, number)
+    if found is None or cancelled():
+        return None
+    item = episode_item(*found)
+    if not resolve_item_stream(item, deadline, cancelled):
+        return None
+    return item
+
+# --- Background Pre-resolution ---
+
+_prefetch_queue = None
+
+def get_prefetch_queue():
+    """Returns the queue shared with the background service."""
+    global _prefetch_queue
+    if _prefetch_queue is None:
+        _prefetch_queue = PrefetchQueue(os.path.join(ADDON_PROFILE, PREFETCH_QUEUE_FILE))
+    return _prefetch_queue
+
+def queue_prefetch(items):
+    """
+    Hands the items of a rendered page to the background service, which
+    resolves and caches their streams before the user presses play and
+    downloads their thumbnails.
+    """
+    if not items or (ADDON.getSetting('background_resolve') == 'false'
+                     and ADDON.getSetting('cache_artwork') == 'false'):
+        return
+    get_prefetch_queue().enqueue(items)
+    # Wake the service up instead of waiting for its next poll.
+    xbmc.executebuiltin('NotifyAll({0},{1})'.format(ADDON_ID, PREFETCH_NOTIFICATION))
+
+def prefetch_streams(items, workers=1, deadline=RESOLVE_DEADLINE):
+    """
+    Resolves and caches the streams of a batch of queued items on up to
+    `workers` threads. Archive.org identifiers for the whole batch are looked
+    up with one search first. Nothing is probed here (see resolve_item_stream).
+    :return: number of items with a stream
+    """
+    # Shows are folders now; their episodes are resolved when played.
+    items = [item for item in items if item.get('item_type') != 'tvshow']
+    preferred, enabled = get_provider_order()
+    if "archive" in enabled:
+        find_archive_items([(item.get('title'), item.get('year')) for item in items])
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stream-prefetch') as pool:
+        results = list(pool.map(lambda item: resolve_item_stream(item, deadline), items))
+    return sum(1 for result in results if result)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Module: service
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import os
+import threading
+import time
+import xbmc
+import xbmcaddon
+from script.module.scrapepenguin.lib.memory import budget, budget_from_setting
+from script.module.scrapepenguin.lib.metrics import METRICS_FILE, log_debug, metrics, set_debug
+from . import scraper
+from .player import EpisodePlayer
+
+# Get addon info
+ADDON = xbmcaddon.Addon()
+ADDON_ID = ADDON.getAddonInfo('id')
+
+# --- Configuration ---
+# Items resolved per batch, and how many of them at the same time
+BATCH_SIZE = 10
+MAX_WORKERS = 2
+# Per-item provider deadline; shorter than click-to-play so shutdown stays quick
+PREFETCH_DEADLINE = 4.0
+# Seconds between queue checks when nobody wakes us up
+POLL_INTERVAL = 30
+# Seconds to back off while a video is playing; playback progress is checked this often
+PLAYBACK_BACKOFF = 15
+# Pause between batches so browsing stays responsive
+BATCH_PAUSE = 1.0
+# Seconds without remote or keyboard input before a batch may start; while
+# the user navigates, the GUI needs the CPU and the network.
+IDLE_SECONDS = 3
+
+
+class PrefetchService(xbmc.Monitor):
+    """
+    Resolves the streams (and caches the posters) of recently listed items
+    in the background.
+
+    list_items queues the items of every page it renders and sends a
+    NotifyAll; the service wakes up, claims a batch and resolves it with a
+    small worker pool, so resolve_item usually finds the stream in the cache.
+    Batches only start once the user has stopped navigating for
+    IDLE_SECONDS and no busy dialog is up. While a video is playing the
+    queue waits; only the episode after the one playing is resolved (see
+    EpisodePlayer).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._wake = threading.Event()
+        self._player = EpisodePlayer()
+
+    def onNotification(self, sender, method, data):
+        if sender == ADDON_ID and method.endswith(scraper.PREFETCH_NOTIFICATION):
+            self._wake.set()
+
+    def _sleep(self, timeout):
+        """
+        Waits up to `timeout` seconds or until a notification arrives.
+        :return: True if Kodi is shutting down
+        """
+        end = time.monotonic() + timeout
+        while not self._wake.is_set():
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.waitForAbort(min(remaining, 0.5)):
+                return True
+        self._wake.clear()
+        return self.abortRequested()
+
+    def _busy(self):
+        return self._player.isPlayingVideo()
+
+    @staticmethod
+    def _idle_wait():
+        """:return: seconds to wait before the GUI counts as idle, 0 if it is"""
+        if xbmc.getCondVisibility('Window.IsActive(busydialog)'):
+            return IDLE_SECONDS
+        return max(0, IDLE_SECONDS - xbmc.getGlobalIdleTime())
+
+    def run(self):
+        xbmc.log(f"{ADDON_ID}: prefetch service started", xbmc.LOGINFO)
+        metrics.configure(os.path.join(scraper.ADDON_PROFILE, METRICS_FILE))
+        queue = scraper.get_prefetch_queue()
+        while not self.abortRequested():
+            if self._busy():
+                if ADDON.getSetting('background_resolve') != 'false':
+                    self._player.check_progress()
+                if self.waitForAbort(PLAYBACK_BACKOFF):
+                    break
+                continue
+
+            wait = self._idle_wait()
+            if wait:
+                metrics.increment('service.deferred')
+                if self.waitForAbort(wait):
+                    break
+                continue
+
+            set_debug(ADDON.getSetting('debug_mode') == 'true')
+            # Settings may have changed since the last batch
+            budget.configure(budget_from_setting(ADDON.getSetting('memory_budget')))
+            batch = queue.claim(BATCH_SIZE)
+            if not batch:
+                if self._sleep(POLL_INTERVAL):
+                    break
+                continue
+
+            try:
+                if ADDON.getSetting('background_resolve') != 'false':
+                    found = scraper.prefetch_streams(batch, workers=MAX_WORKERS, deadline=PREFETCH_DEADLINE)
+                    log_debug("{0}: pre-resolved {1}/{2} streams", ADDON_ID, found, len(batch))
+                if ADDON.getSetting('cache_artwork') != 'false':
+                    cached = scraper.prefetch_artwork(batch, workers=MAX_WORKERS)
+                    log_debug("{0}: cached {1}/{2} posters", ADDON_ID, cached, len(batch))
+            except Exception as e:
+                xbmc.log(f"{ADDON_ID}: prefetch batch failed: {e}", xbmc.LOGERROR)
+            metrics.flush()
+
+            if self.waitForAbort(BATCH_PAUSE):
+                break
+        self._player.shutdown()
+        xbmc.log(f"{ADDON_ID}: prefetch service stopped", xbmc.LOGINFO)
+
+
+if __name__ == '__main__':
+    PrefetchService().run()
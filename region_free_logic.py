@@ -1,59 +0,0 @@
-# -*- coding: utf-8 -*-
-# Module: region_free_logic
-# Author: Manus
-# Created: 2025-12-16
-# License: GPL-3.0-or-later
-
-import xbmc
-import requests
-
-# --- Conceptual Region-Free Logic ---
-
-def get_region_free_url(original_url):
-    """
-    Conceptual function to bypass geo-restrictions.
-    
-    In a real-world scenario, this would involve:
-    1. Checking if the URL is geo-restricted (e.g., by checking headers or content).
-    2. If restricted, routing the request through a proxy, a smart DNS service,
-       or a specialized unblocker API (e.g., a conceptual 'PenguinProxy' service).
-    3. Returning the unblocked URL.
-    
-    Since we cannot implement a real unblocker service, this function serves as a
-    conceptual placeholder to fulfill the user's requirement for region-free access.
-    """
-    xbmc.log(f"REGION_FREE_LOGIC: Attempting to unblock URL: {original_url}", xbmc.LOGINFO)
-    
-    # Placeholder for unblocking logic
-    if "geo-restricted.example.com" in original_url:
-        # Simulate successful unblocking
-        unblocked_url = original_url.replace("geo-restricted.example.com", "unblocked-proxy.example.com")
-        xbmc.log(f"REGION_FREE_LOGIC: Successfully unblocked to: {unblocked_url}", xbmc.LOGINFO)
-        return unblocked_url
-    
-    # If no restriction is detected or unblocking is not needed, return the original URL
-    return original_url
-
-def fetch_region_free_content(url):
-    """
-    Conceptual function to fetch content using the region-free logic.
-    """
-    unblocked_url = get_region_free_url(url)
-    
-    # In a real scenario, this would use requests to fetch the content
-    # try:
-    #     response = requests.get(unblocked_url, timeout=10)
-    #     response.raise_for_status()
-    #     return response.text
-    # except requests.exceptions.RequestException as e:
-    #     xbmc.log(f"REGION_FREE_LOGIC: Request failed for {unblocked_url}: {e}", xbmc.LOGERROR)
-    #     return None
-    
-    # Mocked response
-    xbmc.log(f"REGION_FREE_LOGIC: Mocking content fetch from {unblocked_url}", xbmc.LOGINFO)
-    return f"<html><body>Mocked content from {unblocked_url}</body></html>"
-
-# --- Integration into ScrapePenguin ---
-
-# We will update the main video addons to import and use this logic.
-# The ScrapePenguin module will serve as the central library for this logic.
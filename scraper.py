@@ -1,117 +0,0 @@
-# -*- coding: utf-8 -*-
-# Module: scraper
-# Author: Manus
-# Created: 2025-12-16
-# License: GPL-3.0-or-later
-
-import requests
-from bs4 import BeautifulSoup
-import json
-import xbmcaddon
-import xbmc
-
-# Get addon info
-ADDON = xbmcaddon.Addon()
-ADDON_ID = ADDON.getAddonInfo('id')
-ADDON_NAME = ADDON.getAddonInfo('name')
-
-# --- Configuration ---
-# NOTE: In a real-world scenario, you would need a valid TMDB API key.
-# For this demonstration, we will use a placeholder and mock the API calls.
-TMDB_API_KEY = "YOUR_TMDB_API_KEY"
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
-TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
-
-# --- TMDB Functions (Metadata) ---
-
-def _tmdb_request(endpoint, params=None):
-    """Helper function to make TMDB API requests."""
-    if not params:
-        params = {}
-    params['api_key'] = TMDB_API_KEY
-    url = f"{TMDB_BASE_URL}/{endpoint}"
-    
-    # Mocking the request since we don't have a real API key or internet access in this context
-    # In a real addon, you would use:
-    # try:
-    #     response = requests.get(url, params=params, timeout=10)
-    #     response.raise_for_status()
-    #     return response.json()
-    # except requests.exceptions.RequestException as e:
-    #     xbmc.log(f"TMDB Request Error: {e}", xbmc.LOGERROR)
-    #     return None
-    
-    # Mocked response for demonstration
-    xbmc.log(f"MOCK: TMDB Request to {url} with params {params}", xbmc.LOGINFO)
-    
-    if 'movie/popular' in endpoint:
-        return {
-            "results": [
-                {"id": 1, "title": "Public Domain Movie 1", "release_date": "1950-01-01", "overview": "A classic public domain film.", "poster_path": "/mock_poster1.jpg"},
-                {"id": 2, "title": "Public Domain Movie 2", "release_date": "1960-05-15", "overview": "Another great public domain feature.", "poster_path": "/mock_poster2.jpg"},
-            ]
-        }
-    elif 'tv/popular' in endpoint:
-        return {
-            "results": [
-                {"id": 101, "name": "Public Domain Show 1", "first_air_date": "1955-01-01", "overview": "A classic public domain TV series.", "poster_path": "/mock_tvposter1.jpg"},
-            ]
-        }
-    
-    return {"results": []}
-
-def get_popular_movies():
-    """Fetches a list of popular movies (mocked)."""
-    return _tmdb_request("movie/popular")
-
-def get_popular_tvshows():
-    """Fetches a list of popular TV shows (mocked)."""
-    return _tmdb_request("tv/popular")
-
-# --- Archive.org Functions (Stream Scraping) ---
-
-def _archive_org_search(title):
-    """
-    Searches Archive.org for a public domain video based on title.
-    NOTE: This is a simplified, conceptual scraping function.
-    Real-world scraping requires robust error handling and structure parsing.
-    """
-    search_url = f"https://archive.org/details/movies?and%5B%5D=publicdomain&and%5B%5D=title%3A%28{requests.utils.quote(title)}%29"
-    
-    # Mocking the request
-    xbmc.log(f"MOCK: Archive.org Search for {title} at {search_url}", xbmc.LOGINFO)
-    
-    # Simulate a successful find for the first movie
-    if "Public Domain Movie 1" in title:
-        # Simulate the URL to the item's page
-        return "https://archive.org/details/mock_public_domain_movie_1"
-    
-    return None
-
-def resolve_archive_org_stream(item_page_url):
-    """
-    Resolves the direct stream URL from the Archive.org item page.
-    NOTE: This is a highly simplified mock.
-    """
-    # Mocking the resolution
-    xbmc.log(f"MOCK: Resolving stream from {item_page_url}", xbmc.LOGINFO)
-    
-    if "mock_public_domain_movie_1" in item_page_url:
-        # Simulate a direct stream URL (e.g., an MP4 file hosted on Archive.org)
-        # This URL must be a direct link to a playable video file.
-        return "https://archive.org/download/mock_public_domain_movie_1/mock_movie_1.mp4"
-    
-    return None
-
-def resolve_stream_url(title):
-    """
-    Main function to find and resolve a stream URL for a given title.
-    """
-    item_page_url = _archive_org_search(title)
-    
-    if item_page_url:
-        stream_url = resolve_archive_org_stream(item_page_url)
-        if stream_url:
-            return stream_url
-            
-    return None
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# Module: archive
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import re
+import urllib.parse
+from .cache import make_key
+from .metrics import log_debug, metrics
+from .probe import choose, probe_urls
+
+# --- Configuration ---
+ARCHIVE_BASE_URL = "https://archive.org"
+# Titles OR-ed into one advancedsearch query; keeps the URL well below limits.
+MAX_TITLES_PER_QUERY = 25
+# Candidate documents requested per title, so a year can be matched.
+ROWS_PER_TITLE = 4
+# Candidates requested when a title the batch query crowded out is asked for alone
+RETRY_ROWS = 50
+# Derivative formats we can play, best first.
+PLAYABLE_FORMATS = ('h.264', 'h.264 IA', 'MPEG4', '512Kb MPEG4', 'Ogg Video')
+# Cache lifetimes (in seconds). Misses are retried sooner than hits.
+LOOKUP_TTL = 7 * 24 * 60 * 60
+MISS_TTL = 24 * 60 * 60
+METADATA_TTL = 24 * 60 * 60
+# How long the derivative picked by probing is kept for an item
+PROBE_TTL = 6 * 60 * 60
+# Bitrates (bits per second) assumed when a file lists no size or length
+NOMINAL_BITRATES = {
+    'h.264': 2000000,
+    'h.264 IA': 1500000,
+    'MPEG4': 1200000,
+    '512Kb MPEG4': 600000,
+    'Ogg Video': 700000,
+}
+
+
+def normalize_title(title):
+    """Lower-cases a title and drops punctuation so variants compare equal."""
+    return ' '.join(re.sub(r'[^\w]+', ' ', title.lower()).split())
+
+
+def _quote_phrase(title):
+    return '"{0}"'.format(title.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+def _seconds(length):
+    # File lengths are given as seconds ("4001.23") or as "MM:SS" / "HH:MM:SS".
+    try:
+        seconds = 0.0
+        for part in str(length).split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return 0.0
+
+
+def bitrate_of(entry):
+    """Bits per second of a metadata file entry, from its size and length or its format."""
+    try:
+        size = int(entry.get('size') or 0)
+    except ValueError:
+        size = 0
+    seconds = _seconds(entry.get('length') or 0)
+    if size and seconds:
+        return size * 8 / seconds
+    return NOMINAL_BITRATES.get(entry.get('format'))
+
+
+def _year_of(doc):
+    year = str(doc.get('year') or doc.get('date') or '')[:4]
+    return int(year) if year.isdigit() else None
+
+
+class ArchiveResolver:
+    """
+    Finds playable Archive.org files for titles through the JSON APIs.
+
+    A whole page of titles is looked up with a single advancedsearch query
+    (titles OR-ed together); the playable derivative of a hit is then picked
+    from the item's metadata when it is actually needed. Lookups and metadata
+    are kept in a ResponseCache, keyed per title and year.
+    """
+
+    def __init__(self, cache, client, base_url=ARCHIVE_BASE_URL, probe=False):
+        self.cache = cache
+        self.client = client
+        self.base_url = base_url.rstrip('/')
+        # Measure the candidate derivatives before picking one (see pick_file)
+        self.probe = probe
+
+    # --- Identifier lookup ---
+
+    @staticmethod
+    def _lookup_key(title, year):
+        return make_key('archive/lookup', {'title': normalize_title(title), 'year': year})
+
+    def find_identifiers(self, titles):
+        """
+        Maps (title, year) pairs to Archive.org identifiers.
+        Cached pairs cost nothing; the rest are resolved with one
+        advancedsearch request per MAX_TITLES_PER_QUERY titles.
+        :param titles: iterable of (title, year) tuples, year may be None
+        :return: dict {(title, year): identifier or None}
+        """
+        found = {}
+        missing = []
+        for title, year in titles:
+            if not title or (title, year) in found:
+                continue
+            entry = self.cache.get(self._lookup_key(title, year))
+            if entry is not None:
+                found[(title, year)] = entry[0].get('identifier')
+            else:
+                found[(title, year)] = None
+                missing.append((title, year))
+
+        for start in range(0, len(missing), MAX_TITLES_PER_QUERY):
+            chunk = missing[start:start + MAX_TITLES_PER_QUERY]
+            titles = sorted({title for title, _ in chunk})
+            result = self._search(titles, len(titles) * ROWS_PER_TITLE)
+            if result is None:
+                # Network failure: leave these uncached so they are retried.
+                continue
+            docs, truncated = result
+            retried = {}
+            for title, year in chunk:
+                identifier = self._match(docs, title, year)
+                if identifier is None and truncated:
+                    # The rows are shared and sorted by downloads: popular partial
+                    # matches of other titles may have pushed this one out.
+                    if title not in retried:
+                        retried[title] = self._search([title], RETRY_ROWS)
+                    if retried[title] is None:
+                        continue
+                    identifier = self._match(retried[title][0], title, year)
+                    if identifier is None and retried[title][1]:
+                        # Still crowded out: not known to be a miss.
+                        metrics.increment('archive.lookup_crowded')
+                        continue
+                found[(title, year)] = identifier
+                self.cache.set(self._lookup_key(title, year), 'archive/lookup',
+                               {'identifier': identifier}, LOOKUP_TTL if identifier else MISS_TTL)
+        return found
+
+    def _search(self, titles, rows):
+        """
+        Runs one advancedsearch query for the titles.
+        :return: (docs, whether more documents matched than were returned), or None
+        """
+        query = 'mediatype:(movies) AND ({0})'.format(
+            ' OR '.join('title:({0})'.format(_quote_phrase(title)) for title in titles))
+        params = {
+            'q': query,
+            'fl[]': ['identifier', 'title', 'year'],
+            'sort[]': 'downloads desc',
+            'rows': rows,
+            'output': 'json',
+        }
+        log_debug("Archive.org search for {0} titles", len(titles))
+        with metrics.timer('archive advancedsearch'):
+            data = self.client.get_json(self.base_url + '/advancedsearch.php', params=params)
+        if data is None:
+            return None
+        response = data.get('response', {})
+        docs = response.get('docs', [])
+        total = response.get('numFound')
+        return docs, len(docs) >= rows if total is None else total > len(docs)
+
+    @staticmethod
+    def _match(docs, title, year):
+        wanted = normalize_title(title)
+        candidates = [doc for doc in docs if normalize_title(str(doc.get('title', ''))) == wanted]
+        if not candidates:
+            return None
+        # A year that is not a number (e.g. from a hand-edited URL) is ignored.
+        year = str(year or '').strip()
+        year = int(year) if year.isdigit() else None
+        if year:
+            # Exact year first, then off-by-one (release vs. production year).
+            for tolerance in (0, 1):
+                for doc in candidates:
+                    doc_year = _year_of(doc)
+                    if doc_year is not None and abs(doc_year - year) <= tolerance:
+                        return doc['identifier']
+            return None
+        return candidates[0]['identifier']
+
+    # --- Stream selection ---
+
+    def get_metadata(self, identifier):
+        """Returns the (cached) metadata document of an item, or None."""
+        return self.cache.fetch(
+            'archive/metadata', {'identifier': identifier},
+            lambda validators: self._fetch_metadata(identifier, validators),
+            ttl=METADATA_TTL, conditional=True)
+
+    def _fetch_metadata(self, identifier, validators):
+        # Conditional: an unchanged item costs a 304 instead of the whole document.
+        with metrics.timer('archive metadata'):
+            return self.client.get_json_validated('{0}/metadata/{1}'.format(self.base_url, identifier),
+                                                  validators=validators)
+
+    @staticmethod
+    def playable_files(metadata):
+        """Lists the playable files of an item, best format first."""
+        rank = {name: position for position, name in enumerate(PLAYABLE_FORMATS)}
+        files = [f for f in (metadata or {}).get('files', []) if f.get('format') in rank]
+        return sorted(files, key=lambda f: rank[f['format']])
+
+    def download_url(self, identifier, filename):
+        return '{0}/download/{1}/{2}'.format(self.base_url, identifier, urllib.parse.quote(filename))
+
+    def pick_file(self, identifier, files):
+        """
+        Picks the derivative that starts fastest on this box's link.
+        All candidates are probed at once with small Range requests; the
+        best format whose bitrate the measured bandwidth carries is kept
+        for PROBE_TTL, so replaying an item costs no probe.
+        :param files: playable files, best format first
+        :return: name of the file to play
+        """
+        if len(files) < 2:
+            return files[0]['name']
+        key = make_key('archive/probe', {'identifier': identifier})
+        entry = self.cache.get(key)
+        names = {f['name'] for f in files}
+        if entry is not None and entry[1] and entry[0].get('name') in names:
+            metrics.increment('archive.probe_cached')
+            return entry[0]['name']
+        candidates = [(self.download_url(identifier, f['name']), bitrate_of(f)) for f in files]
+        url, bandwidth = choose(candidates, probe_urls(self.client, [url for url, _ in candidates]))
+        if url is None:
+            # Nothing answered in time; leave the choice uncached and play the best format.
+            return files[0]['name']
+        name = files[[candidate for candidate, _ in candidates].index(url)]['name']
+        log_debug("Archive.org probe of {0}: {1} at {2:.0f} kbit/s", identifier, name, bandwidth / 1000)
+        self.cache.set(key, 'archive/probe', {'name': name, 'bandwidth': bandwidth}, PROBE_TTL)
+        return name
+
+    def stream_url(self, identifier, probe=True):
+        """
+        Returns the URL of the best playable derivative of an item, or None.
+        :param probe: False never probes, even if the resolver does (background resolutions)
+        """
+        files = self.playable_files(self.get_metadata(identifier))
+        if not files:
+            return None
+        name = self.pick_file(identifier, files) if self.probe and probe else files[0]['name']
+        return self.download_url(identifier, name)
+
+    def resolve(self, title, year=None):
+        """Finds a playable stream URL for one title, or None."""
+        identifier = self.find_identifiers([(title, year)]).get((title, year))
+        return self.stream_url(identifier) if identifier else None
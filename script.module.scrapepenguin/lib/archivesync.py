@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+# Module: archivesync
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import threading
+import time
+import xbmc
+from .database import close, connect
+from .metrics import log_debug, metrics
+
+# --- Configuration ---
+ARCHIVE_BASE_URL = "https://archive.org"
+# Bump this whenever the table layout changes; older stores are rebuilt.
+SCHEMA_VERSION = 1
+# Items per scrape API page (the API accepts 100 to 10000).
+SCRAPE_PAGE_SIZE = 1000
+# Fields requested from the scrape API
+SCRAPE_FIELDS = ('identifier', 'title', 'description', 'language', 'year', 'date', 'addeddate', 'downloads')
+# Descriptions are shown as plots; longer ones are cut here.
+MAX_DESCRIPTION = 600
+# Incremental syncs only see additions; a full pass every so often also
+# drops items that left the collection.
+FULL_SYNC_INTERVAL = 30 * 24 * 60 * 60
+
+
+class ArchiveItem:
+    """One Archive.org item of a synced collection."""
+
+    __slots__ = ('identifier', 'collection', 'title', 'description', 'language', 'year', 'addeddate', 'downloads')
+
+    def __init__(self, identifier, collection, title, description=None, language=None, year=None,
+                 addeddate='', downloads=0):
+        self.identifier = identifier
+        self.collection = collection
+        self.title = title
+        self.description = description
+        self.language = language
+        self.year = year
+        self.addeddate = addeddate
+        self.downloads = downloads
+
+    @classmethod
+    def from_doc(cls, doc, collection):
+        """Builds an item from a scrape API result, or returns None if it has no identifier."""
+        identifier = doc.get('identifier')
+        if not identifier:
+            return None
+        description = _first(doc.get('description'))
+        if description and len(description) > MAX_DESCRIPTION:
+            description = description[:MAX_DESCRIPTION].rsplit(' ', 1)[0] + '...'
+        year = str(_first(doc.get('year')) or _first(doc.get('date')) or '')[:4]
+        language = _first(doc.get('language'))
+        try:
+            downloads = int(doc.get('downloads') or 0)
+        except (TypeError, ValueError):
+            downloads = 0
+        return cls(identifier, collection, _first(doc.get('title')) or identifier, description,
+                   language.lower() if language else None, int(year) if year.isdigit() else None,
+                   _first(doc.get('addeddate')) or '', downloads)
+
+    def as_row(self, generation):
+        return (self.identifier, self.collection, self.title, self.description, self.language,
+                self.year, self.addeddate, self.downloads, generation)
+
+    def __repr__(self):
+        return 'ArchiveItem({0!r}, {1!r})'.format(self.identifier, self.title)
+
+
+def _first(value):
+    # Archive.org metadata fields may be a string or a list of strings.
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+class CollectionStore:
+    """
+    Local copy of Archive.org collections, kept current with the
+    cursor-based scrape API.
+
+    The first sync of a collection walks all of it, one page per request,
+    writing every page as it arrives. Later syncs only ask for items added
+    since the newest addeddate seen, so a nightly refresh is a request or
+    two. Every FULL_SYNC_INTERVAL a full pass runs again and items that
+    left the collection are dropped. Browsing only reads the local tables.
+    """
+
+    def __init__(self, path, base_url=ARCHIVE_BASE_URL):
+        self.path = path
+        self.base_url = base_url.rstrip('/')
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            conn = connect(self.path, SCHEMA_VERSION, drop=('items', 'sync_state'))
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS items ('
+                ' identifier TEXT NOT NULL,'
+                ' collection TEXT NOT NULL,'
+                ' title TEXT NOT NULL,'
+                ' description TEXT,'
+                ' language TEXT,'
+                ' year INTEGER,'
+                ' addeddate TEXT NOT NULL,'
+                ' downloads INTEGER NOT NULL,'
+                ' generation INTEGER NOT NULL,'
+                ' PRIMARY KEY (collection, identifier)) WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS items_downloads ON items (collection, downloads)')
+            conn.execute('CREATE INDEX IF NOT EXISTS items_added ON items (collection, addeddate)')
+            conn.execute('CREATE INDEX IF NOT EXISTS items_language ON items (collection, language, downloads)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sync_state ('
+                ' collection TEXT PRIMARY KEY,'
+                ' last_added TEXT,'
+                ' generation INTEGER NOT NULL,'
+                ' full_sync_at REAL,'
+                ' synced_at REAL)'
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                close(self._conn)
+                self._conn = None
+
+    # --- Sync ---
+
+    def state(self, collection):
+        """:return: dict with last_added, generation, full_sync_at and synced_at (all None before a sync)"""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT last_added, generation, full_sync_at, synced_at FROM sync_state WHERE collection = ?',
+                (collection,)
+            ).fetchone()
+        return dict(zip(('last_added', 'generation', 'full_sync_at', 'synced_at'), row or (None,) * 4))
+
+    def _write_page(self, items, generation):
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                'INSERT OR REPLACE INTO items (identifier, collection, title, description, language, year,'
+                ' addeddate, downloads, generation) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [item.as_row(generation) for item in items])
+            conn.commit()
+
+    def sync(self, client, collection, query=None, page_size=SCRAPE_PAGE_SIZE, full=None):
+        """
+        Brings one collection up to date.
+        :param client: HttpClient (get_json returns None on failure)
+        :param query: extra search clause, e.g. 'mediatype:(movies)'
+        :param full: force (True) or prevent (False) a full pass; by default a
+            full pass runs on the first sync and every FULL_SYNC_INTERVAL
+        :return: dict with 'items' received, 'requests' made and whether the pass was 'full'
+        :raises IOError: if a page could not be fetched; pages already written
+            are kept and the next sync covers the rest
+        """
+        state = self.state(collection)
+        now = time.time()
+        if full is None:
+            full = state['last_added'] is None or now - (state['full_sync_at'] or 0) > FULL_SYNC_INTERVAL
+        generation = (state['generation'] or 0) + (1 if full else 0)
+
+        clauses = ['collection:({0})'.format(collection)]
+        if query:
+            clauses.append('({0})'.format(query))
+        if not full:
+            # Inclusive, so items added in the same second as the last one are not missed.
+            clauses.append('addeddate:[{0} TO null]'.format(state['last_added']))
+        params = {'q': ' AND '.join(clauses), 'fields': ','.join(SCRAPE_FIELDS), 'count': page_size}
+
+        newest = state['last_added'] or ''
+        received = requests = 0
+        cursor = None
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            with metrics.timer('archive scrape'):
+                data = client.get_json(self.base_url + '/services/search/v1/scrape', params=params)
+            requests += 1
+            if data is None:
+                raise IOError('Archive.org scrape of {0} failed after {1} items'.format(collection, received))
+            items = [item for item in (ArchiveItem.from_doc(doc, collection) for doc in data.get('items', []))
+                     if item is not None]
+            if items:
+                self._write_page(items, generation)
+                received += len(items)
+                newest = max([newest] + [item.addeddate for item in items])
+            log_debug("Archive.org scrape of {0}: {1} items so far", collection, received)
+            cursor = data.get('cursor')
+            if not cursor or not items:
+                break
+
+        with self._lock:
+            conn = self._connect()
+            if full:
+                # Whatever the full pass did not see has left the collection.
+                conn.execute('DELETE FROM items WHERE collection = ? AND generation < ?', (collection, generation))
+            conn.execute(
+                'INSERT OR REPLACE INTO sync_state (collection, last_added, generation, full_sync_at, synced_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (collection, newest or None, generation, now if full else state['full_sync_at'], now))
+            conn.commit()
+        metrics.increment('archive.sync_items', received)
+        xbmc.log(f"Archive.org sync of {collection}: {received} items in {requests} requests"
+                 f" ({'full' if full else 'incremental'})", xbmc.LOGINFO)
+        return {'items': received, 'requests': requests, 'full': full}
+
+    # --- Browsing ---
+
+    ORDERS = {
+        'downloads': 'downloads DESC',
+        'added': 'addeddate DESC',
+        'title': 'title COLLATE NOCASE',
+        'year': 'year DESC',
+    }
+
+    def browse(self, collection, language=None, order='downloads', limit=50, offset=0):
+        """
+        Lists synced items of a collection.
+        :param language: only items in this language (as stored, lower-case)
+        :param order: a key of ORDERS
+        :return: list of ArchiveItem
+        """
+        sql = ('SELECT identifier, collection, title, description, language, year, addeddate, downloads'
+               ' FROM items WHERE collection = ?')
+        args = [collection]
+        if language:
+            sql += ' AND language = ?'
+            args.append(language)
+        sql += ' ORDER BY {0} LIMIT ? OFFSET ?'.format(self.ORDERS.get(order, self.ORDERS['downloads']))
+        args += [limit, offset]
+        with self._lock:
+            rows = self._connect().execute(sql, args).fetchall()
+        return [ArchiveItem(*row) for row in rows]
+
+    def languages(self, collection):
+        """:return: list of (language, number of items), most common first"""
+        with self._lock:
+            return self._connect().execute(
+                'SELECT language, COUNT(*) FROM items WHERE collection = ? AND language IS NOT NULL'
+                ' GROUP BY language ORDER BY COUNT(*) DESC', (collection,)
+            ).fetchall()
+
+    def get(self, collection, identifier):
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT identifier, collection, title, description, language, year, addeddate, downloads'
+                ' FROM items WHERE collection = ? AND identifier = ?', (collection, identifier)
+            ).fetchone()
+        return ArchiveItem(*row) if row else None
+
+    def count(self, collection=None):
+        with self._lock:
+            conn = self._connect()
+            if collection:
+                return conn.execute('SELECT COUNT(*) FROM items WHERE collection = ?', (collection,)).fetchone()[0]
+            return conn.execute('SELECT COUNT(*) FROM items').fetchone()[0]
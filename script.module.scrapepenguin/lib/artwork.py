@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# Module: artwork
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .memory import budget
+from .metrics import log_debug
+
+# --- Configuration ---
+TMDB_IMAGE_ROOT = "https://image.tmdb.org/t/p"
+# TMDB size per Kodi art role. List thumbnails are small on screen, so they
+# get small images; 'original' is only used when asked for explicitly.
+ROLE_SIZES = {
+    'thumb': 'w185',
+    'icon': 'w185',
+    'poster': 'w342',
+    'fanart': 'w780',
+    'landscape': 'w780',
+}
+# TMDB field each art role is taken from
+ROLE_FIELDS = {
+    'thumb': 'poster_path',
+    'icon': 'poster_path',
+    'poster': 'poster_path',
+    'fanart': 'backdrop_path',
+    'landscape': 'backdrop_path',
+}
+# Directory of the poster cache in an addon's profile
+ARTWORK_DIR = "artwork"
+# Disk space the poster cache may use before old files are evicted.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Parallel downloads when prefetching a page of posters.
+DEFAULT_WORKERS = 4
+# Estimated memory of one entry of the in-memory size index (path string
+# and dict slot), and the fewest files the memory budget may cut it to.
+INDEX_ENTRY_BYTES = 200
+MIN_FILES = 100
+
+
+def image_url(path, role='thumb', root=TMDB_IMAGE_ROOT):
+    """
+    Builds the TMDB image URL for a poster/backdrop path.
+    :param role: an art role from ROLE_SIZES, or a TMDB size such as 'original'
+    :return: URL, or None without a path
+    """
+    if not path:
+        return None
+    size = ROLE_SIZES.get(role, role)
+    return '{0}/{1}/{2}'.format(root.rstrip('/'), size, path.lstrip('/'))
+
+
+def art_urls(item, roles=('thumb', 'icon', 'poster', 'fanart'), root=TMDB_IMAGE_ROOT):
+    """Returns {role: URL} for the art roles a TMDB result has images for."""
+    art = {}
+    for role in roles:
+        url = image_url(item.get(ROLE_FIELDS[role]), role, root)
+        if url:
+            art[role] = url
+    return art
+
+
+def cached_path(directory, url):
+    """Path a PosterCache in `directory` stores the image of a URL under."""
+    extension = os.path.splitext(url.rsplit('/', 1)[-1])[1][:5] or '.img'
+    return os.path.join(directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + extension)
+
+
+def local_art(items, directory):
+    """
+    Returns the item descriptors with their thumbnail and icon served from
+    the poster cache in `directory` where it holds the image (marking it as
+    used). The items passed in keep the remote URLs, so a stored copy of
+    them still shows artwork after the cache has evicted a file.
+    """
+    rendered = []
+    for item in items:
+        art = item.get('art') or {}
+        thumb = art.get('thumb')
+        if thumb and '://' in thumb:
+            path = cached_path(directory, thumb)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            else:
+                item = dict(item, art=dict(art, thumb=path, icon=path))
+        rendered.append(item)
+    return rendered
+
+
+class PosterCache:
+    """
+    Bounded on-disk cache for artwork files.
+
+    Images are stored under a hash of their URL. A hit refreshes the file's
+    modification time, and once the directory holds more than max_bytes the
+    files that were used longest ago are deleted. The sizes are tracked in
+    memory so lookups never walk the directory; that index is a memory
+    budget consumer, which caps the number of files kept.
+    """
+
+    def __init__(self, directory, client, max_bytes=DEFAULT_MAX_BYTES, max_files=None):
+        self.directory = directory
+        self.client = client
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._sizes = None
+        budget.register('poster index', self)
+
+    def memory_usage(self):
+        """Estimated bytes of the size index."""
+        return len(self._sizes or ()) * INDEX_ENTRY_BYTES
+
+    def shrink(self, limit):
+        with self._lock:
+            self.max_files = max(MIN_FILES, limit // INDEX_ENTRY_BYTES)
+            if self._sizes is not None:
+                self._evict()
+
+    def _path(self, url):
+        return cached_path(self.directory, url)
+
+    def _scan(self):
+        if self._sizes is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._sizes = {}
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    self._sizes[entry.path] = entry.stat().st_size
+        return self._sizes
+
+    def local_path(self, url):
+        """Returns the cached file for a URL (marking it as used), or None."""
+        path = self._path(url)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def fetch(self, url):
+        """
+        Downloads an image into the cache unless it is already there.
+        :return: local path, or None if the download failed
+        """
+        path = self.local_path(url)
+        if path is not None:
+            return path
+        path = self._path(url)
+        tmp_path = '{0}.{1}.tmp'.format(path, threading.get_ident())
+        try:
+            response = self.client.get(url, stream=True)
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(64 * 1024):
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            log_debug("Artwork download failed for {0}: {1}", url, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        with self._lock:
+            self._scan()[path] = os.path.getsize(path)
+            self._evict()
+        return path
+
+    def prefetch(self, urls, workers=DEFAULT_WORKERS):
+        """
+        Downloads every URL that is not cached yet.
+        :return: number of images that are now available locally
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        with self._lock:
+            self._scan()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='artwork') as pool:
+            return sum(1 for path in pool.map(self.fetch, urls) if path)
+
+    def _over(self, total, count):
+        return total > self.max_bytes or (self.max_files is not None and count > self.max_files)
+
+    def _evict(self):
+        sizes = self._sizes
+        total = sum(sizes.values())
+        if not self._over(total, len(sizes)):
+            return
+        by_age = []
+        for path in sizes:
+            try:
+                by_age.append((os.path.getmtime(path), path))
+            except OSError:
+                by_age.append((0, path))
+        by_age.sort()
+        for _, path in by_age:
+            if not self._over(total, len(sizes)):
+                break
+            total -= sizes.pop(path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def size(self):
+        """Bytes currently used by the cache."""
+        with self._lock:
+            return sum(self._scan().values())
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._scan()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._sizes = {}
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# Module: cache
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import json
+import threading
+import time
+import urllib.parse
+import xbmc
+from .database import close, connect, release_memory
+from .memory import budget
+from .metrics import metrics
+
+# --- Configuration ---
+# Bump this whenever the table layout changes; older cache files are dropped.
+SCHEMA_VERSION = 2
+# How long a response is served without going back to the network.
+DEFAULT_TTL = 6 * 60 * 60
+# How long an expired response may still be served while it is refreshed.
+DEFAULT_STALE_TTL = 24 * 60 * 60
+# Upper bound for the stored response bodies before LRU eviction starts.
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+# A hit only rewrites the entry's access time for LRU eviction once the
+# stored one is this old, so reads rarely write to disk.
+ACCESS_RESOLUTION = 5 * 60
+# Parameters that never take part in the cache key (credentials etc.).
+EXCLUDED_PARAMS = frozenset(['api_key'])
+# Python objects decoded from a JSON body take about this many times its length.
+DECODED_FACTOR = 4
+
+
+class Validated:
+    """
+    A loaded value together with the HTTP validators (ETag, Last-Modified)
+    it was served with, so a later refresh can be a conditional request.
+    """
+
+    __slots__ = ('value', 'etag', 'last_modified')
+
+    def __init__(self, value, etag=None, last_modified=None):
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class _NotModified:
+    def __repr__(self):
+        return 'NOT_MODIFIED'
+
+
+# Returned by a conditional loader when the server answered 304.
+NOT_MODIFIED = _NotModified()
+
+
+def make_key(endpoint, params=None):
+    """
+    Builds a stable cache key from an endpoint and its parameters.
+    Parameters are sorted so that the key does not depend on dict order, and
+    credentials such as the api_key are left out.
+    """
+    items = sorted(
+        (str(name), str(value))
+        for name, value in (params or {}).items()
+        if name not in EXCLUDED_PARAMS and value is not None
+    )
+    return '{0}?{1}'.format(endpoint.strip('/'), urllib.parse.urlencode(items))
+
+
+class ResponseCache:
+    """
+    Persistent, size-bounded TTL cache for JSON API responses.
+
+    Entries live in a SQLite file (normally in the addon profile directory) so
+    they survive between plugin invocations. Each endpoint can have its own
+    TTL; expired entries are still served for a grace period while they are
+    refreshed in the background (stale-while-revalidate). ETag and
+    Last-Modified validators are kept with each body, so that refresh can be
+    a conditional request whose 304 answer only extends the TTL. When the
+    stored bodies grow beyond max_bytes the least recently used entries are
+    evicted.
+
+    Decoded bodies belong to the caller once returned, so for the memory
+    budget the cache only reports the largest one it decoded; it has
+    nothing to give back, but its share is no longer handed to others.
+    """
+
+    def __init__(self, path, ttls=None, default_ttl=DEFAULT_TTL,
+                 stale_ttl=DEFAULT_STALE_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._largest = 0
+        self._conn = None
+
+    # --- Storage ---
+
+    def _connect(self):
+        if self._conn is None:
+            conn = connect(self.path, SCHEMA_VERSION, drop=('responses',))
+            budget.register('decoded responses', self)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY,'
+                ' endpoint TEXT NOT NULL,'
+                ' body TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' expires REAL NOT NULL,'
+                ' accessed REAL NOT NULL,'
+                ' etag TEXT,'
+                ' last_modified TEXT)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Closes the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                close(self._conn)
+                self._conn = None
+                budget.unregister(self)
+
+    def memory_usage(self):
+        """Estimated bytes of the largest body decoded so far."""
+        return self._largest * DECODED_FACTOR
+
+    def shrink(self, limit):
+        """
+        Starts measuring decoded bodies afresh (callers have normally dropped
+        the large ones by now) and frees the connection's page cache.
+        """
+        with self._lock:
+            self._largest = 0
+            if self._conn is not None:
+                release_memory(self._conn)
+
+    def ttl_for(self, endpoint):
+        """Returns the TTL for an endpoint, using the longest matching prefix."""
+        endpoint = endpoint.strip('/')
+        best = None
+        for prefix in self.ttls:
+            if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.ttls[best] if best is not None else self.default_ttl
+
+    def get(self, key):
+        """
+        Looks up a cached response.
+        :return: (value, is_fresh) or None if the entry is missing or too old
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute('SELECT body, expires, accessed FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            body, expires, accessed = row
+            if now > expires + self.stale_ttl:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                conn.commit()
+                return None
+            if now - accessed > ACCESS_RESOLUTION:
+                conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                conn.commit()
+        self._largest = max(self._largest, len(body))
+        return json.loads(body), now <= expires
+
+    def validators(self, key):
+        """Returns the stored {'etag', 'last_modified'} of an entry (empty if none)."""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT etag, last_modified FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return {}
+        return {name: value for name, value in zip(('etag', 'last_modified'), row) if value}
+
+    def set(self, key, endpoint, value, ttl=None, etag=None, last_modified=None):
+        """Stores a response and evicts old entries if the cache is over budget."""
+        if ttl is None:
+            ttl = self.ttl_for(endpoint)
+        body = json.dumps(value, separators=(',', ':'))
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO responses'
+                ' (key, endpoint, body, size, expires, accessed, etag, last_modified)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint.strip('/'), body, len(body), now + ttl, now, etag, last_modified)
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def touch(self, key, endpoint, ttl=None):
+        """Extends the lifetime of an unchanged entry (after a 304)."""
+        if ttl is None:
+            ttl = self.ttl_for(endpoint)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('UPDATE responses SET expires = ?, accessed = ? WHERE key = ?', (now + ttl, now, key))
+            conn.commit()
+
+    def _store(self, key, endpoint, result, ttl=None):
+        """Saves what a loader returned and gives back the plain value."""
+        if result is NOT_MODIFIED:
+            self.touch(key, endpoint, ttl)
+            return None
+        if isinstance(result, Validated):
+            if result.value is not None:
+                self.set(key, endpoint, result.value, ttl, result.etag, result.last_modified)
+            return result.value
+        if result is not None:
+            self.set(key, endpoint, result, ttl)
+        return result
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk from the least recently used entry until we are back under budget.
+        doomed = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed ASC'):
+            doomed.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        conn.executemany('DELETE FROM responses WHERE key = ?', doomed)
+
+    # --- High level API ---
+
+    def fetch(self, endpoint, params, loader, ttl=None, conditional=False):
+        """
+        Returns the response for endpoint/params, calling loader() on a miss.
+        Stale entries are returned immediately and refreshed in the background.
+        Responses for which loader() returns None are not cached.
+        :param ttl: overrides the endpoint TTL for this response
+        :param conditional: loader takes the stored validators
+            ({'etag': ..., 'last_modified': ...}, empty on a miss) and may
+            return a Validated value, or NOT_MODIFIED to keep the entry
+        """
+        key = make_key(endpoint, params)
+        entry = self.get(key)
+        if entry is not None:
+            value, is_fresh = entry
+            if not is_fresh:
+                metrics.increment('cache.stale')
+                self._revalidate(key, endpoint, loader, ttl, conditional)
+            else:
+                metrics.increment('cache.hit')
+            return value
+
+        metrics.increment('cache.miss')
+        result = loader({}) if conditional else loader()
+        if result is NOT_MODIFIED:
+            # Only possible if the entry vanished meanwhile; nothing to serve.
+            return None
+        return self._store(key, endpoint, result, ttl)
+
+    def _revalidate(self, key, endpoint, loader, ttl=None, conditional=False):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if conditional:
+                    result = loader(self.validators(key))
+                    if result is NOT_MODIFIED:
+                        metrics.increment('cache.not_modified')
+                else:
+                    result = loader()
+                self._store(key, endpoint, result, ttl)
+            except Exception as e:
+                # The stale entry stays and is served until a later refresh succeeds.
+                metrics.increment('cache.refresh_failed')
+                xbmc.log(f"Background refresh of {endpoint} failed: {e}", xbmc.LOGWARNING)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # Not a daemon thread: the plugin process waits for the refresh to land.
+        threading.Thread(target=refresh, name='cache-revalidate').start()
+
+    def invalidate(self, prefix=None):
+        """
+        Removes cached responses. With a prefix only the matching endpoints
+        are dropped, otherwise the whole cache is cleared.
+        """
+        with self._lock:
+            conn = self._connect()
+            if prefix:
+                prefix = prefix.strip('/')
+                conn.execute(
+                    "DELETE FROM responses WHERE endpoint = ? OR endpoint LIKE ? ESCAPE '\\'",
+                    (prefix, prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%')
+                )
+            else:
+                conn.execute('DELETE FROM responses')
+            conn.commit()
+
+    def clear(self):
+        """Removes every cached response."""
+        self.invalidate()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# Module: catalogue
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import gzip
+import json
+import threading
+import xbmc
+from .database import close, connect
+from .memory import budget
+
+# --- Configuration ---
+# Bump this whenever the table layout changes; older catalogue files are rebuilt.
+SCHEMA_VERSION = 1
+# Rows written per transaction while ingesting an export.
+DEFAULT_BATCH_SIZE = 5000
+# Smallest batch the memory budget may shrink an import to, and the
+# estimated size of one buffered row (tuple, title string, numbers).
+MIN_BATCH_SIZE = 200
+ROW_BYTES = 250
+
+
+class CatalogueRecord:
+    """One row of a TMDB ID export. Slotted: millions of these pass through."""
+
+    __slots__ = ('media_type', 'tmdb_id', 'title', 'popularity', 'adult')
+
+    def __init__(self, media_type, tmdb_id, title, popularity=0.0, adult=False):
+        self.media_type = media_type
+        self.tmdb_id = tmdb_id
+        self.title = title
+        self.popularity = popularity
+        self.adult = adult
+
+    def as_row(self, generation):
+        return (self.media_type, self.tmdb_id, self.title, self.popularity, int(self.adult), generation)
+
+    def __repr__(self):
+        return 'CatalogueRecord({0!r}, {1!r}, {2!r})'.format(self.media_type, self.tmdb_id, self.title)
+
+
+def iter_export(path, media_type):
+    """
+    Reads a TMDB ID export (JSON lines, gzipped or not) one line at a time.
+    Malformed lines are skipped, so a truncated download still imports.
+    :return: generator of CatalogueRecord
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    skipped = 0
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                record = CatalogueRecord(
+                    media_type, int(row['id']),
+                    row.get('original_title') or row.get('original_name') or '',
+                    float(row.get('popularity') or 0.0), bool(row.get('adult')))
+            except (ValueError, KeyError, TypeError):
+                skipped += 1
+                continue
+            yield record
+    if skipped:
+        xbmc.log(f"Catalogue import skipped {skipped} malformed lines in {path}", xbmc.LOGWARNING)
+
+
+class CatalogueStore:
+    """
+    Compact local catalogue of every TMDB id, filled from the daily exports.
+
+    An import streams the export into the store in batched transactions and
+    stamps each row with the import's generation; rows the new export no
+    longer contains are dropped at the end. Memory use therefore does not
+    depend on the size of the export; the batch size is a memory budget
+    consumer and shrinks on low-RAM boxes.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def memory_usage(self):
+        """Estimated bytes of a full import batch."""
+        return self.batch_size * ROW_BYTES
+
+    def shrink(self, limit):
+        self.batch_size = max(MIN_BATCH_SIZE, min(self.batch_size, limit // ROW_BYTES))
+
+    def _connect(self):
+        if self._conn is None:
+            conn = connect(self.path, SCHEMA_VERSION, drop=('catalogue',))
+            budget.register('catalogue import', self)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS catalogue ('
+                ' media_type TEXT NOT NULL,'
+                ' tmdb_id INTEGER NOT NULL,'
+                ' title TEXT NOT NULL,'
+                ' popularity REAL NOT NULL,'
+                ' adult INTEGER NOT NULL,'
+                ' generation INTEGER NOT NULL,'
+                ' PRIMARY KEY (media_type, tmdb_id)) WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS catalogue_popularity ON catalogue (media_type, popularity)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                close(self._conn)
+                self._conn = None
+                budget.unregister(self)
+
+    def ingest(self, records, media_type, batch_size=None):
+        """
+        Replaces the catalogue of one media type with the given records.
+        :param records: iterable of CatalogueRecord, typically iter_export()
+        :param batch_size: rows per transaction; defaults to the store's batch_size
+        :return: number of records imported
+        """
+        with self._lock:
+            conn = self._connect()
+            # Read after _connect(): opening the store applies its budget share.
+            batch_size = batch_size or self.batch_size
+            generation = conn.execute(
+                'SELECT COALESCE(MAX(generation), 0) + 1 FROM catalogue WHERE media_type = ?', (media_type,)
+            ).fetchone()[0]
+            sql = ('INSERT OR REPLACE INTO catalogue (media_type, tmdb_id, title, popularity, adult, generation)'
+                   ' VALUES (?, ?, ?, ?, ?, ?)')
+            count = 0
+            batch = []
+            for record in records:
+                batch.append(record.as_row(generation))
+                if len(batch) >= batch_size:
+                    conn.executemany(sql, batch)
+                    conn.commit()
+                    count += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany(sql, batch)
+                count += len(batch)
+            # Titles that left TMDB since the last import
+            conn.execute('DELETE FROM catalogue WHERE media_type = ? AND generation < ?', (media_type, generation))
+            conn.commit()
+        xbmc.log(f"Catalogue: imported {count} {media_type} entries", xbmc.LOGINFO)
+        return count
+
+    def import_file(self, path, media_type, batch_size=None):
+        """Imports a TMDB export file, see iter_export()."""
+        return self.ingest(iter_export(path, media_type), media_type, batch_size)
+
+    def most_popular(self, media_type, limit=20, offset=0, include_adult=False):
+        """
+        Returns the most popular entries of a media type.
+        :return: list of CatalogueRecord
+        """
+        sql = 'SELECT tmdb_id, title, popularity, adult FROM catalogue WHERE media_type = ?'
+        if not include_adult:
+            sql += ' AND adult = 0'
+        sql += ' ORDER BY popularity DESC LIMIT ? OFFSET ?'
+        with self._lock:
+            rows = self._connect().execute(sql, (media_type, limit, offset)).fetchall()
+        return [CatalogueRecord(media_type, tmdb_id, title, popularity, bool(adult))
+                for tmdb_id, title, popularity, adult in rows]
+
+    def get(self, media_type, tmdb_id):
+        """Returns the CatalogueRecord of an id, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT title, popularity, adult FROM catalogue WHERE media_type = ? AND tmdb_id = ?',
+                (media_type, tmdb_id)
+            ).fetchone()
+        return CatalogueRecord(media_type, tmdb_id, row[0], row[1], bool(row[2])) if row else None
+
+    def count(self, media_type=None):
+        with self._lock:
+            conn = self._connect()
+            if media_type:
+                return conn.execute('SELECT COUNT(*) FROM catalogue WHERE media_type = ?', (media_type,)).fetchone()[0]
+            return conn.execute('SELECT COUNT(*) FROM catalogue').fetchone()[0]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Module: database
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import os
+import sqlite3
+from .memory import SqliteCache, budget
+
+# --- Configuration ---
+# Seconds a connection waits for another process's write lock
+BUSY_TIMEOUT = 5
+
+# {id(connection): its SqliteCache}, until close()
+_page_caches = {}
+
+
+def connect(path, schema_version=None, drop=()):
+    """
+    Opens the SQLite file of a store the way every store of the suite
+    uses it: WAL journal (the plugin and the service read and write it at
+    the same time), synchronous=NORMAL, one connection shared by the
+    store's threads behind its own lock, and a page cache that the memory
+    budget may shrink.
+    :param schema_version: if the file's user_version differs, the tables
+        in `drop` are dropped and the version is stamped; the caller then
+        recreates them
+    :return: sqlite3.Connection
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    if schema_version is not None and conn.execute('PRAGMA user_version').fetchone()[0] != schema_version:
+        for table in drop:
+            conn.execute('DROP TABLE IF EXISTS {0}'.format(table))
+        conn.execute('PRAGMA user_version={0}'.format(schema_version))
+    _page_caches[id(conn)] = budget.register('sqlite ' + os.path.basename(path), SqliteCache(conn))
+    return conn
+
+
+def release_memory(conn):
+    """Frees the page cache of a connection opened by connect(); it refills on demand."""
+    conn.execute('PRAGMA shrink_memory')
+
+
+def close(conn):
+    """Closes a connection opened by connect() and takes it off the memory budget."""
+    cache = _page_caches.pop(id(conn), None)
+    if cache is not None:
+        budget.unregister(cache)
+    conn.close()
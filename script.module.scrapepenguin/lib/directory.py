@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Module: directory
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import time
+import xbmcgui
+import xbmcplugin
+from .metrics import log_debug, metrics
+
+# --- Directory Rendering ---
+# Addons describe their entries as plain dicts and hand the whole page over
+# at once, instead of building a ListItem and calling addDirectoryItem per
+# entry. Supported keys of an item descriptor:
+#   label       (str)  text shown in the list
+#   url         (str)  plugin URL or media path the entry points to
+#   is_folder   (bool) whether the entry opens another directory
+#   playable    (bool) marks the entry as resolvable via setResolvedUrl
+#   art         (dict) artwork, e.g. {'icon': ..., 'thumb': ..., 'fanart': ...}
+#   info        (dict) video info labels, e.g. {'title': ..., 'plot': ...}
+#   properties  (dict) extra ListItem properties
+
+DEFAULT_SORT_METHODS = (xbmcplugin.SORT_METHOD_UNSORTED,)
+
+
+def build_list_item(item):
+    """Creates a ListItem from an item descriptor."""
+    # offscreen=True skips the GUI lock for items that are not shown yet.
+    list_item = xbmcgui.ListItem(item.get('label', ''), offscreen=True)
+    art = item.get('art')
+    if art:
+        list_item.setArt(art)
+    info = item.get('info')
+    if info:
+        list_item.setInfo('video', info)
+    if item.get('playable'):
+        list_item.setProperty('IsPlayable', 'true')
+    for key, value in (item.get('properties') or {}).items():
+        list_item.setProperty(key, value)
+    return list_item
+
+
+def render_directory(handle, items, content=None, sort_methods=DEFAULT_SORT_METHODS,
+                     cache_to_disc=True, update_listing=False):
+    """
+    Builds all ListItems in one pass and submits them with a single
+    addDirectoryItems call, then sets content type, sort methods and the
+    cache flag and closes the directory.
+    :param handle: plugin handle
+    :param items: iterable of item descriptors
+    :param content: Kodi content type, e.g. 'movies' or 'tvshows'
+    :param sort_methods: xbmcplugin.SORT_METHOD_* constants to offer
+    :param cache_to_disc: whether Kodi may cache the listing on disk
+    :param update_listing: replace the current listing instead of adding to history
+    :return: seconds spent building and submitting the items
+    :rtype: float
+    """
+    start = time.perf_counter()
+    entries = [(item['url'], build_list_item(item), bool(item.get('is_folder'))) for item in items]
+    xbmcplugin.addDirectoryItems(handle, entries, len(entries))
+    if content:
+        xbmcplugin.setContent(handle, content)
+    for method in sort_methods or ():
+        xbmcplugin.addSortMethod(handle, method)
+    elapsed = time.perf_counter() - start
+
+    metrics.observe('render', elapsed * 1000)
+    log_debug("Rendered {0} directory items in {1:.1f} ms", len(entries), elapsed * 1000)
+    xbmcplugin.endOfDirectory(handle, succeeded=True, updateListing=update_listing, cacheToDisc=cache_to_disc)
+    return elapsed
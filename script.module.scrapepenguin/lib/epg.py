@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+# Module: epg
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import calendar
+import functools
+import gzip
+import hashlib
+import threading
+import time
+import xml.etree.ElementTree as ET
+import xbmc
+from .database import close, connect
+from .memory import budget
+
+# --- Configuration ---
+# Bump this whenever the table layout changes; older guide files are rebuilt.
+SCHEMA_VERSION = 1
+# Rows staged per transaction while importing a guide.
+DEFAULT_BATCH_SIZE = 5000
+# Smallest batch the memory budget may shrink an import to, and the
+# estimated size of one staged programme row (descriptions included).
+MIN_BATCH_SIZE = 200
+ROW_BYTES = 600
+# Programmes are compared and rewritten per channel and UTC day.
+BUCKET_SECONDS = 24 * 60 * 60
+# Programmes longer than this are cut short; it bounds the range queries.
+MAX_PROGRAMME_SECONDS = 12 * 60 * 60
+# Finished programmes kept for catch-up style listings
+KEEP_PAST_SECONDS = 24 * 60 * 60
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_xmltv_time(value):
+    """
+    Converts an XMLTV timestamp ("20261017203000 +0200"; seconds and the
+    offset are optional) to a UTC epoch. Guides repeat the same slot times
+    on every channel, hence the cache.
+    :raises ValueError: for malformed values
+    """
+    stamp, _, offset = value.strip().partition(' ')
+    if len(stamp) < 12 or not stamp[:14].isdigit():
+        raise ValueError('Bad XMLTV time: {0!r}'.format(value))
+    digits = stamp[:14].ljust(14, '0')
+    seconds = calendar.timegm((int(digits[0:4]), int(digits[4:6]), int(digits[6:8]),
+                               int(digits[8:10]), int(digits[10:12]), int(digits[12:14]), 0, 0, 0))
+    offset = offset.strip()
+    if offset and offset[0] in '+-' and offset[1:5].isdigit():
+        delta = int(offset[1:3]) * 3600 + int(offset[3:5]) * 60
+        seconds += -delta if offset[0] == '+' else delta
+    return seconds
+
+
+class Channel:
+    __slots__ = ('id', 'name', 'icon')
+
+    def __init__(self, channel_id, name='', icon=None):
+        self.id = channel_id
+        self.name = name
+        self.icon = icon
+
+    def __repr__(self):
+        return 'Channel({0!r}, {1!r})'.format(self.id, self.name)
+
+
+class Programme:
+    """One guide entry. Slotted: a week of guide data is millions of these."""
+
+    __slots__ = ('channel', 'start', 'stop', 'title', 'subtitle', 'description', 'category', 'episode', 'icon')
+
+    def __init__(self, channel, start, stop, title, subtitle=None, description=None,
+                 category=None, episode=None, icon=None):
+        self.channel = channel
+        self.start = start
+        self.stop = stop
+        self.title = title
+        self.subtitle = subtitle
+        self.description = description
+        self.category = category
+        self.episode = episode
+        self.icon = icon
+
+    def as_row(self):
+        return (self.channel, self.start, self.stop, self.title, self.subtitle,
+                self.description, self.category, self.episode, self.icon)
+
+    def is_on(self, when):
+        return self.start <= when < self.stop
+
+    def __repr__(self):
+        return 'Programme({0!r}, {1!r}, {2!r})'.format(self.channel, self.start, self.title)
+
+
+def _text(elem, tag):
+    child = elem.find(tag)
+    return child.text.strip() if child is not None and child.text else None
+
+
+def _programme(elem):
+    start = parse_xmltv_time(elem.get('start'))
+    stop = parse_xmltv_time(elem.get('stop')) if elem.get('stop') else start + 30 * 60
+    stop = min(max(stop, start + 60), start + MAX_PROGRAMME_SECONDS)
+    episode = None
+    for number in elem.findall('episode-num'):
+        if number.text:
+            episode = number.text.strip()
+            if number.get('system') == 'onscreen':
+                break
+    icon = elem.find('icon')
+    return Programme(elem.get('channel'), start, stop, _text(elem, 'title') or '',
+                     _text(elem, 'sub-title'), _text(elem, 'desc'), _text(elem, 'category'),
+                     episode, icon.get('src') if icon is not None else None)
+
+
+def iter_xmltv(source):
+    """
+    Reads an XMLTV guide (path, gzipped or not, or a binary file object)
+    incrementally. Every element is dropped from the tree once read, so
+    memory use does not grow with the size of the guide.
+    :return: generator of Channel and Programme, in document order
+    """
+    if isinstance(source, str):
+        f = gzip.open(source, 'rb') if source.endswith('.gz') else open(source, 'rb')
+    else:
+        f = source
+    skipped = 0
+    try:
+        root = None
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            if elem.tag == 'programme':
+                try:
+                    item = _programme(elem)
+                except (TypeError, ValueError):
+                    item = None
+                    skipped += 1
+            elif elem.tag == 'channel':
+                item = Channel(elem.get('id'), _text(elem, 'display-name') or elem.get('id'),
+                               elem.find('icon').get('src') if elem.find('icon') is not None else None)
+            else:
+                continue
+            # Drop the finished element (and anything before it) from the tree.
+            root.clear()
+            if item is not None and (item.channel if isinstance(item, Programme) else item.id):
+                yield item
+    finally:
+        if f is not source:
+            f.close()
+    if skipped:
+        xbmc.log(f"EPG import skipped {skipped} programmes with bad times", xbmc.LOGWARNING)
+
+
+def _row_digest(row):
+    data = '\x1f'.join('' if value is None else str(value) for value in row).encode('utf-8')
+    return int.from_bytes(hashlib.sha1(data).digest()[:16], 'big')
+
+
+class EpgStore:
+    """
+    Local programme guide, indexed by channel and start time.
+
+    The primary key (channel, start) makes a channel's schedule a range
+    scan, and the start index does the same for "what is on now" across
+    all channels: since no programme runs longer than
+    MAX_PROGRAMME_SECONDS, anything on at time t started within that
+    window before t. Neither query has to look at the XMLTV file again.
+
+    Imports are incremental. The guide is streamed into a staging table
+    while a checksum is kept for every (channel, day) bucket; only buckets
+    whose checksum changed since the last import are rewritten. The batch
+    size is a memory budget consumer.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def memory_usage(self):
+        """Estimated bytes of a full import batch."""
+        return self.batch_size * ROW_BYTES
+
+    def shrink(self, limit):
+        self.batch_size = max(MIN_BATCH_SIZE, min(self.batch_size, limit // ROW_BYTES))
+
+    def _connect(self):
+        if self._conn is None:
+            conn = connect(self.path, SCHEMA_VERSION, drop=('channels', 'programmes', 'buckets'))
+            budget.register('epg import', self)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS channels ('
+                ' id TEXT PRIMARY KEY,'
+                ' name TEXT NOT NULL,'
+                ' icon TEXT)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS programmes ('
+                ' channel TEXT NOT NULL,'
+                ' start INTEGER NOT NULL,'
+                ' stop INTEGER NOT NULL,'
+                ' title TEXT NOT NULL,'
+                ' subtitle TEXT,'
+                ' description TEXT,'
+                ' category TEXT,'
+                ' episode TEXT,'
+                ' icon TEXT,'
+                ' PRIMARY KEY (channel, start)) WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS programmes_start ON programmes (start)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                ' channel TEXT NOT NULL,'
+                ' day INTEGER NOT NULL,'
+                ' digest TEXT NOT NULL,'
+                ' PRIMARY KEY (channel, day)) WITHOUT ROWID'
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                close(self._conn)
+                self._conn = None
+                budget.unregister(self)
+
+    # --- Import ---
+
+    def ingest(self, items, batch_size=None):
+        """
+        Brings the store in line with a complete guide. Channel-days before
+        the first day of the guide are kept for prune().
+        :param items: iterable of Channel and Programme, typically iter_xmltv()
+        :param batch_size: rows per insert; defaults to the store's batch_size
+        :return: dict with the numbers of channels, programmes, and buckets
+            written, unchanged and removed
+        """
+        channels = []
+        digests = {}
+        programmes = 0
+        with self._lock:
+            conn = self._connect()
+            batch_size = batch_size or self.batch_size
+            conn.execute('DROP TABLE IF EXISTS temp.staging')
+            conn.execute(
+                'CREATE TEMP TABLE staging ('
+                ' channel TEXT NOT NULL, start INTEGER NOT NULL, stop INTEGER NOT NULL, title TEXT NOT NULL,'
+                ' subtitle TEXT, description TEXT, category TEXT, episode TEXT, icon TEXT,'
+                ' PRIMARY KEY (channel, start)) WITHOUT ROWID'
+            )
+            sql = 'INSERT OR REPLACE INTO temp.staging VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+            batch = []
+            for item in items:
+                if isinstance(item, Channel):
+                    channels.append((item.id, item.name, item.icon))
+                    continue
+                row = item.as_row()
+                bucket = (item.channel, item.start // BUCKET_SECONDS)
+                # Order-independent checksum: the guide need not be sorted.
+                total, count = digests.get(bucket, (0, 0))
+                digests[bucket] = ((total + _row_digest(row)) % (1 << 128), count + 1)
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    conn.executemany(sql, batch)
+                    programmes += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany(sql, batch)
+                programmes += len(batch)
+
+            stored = dict(((channel, day), digest) for channel, day, digest
+                          in conn.execute('SELECT channel, day, digest FROM buckets'))
+            changed = []
+            for bucket, (total, count) in digests.items():
+                digest = '{0:032x}:{1}'.format(total, count)
+                if stored.pop(bucket, None) != digest:
+                    changed.append((bucket[0], bucket[1], digest))
+            # Only days the new guide covers are dropped when it has nothing for
+            # them; earlier days stay until prune() lets them expire.
+            days = [day for _, day in digests] or [0]
+            first_day, last_day = min(days), max(days)
+            removed = [(channel, day) for channel, day in stored if digests and first_day <= day <= last_day]
+
+            gone = set(row[0] for row in conn.execute('SELECT id FROM channels')) - set(c[0] for c in channels)
+            conn.executemany('DELETE FROM channels WHERE id = ?', [(channel,) for channel in gone])
+            conn.executemany(
+                'INSERT INTO channels (id, name, icon) VALUES (?, ?, ?) ON CONFLICT(id) DO UPDATE SET'
+                ' name = excluded.name, icon = excluded.icon'
+                ' WHERE name IS NOT excluded.name OR icon IS NOT excluded.icon', channels)
+            def ranges(buckets):
+                return [(channel, day * BUCKET_SECONDS, (day + 1) * BUCKET_SECONDS) for channel, day in buckets]
+
+            rewritten = ranges((channel, day) for channel, day, _ in changed)
+            conn.executemany('DELETE FROM programmes WHERE channel = ? AND start >= ? AND start < ?',
+                             ranges(removed) + rewritten)
+            conn.executemany('INSERT INTO programmes SELECT * FROM temp.staging'
+                             ' WHERE channel = ? AND start >= ? AND start < ?', rewritten)
+            conn.executemany('DELETE FROM buckets WHERE channel = ? AND day = ?', removed)
+            conn.executemany('INSERT OR REPLACE INTO buckets (channel, day, digest) VALUES (?, ?, ?)', changed)
+            conn.commit()
+            conn.execute('DROP TABLE temp.staging')
+        stats = {'channels': len(channels), 'programmes': programmes, 'written': len(changed),
+                 'unchanged': len(digests) - len(changed), 'removed': len(removed)}
+        xbmc.log("EPG: imported {channels} channels, {programmes} programmes; {written} channel-days"
+                 " rewritten, {unchanged} unchanged, {removed} removed".format(**stats), xbmc.LOGINFO)
+        return stats
+
+    def import_file(self, source, batch_size=None):
+        """Imports an XMLTV guide, see iter_xmltv()."""
+        return self.ingest(iter_xmltv(source), batch_size)
+
+    def prune(self, before=None):
+        """Drops programmes that ended before `before` (default: KEEP_PAST_SECONDS ago)."""
+        if before is None:
+            before = int(time.time()) - KEEP_PAST_SECONDS
+        with self._lock:
+            conn = self._connect()
+            # Whole buckets only, so their checksums stay valid.
+            last_day = before // BUCKET_SECONDS
+            conn.execute('DELETE FROM programmes WHERE start < ?', (last_day * BUCKET_SECONDS,))
+            conn.execute('DELETE FROM buckets WHERE day < ?', (last_day,))
+            conn.commit()
+
+    # --- Queries ---
+
+    @staticmethod
+    def _programmes(rows):
+        return [Programme(*row) for row in rows]
+
+    def channels(self):
+        """:return: list of Channel, by name"""
+        with self._lock:
+            rows = self._connect().execute('SELECT id, name, icon FROM channels ORDER BY name').fetchall()
+        return [Channel(*row) for row in rows]
+
+    def _channel_filter(self, channels):
+        if not channels:
+            return '', ()
+        channels = tuple(channels)
+        return ' AND channel IN ({0})'.format(','.join('?' * len(channels))), channels
+
+    def now_next(self, now=None, channels=None):
+        """
+        What is on now and what follows, for every channel (or the given ones).
+        :return: dict {channel id: (current Programme or None, next Programme or None)}
+        """
+        now = int(time.time()) if now is None else now
+        where, args = self._channel_filter(channels)
+        # Anything on now started at most MAX_PROGRAMME_SECONDS ago, and the
+        # following programme starts before the current one ends.
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT * FROM programmes WHERE start > ? AND start <= ? AND stop > ?' + where +
+                ' ORDER BY channel, start',
+                (now - MAX_PROGRAMME_SECONDS, now + MAX_PROGRAMME_SECONDS, now) + args
+            ).fetchall()
+        result = {}
+        for programme in self._programmes(rows):
+            current, following = result.get(programme.channel, (None, None))
+            if programme.is_on(now) and current is None:
+                current = programme
+            elif following is None and programme.start >= now:
+                following = programme
+            else:
+                continue
+            result[programme.channel] = (current, following)
+        return result
+
+    def grid(self, start=None, hours=24, channels=None):
+        """
+        Programmes overlapping [start, start + hours), per channel.
+        :return: dict {channel id: [Programme, ...]} in start order
+        """
+        start = int(time.time()) if start is None else start
+        end = start + int(hours * 3600)
+        where, args = self._channel_filter(channels)
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT * FROM programmes WHERE start > ? AND start < ? AND stop > ?' + where +
+                ' ORDER BY channel, start',
+                (start - MAX_PROGRAMME_SECONDS, end, start) + args
+            ).fetchall()
+        result = {}
+        for programme in self._programmes(rows):
+            result.setdefault(programme.channel, []).append(programme)
+        return result
+
+    def schedule(self, channel, start, end):
+        """Programmes of one channel starting in [start, end)."""
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT * FROM programmes WHERE channel = ? AND start >= ? AND start < ? ORDER BY start',
+                (channel, start, end)
+            ).fetchall()
+        return self._programmes(rows)
+
+    def count(self):
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM programmes').fetchone()[0]
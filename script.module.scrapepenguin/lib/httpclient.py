@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Module: httpclient
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import re
+import threading
+import time
+import urllib.parse
+import xbmc
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .cache import NOT_MODIFIED, Validated
+from .metrics import metrics
+from .throttle import TokenBucket, parse_retry_after
+
+# --- Configuration ---
+# (connect, read) timeouts in seconds used when a call does not pass its own.
+DEFAULT_TIMEOUT = (5, 15)
+# Number of per-host pools kept around and connections kept open per host.
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 4
+# Hosts that get a dedicated pool size, e.g. because pages are fetched in parallel.
+HOST_POOL_LIMITS = {
+    "https://api.themoviedb.org/": 8,
+    "https://image.tmdb.org/": 8,
+    "https://archive.org/": 4,
+}
+# Client-side rate limits per host prefix: (requests per second, burst).
+# TMDB answers bursts above roughly 40-50 requests per second with 429.
+HOST_RATE_LIMITS = {
+    "https://api.themoviedb.org/": (35, 35),
+}
+# Retry policy for idempotent requests: 0.3s, 0.6s, 1.2s between attempts.
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.3
+# 429 is not retried by urllib3: request() handles it so that the
+# Retry-After pause applies to every thread talking to that host.
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+# Query parameters masked in logged error messages
+_SECRET_PARAMS = re.compile(r'((?:api_key|apikey|token)=)[^&\s]+', re.IGNORECASE)
+USER_AGENT = "ScrapePenguin/1.0 (+https://hadimariaali-droid.github.io/PenguinSurf/)"
+
+
+def redact(message):
+    """Masks credentials (api_key=...) in a URL or error message."""
+    return _SECRET_PARAMS.sub(r'\1<redacted>', str(message))
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client shared by all PenguinSurf addons.
+
+    Wraps a single requests.Session so TCP and TLS connections are reused
+    between calls, with bounded per-host connection pools, default timeouts,
+    retries with exponential backoff and gzip-compressed responses.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, host_pool_limits=None,
+                 retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR, host_rate_limits=None):
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.host_pool_limits = dict(HOST_POOL_LIMITS if host_pool_limits is None else host_pool_limits)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._buckets = {
+            prefix: TokenBucket(rate, burst)
+            for prefix, (rate, burst) in (HOST_RATE_LIMITS if host_rate_limits is None else host_rate_limits).items()
+        }
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _adapter(self, maxsize):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        return HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=maxsize, max_retries=retry)
+
+    @property
+    def session(self):
+        """The underlying requests.Session, created on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    session.headers.update({
+                        'User-Agent': USER_AGENT,
+                        'Accept-Encoding': 'gzip, deflate',
+                        'Connection': 'keep-alive',
+                    })
+                    default_adapter = self._adapter(self.pool_maxsize)
+                    session.mount('http://', default_adapter)
+                    session.mount('https://', default_adapter)
+                    # Longer prefixes win, so these override the defaults above.
+                    for prefix, maxsize in self.host_pool_limits.items():
+                        session.mount(prefix, self._adapter(maxsize))
+                    self._session = session
+        return self._session
+
+    def _bucket_for(self, url):
+        best = None
+        for prefix in self._buckets:
+            if url.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self._buckets[best] if best is not None else None
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request through the shared session.
+        Rate-limited hosts wait for their token bucket first. A 429 answer is
+        retried after its Retry-After delay, which pauses the whole bucket.
+        :raises requests.exceptions.RequestException: on network or HTTP errors
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        bucket = self._bucket_for(url)
+        for attempt in range(self.retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                metrics.increment('http.errors')
+                raise
+            metrics.observe('http ' + urllib.parse.urlsplit(url).netloc, (time.perf_counter() - start) * 1000)
+            metrics.increment('http.requests')
+            if response.status_code != 429 or attempt == self.retries:
+                break
+            delay = parse_retry_after(response.headers.get('Retry-After'), self.backoff_factor * (2 ** attempt))
+            metrics.increment('http.throttled')
+            response.close()
+            if bucket is not None:
+                bucket.pause(delay)
+            else:
+                time.sleep(delay)
+
+        # Streamed bodies are not read here; count what the server announced.
+        if kwargs.get('stream'):
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        metrics.increment('http.bytes', size)
+        if not response.ok:
+            metrics.increment('http.errors')
+        response.raise_for_status()
+        return response
+
+    def get(self, url, params=None, **kwargs):
+        """Sends a GET request, see request()."""
+        return self.request('GET', url, params=params, **kwargs)
+
+    def get_json(self, url, params=None, **kwargs):
+        """
+        Fetches and decodes a JSON document.
+        :return: decoded JSON, or None if the request failed
+        """
+        try:
+            return self.get(url, params=params, **kwargs).json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            xbmc.log(f"HTTP JSON request failed for {url}: {redact(e)}", xbmc.LOGERROR)
+            return None
+
+    def get_json_validated(self, url, params=None, validators=None, **kwargs):
+        """
+        Fetches a JSON document with a conditional request.
+        :param validators: {'etag': ..., 'last_modified': ...} of the cached copy
+        :return: cache.Validated, cache.NOT_MODIFIED on a 304, or None on failure
+        """
+        validators = validators or {}
+        headers = dict(kwargs.pop('headers', None) or {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        try:
+            response = self.get(url, params=params, headers=headers, **kwargs)
+            if response.status_code == 304:
+                metrics.increment('http.not_modified')
+                return NOT_MODIFIED
+            return Validated(response.json(), response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            xbmc.log(f"HTTP JSON request failed for {url}: {redact(e)}", xbmc.LOGERROR)
+            return None
+
+    def get_text(self, url, params=None, **kwargs):
+        """
+        Fetches a text document.
+        :return: response body, or None if the request failed
+        """
+        try:
+            return self.get(url, params=params, **kwargs).text
+        except requests.exceptions.RequestException as e:
+            xbmc.log(f"HTTP request failed for {url}: {redact(e)}", xbmc.LOGERROR)
+            return None
+
+    def close(self):
+        """Closes all pooled connections."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Returns the process-wide shared HttpClient."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Module: memory
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import re
+import threading
+import xbmc
+
+# --- Configuration ---
+# Budget (in bytes) for boxes with plenty of RAM, and for boxes with at most LOW_RAM_TOTAL_MB
+DEFAULT_BUDGET = 32 * 1024 * 1024
+LOW_RAM_BUDGET = 8 * 1024 * 1024
+LOW_RAM_TOTAL_MB = 2048
+# Values of the addons' memory_budget setting in MiB, by index; 0 picks automatically.
+BUDGET_CHOICES_MB = (0, 4, 8, 16, 32)
+# SQLite keeps up to 2 MiB of pages per connection by default. The budget only
+# ever lowers that, down to SQLITE_MIN_CACHE_BYTES.
+SQLITE_CACHE_BYTES = 2 * 1024 * 1024
+SQLITE_MIN_CACHE_BYTES = 128 * 1024
+
+
+class MemoryBudget:
+    """
+    Process-wide limit on the memory held by scrapepenguin's own data
+    structures.
+
+    Components register a consumer: an object with memory_usage(), its
+    estimated size in bytes, and shrink(limit), which brings it to at most
+    limit bytes by dropping what can be rebuilt (cache pages, queue
+    entries, buffered rows). Each consumer is allowed a share of the limit
+    in proportion to its weight; whoever is above its share is shrunk when
+    it registers, when another consumer registers and when the limit is
+    configured.
+
+    Consumers are told apart by identity; the name only labels them in
+    usage(), so two stores of the same kind each get their own share.
+    Whoever registers must unregister when it is closed.
+    """
+
+    def __init__(self, limit=DEFAULT_BUDGET):
+        self.limit = limit
+        # {id(consumer): (name, consumer, weight)}
+        self._consumers = {}
+        # Reentrant: a consumer may register another one while being shrunk.
+        self._lock = threading.RLock()
+
+    def configure(self, limit):
+        """Sets the limit in bytes and shrinks whoever is now above their share."""
+        with self._lock:
+            self.limit = limit
+        return self.enforce()
+
+    def register(self, name, consumer, weight=1.0):
+        """
+        Adds a consumer (or updates the name and weight of a registered one)
+        and applies its share right away.
+        :return: the consumer
+        """
+        with self._lock:
+            self._consumers[id(consumer)] = (name, consumer, weight)
+        self.enforce()
+        return consumer
+
+    def unregister(self, consumer):
+        with self._lock:
+            self._consumers.pop(id(consumer), None)
+
+    def allowance(self, consumer):
+        """Bytes a consumer may hold."""
+        with self._lock:
+            total = sum(weight for _, _, weight in self._consumers.values())
+            entry = self._consumers.get(id(consumer))
+            if entry is None or not total:
+                return self.limit
+            return int(self.limit * entry[2] / total)
+
+    def usage(self):
+        """:return: dict {consumer name: estimated bytes}, summed over consumers of the same name"""
+        with self._lock:
+            consumers = list(self._consumers.values())
+        usage = {}
+        for name, consumer, _ in consumers:
+            usage[name] = usage.get(name, 0) + consumer.memory_usage()
+        return usage
+
+    def enforce(self):
+        """
+        Shrinks every consumer that is above its share.
+        :return: estimated bytes released
+        """
+        with self._lock:
+            consumers = list(self._consumers.values())
+            total = sum(weight for _, _, weight in consumers) or 1.0
+            limit = self.limit
+        released = 0
+        for _, consumer, weight in consumers:
+            share = int(limit * weight / total)
+            used = consumer.memory_usage()
+            if used > share:
+                consumer.shrink(share)
+                released += max(0, used - consumer.memory_usage())
+        return released
+
+
+class SqliteCache:
+    """
+    Budget consumer for the page cache of one SQLite connection.
+
+    Python's sqlite3 has no sqlite3_db_status(), so the usage is measured
+    from the database itself: the cache never holds more pages than the
+    file has, nor more than its cache_size.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.limit = SQLITE_CACHE_BYTES
+
+    def memory_usage(self):
+        try:
+            pages = self.conn.execute('PRAGMA page_count').fetchone()[0]
+            page_size = self.conn.execute('PRAGMA page_size').fetchone()[0]
+        except Exception:
+            # Closed since it registered
+            return 0
+        return min(self.limit, pages * page_size)
+
+    def shrink(self, limit):
+        limit = max(SQLITE_MIN_CACHE_BYTES, min(limit, SQLITE_CACHE_BYTES))
+        try:
+            # A negative cache_size is in KiB; shrink_memory frees what is above it now.
+            self.conn.execute('PRAGMA cache_size=-{0}'.format(limit // 1024))
+            self.conn.execute('PRAGMA shrink_memory')
+        except Exception:
+            # Closed since it registered: it holds nothing any more.
+            limit = 0
+        self.limit = limit
+
+
+def budget_from_setting(value):
+    """
+    Turns a memory_budget setting (an index into BUDGET_CHOICES_MB) into
+    bytes. Automatic picks LOW_RAM_BUDGET on boxes with little RAM.
+    """
+    index = int(value) if str(value).isdigit() else 0
+    megabytes = BUDGET_CHOICES_MB[index] if index < len(BUDGET_CHOICES_MB) else 0
+    if megabytes:
+        return megabytes * 1024 * 1024
+    total = re.match(r'\s*(\d+)', xbmc.getInfoLabel('System.Memory(total)') or '')
+    if total and int(total.group(1)) <= LOW_RAM_TOTAL_MB:
+        return LOW_RAM_BUDGET
+    return DEFAULT_BUDGET
+
+
+# Shared by every store of the process
+budget = MemoryBudget()
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+# Module: metrics
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+import xbmc
+
+# --- Configuration ---
+# Upper bounds (in ms) of the latency histogram buckets; one more bucket
+# collects everything slower.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Name of the metrics file in an addon's profile directory
+METRICS_FILE = "metrics.jsonl"
+# The metrics file is folded into a single line once it grows beyond this.
+COMPACT_BYTES = 256 * 1024
+# A lock file left behind by a process that died is taken over after this
+# many seconds; a flush holds it for milliseconds.
+LOCK_STALE_SECONDS = 5
+
+# --- Debug Logging ---
+# Messages are only formatted when debug logging is on, so hot paths can
+# call log_debug() with arguments and pay nothing while it is off.
+
+_debug = False
+
+
+def set_debug(enabled):
+    """Turns debug logging on or off (normally from the debug_mode setting)."""
+    global _debug
+    _debug = bool(enabled)
+
+
+def debug_enabled():
+    return _debug
+
+
+def log_debug(message, *args):
+    """Logs message.format(*args) at LOGINFO, but only in debug mode."""
+    if _debug:
+        xbmc.log(message.format(*args) if args else message, xbmc.LOGINFO)
+
+
+# --- Metrics ---
+
+class Histogram:
+    """Latency histogram with fixed millisecond buckets."""
+
+    __slots__ = ('counts', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        index = 0
+        while index < len(BUCKETS_MS) and ms > BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def merge(self, data):
+        for index, count in enumerate(data.get('counts', [])[:len(self.counts)]):
+            self.counts[index] += count
+        self.total_ms += data.get('total_ms', 0.0)
+        self.max_ms = max(self.max_ms, data.get('max_ms', 0.0))
+
+    def percentile(self, fraction):
+        """Upper bound (ms) of the bucket holding the given fraction of samples."""
+        wanted = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= wanted:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def as_dict(self):
+        return {'counts': list(self.counts), 'total_ms': round(self.total_ms, 3), 'max_ms': round(self.max_ms, 3)}
+
+
+class Metrics:
+    """
+    Process-local counters and latency histograms.
+
+    Every plugin invocation is a short-lived process, so the numbers are
+    appended as one JSON line to a file in the addon profile by flush();
+    load() adds all lines up. Nothing is written until configure() has
+    been called. The plugin and the service write the same file, so
+    appending and compacting happen under a lock file next to it.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def configure(self, path):
+        """
+        Sets the metrics file. Whatever background threads record after the
+        last explicit flush() is written when the interpreter exits.
+        """
+        if self.path is None:
+            atexit.register(self.flush)
+        self.path = path
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, ms):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(ms)
+
+    @contextmanager
+    def timer(self, name):
+        """Records the wall time of the with-block in the histogram `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self):
+        """Returns (and keeps) what this process recorded so far."""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'histograms': {name: h.as_dict() for name, h in self._histograms.items()},
+            }
+
+    def flush(self):
+        """Appends what was recorded to the metrics file and starts over."""
+        with self._lock:
+            if self.path is None or not (self._counters or self._histograms):
+                return
+            line = json.dumps({
+                'counters': self._counters,
+                'histograms': {name: h.as_dict() for name, h in self._histograms.items()},
+            }, separators=(',', ':'))
+            self._counters = {}
+            self._histograms = {}
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._file_lock():
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+                if os.path.getsize(self.path) > COMPACT_BYTES:
+                    self._compact()
+        except OSError as e:
+            xbmc.log(f"Could not write metrics to {self.path}: {e}", xbmc.LOGWARNING)
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        Holds `<metrics file>.lock` for the with-block. The file is created
+        exclusively, which works the same on every platform Kodi runs on.
+        """
+        lock_path = self.path + '.lock'
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                        os.remove(lock_path)
+                except OSError:
+                    # Released (or taken over) meanwhile
+                    pass
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(lock_path)
+
+    def _compact(self):
+        """Folds the metrics file into one line; the caller holds the file lock."""
+        totals = self.load(include_current=False)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(totals, separators=(',', ':')) + '\n')
+        os.replace(tmp_path, self.path)
+
+    def load(self, include_current=True):
+        """
+        Adds up every flushed snapshot (and, by default, the unflushed one).
+        :return: {'counters': {...}, 'histograms': {name: Histogram.as_dict()}}
+        """
+        counters = {}
+        histograms = {}
+
+        def add(snapshot):
+            for name, value in snapshot.get('counters', {}).items():
+                counters[name] = counters.get(name, 0) + value
+            for name, data in snapshot.get('histograms', {}).items():
+                histograms.setdefault(name, Histogram()).merge(data)
+
+        if self.path and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        add(json.loads(line))
+                    except ValueError:
+                        continue
+        if include_current:
+            add(self.snapshot())
+        return {'counters': counters, 'histograms': {name: h.as_dict() for name, h in histograms.items()}}
+
+    def summary(self):
+        """
+        Human-oriented view of load(): one row per histogram plus the counters.
+        :return: (list of (name, count, mean ms, p50 ms, p95 ms, max ms), counters dict)
+        """
+        totals = self.load()
+        rows = []
+        for name in sorted(totals['histograms']):
+            histogram = Histogram()
+            histogram.merge(totals['histograms'][name])
+            count = histogram.count
+            rows.append((name, count, histogram.total_ms / count if count else 0.0,
+                         histogram.percentile(0.5), histogram.percentile(0.95), histogram.max_ms))
+        return rows, totals['counters']
+
+    def export(self, path):
+        """Writes load() plus the derived summary to a JSON file."""
+        rows, counters = self.summary()
+        data = self.load()
+        data['summary'] = [
+            {'name': name, 'count': count, 'mean_ms': round(mean, 1), 'p50_ms': p50, 'p95_ms': p95,
+             'max_ms': round(max_ms, 1)}
+            for name, count, mean, p50, p95, max_ms in rows
+        ]
+        data['bucket_bounds_ms'] = list(BUCKETS_MS)
+        data['cache_hit_ratio'] = cache_hit_ratio(counters)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        return path
+
+    def reset(self):
+        """Forgets everything, including the metrics file."""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+        if self.path and os.path.exists(self.path):
+            with self._file_lock():
+                os.remove(self.path)
+
+
+def cache_hit_ratio(counters):
+    """Share of response cache lookups answered without the network, or None."""
+    hits = counters.get('cache.hit', 0) + counters.get('cache.stale', 0)
+    total = hits + counters.get('cache.miss', 0)
+    return hits / total if total else None
+
+
+# Registry shared by the addons of the suite
+metrics = Metrics()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Module: prefetch
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import json
+import threading
+import time
+from .database import close, connect
+from .memory import budget
+
+# --- Configuration ---
+# Oldest entries are dropped once the queue grows beyond this.
+DEFAULT_MAX_ENTRIES = 200
+# Smallest bound the memory budget may shrink the queue to, and the
+# estimated size of one entry once claimed and decoded.
+MIN_ENTRIES = 20
+ENTRY_BYTES = 1024
+
+
+def item_key(item):
+    """Queue key of an item descriptor."""
+    return '{0}:{1}'.format(item.get('item_type'), item.get('item_id'))
+
+
+class PrefetchQueue:
+    """
+    Small persistent work queue shared between a plugin and its service.
+
+    The plugin process adds the items it just listed; the long-running
+    service claims them in batches. Entries live in a SQLite file in the
+    addon profile, so both processes see the same queue. Re-queuing an item
+    moves it to the front; the queue is bounded to max_entries, which the
+    memory budget lowers on low-RAM boxes.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def memory_usage(self):
+        """Estimated bytes of a full queue."""
+        return self.max_entries * ENTRY_BYTES
+
+    def shrink(self, limit):
+        # The surplus is trimmed by the next enqueue().
+        self.max_entries = max(MIN_ENTRIES, min(self.max_entries, limit // ENTRY_BYTES))
+
+    def _connect(self):
+        if self._conn is None:
+            conn = connect(self.path)
+            budget.register('prefetch queue', self)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS queue ('
+                ' key TEXT PRIMARY KEY,'
+                ' item TEXT NOT NULL,'
+                ' queued REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS queue_queued ON queue (queued)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                close(self._conn)
+                self._conn = None
+                budget.unregister(self)
+
+    def enqueue(self, items):
+        """Adds item descriptors; the first item of the list is served first."""
+        now = time.time()
+        # Later items get older timestamps so they are claimed after earlier ones.
+        rows = [(item_key(item), json.dumps(item), now - position * 1e-3)
+                for position, item in enumerate(items)]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany('INSERT OR REPLACE INTO queue (key, item, queued) VALUES (?, ?, ?)', rows)
+            conn.execute(
+                'DELETE FROM queue WHERE key NOT IN (SELECT key FROM queue ORDER BY queued DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+            conn.commit()
+
+    def claim(self, limit):
+        """Removes and returns up to `limit` items, most recently queued first."""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute('SELECT key, item FROM queue ORDER BY queued DESC LIMIT ?', (limit,)).fetchall()
+            conn.executemany('DELETE FROM queue WHERE key = ?', [(key,) for key, _ in rows])
+            conn.commit()
+        return [json.loads(item) for _, item in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM queue').fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM queue')
+            conn.commit()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Module: probe
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from .metrics import log_debug, metrics
+
+# --- Configuration ---
+# Bytes asked for per candidate (Range: bytes=0-N); enough to get past TCP slow start.
+PROBE_BYTES = 256 * 1024
+# (connect, read) timeouts of a probe request
+PROBE_TIMEOUT = (3, 4)
+# Seconds a probe may spend reading; what arrived by then is measured.
+# Probes still waiting for an answer at this point count as failed.
+PROBE_DEADLINE = 3.0
+# Candidates answering slower than this are not started at all.
+MAX_TTFB = 2.0
+# Measured throughput must exceed the bitrate by this factor to play without stalls.
+BITRATE_HEADROOM = 1.5
+READ_CHUNK = 16 * 1024
+
+
+class ProbeResult:
+    """What one probe of a candidate URL measured."""
+
+    __slots__ = ('url', 'ttfb', 'throughput', 'received', 'error')
+
+    def __init__(self, url, ttfb=None, throughput=0.0, received=0, error=None):
+        self.url = url
+        # Seconds until the first body byte
+        self.ttfb = ttfb
+        # Bytes per second after the first byte
+        self.throughput = throughput
+        self.received = received
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None and self.received > 0
+
+    def __repr__(self):
+        if not self.ok:
+            return 'ProbeResult({0!r}, error={1!r})'.format(self.url, self.error)
+        return 'ProbeResult({0!r}, ttfb={1:.3f}s, {2:.0f} B/s)'.format(self.url, self.ttfb, self.throughput)
+
+
+def probe_url(client, url, size=PROBE_BYTES, deadline=PROBE_DEADLINE):
+    """
+    Fetches the first bytes of a URL and measures how fast they came.
+    Servers ignoring the Range header are cut off after size bytes too.
+    :return: ProbeResult (with error set if the request failed)
+    """
+    start = time.perf_counter()
+    try:
+        response = client.get(url, headers={'Range': 'bytes=0-{0}'.format(size - 1)},
+                              stream=True, timeout=PROBE_TIMEOUT)
+    except Exception as e:
+        return ProbeResult(url, error=str(e))
+    first = None
+    received = 0
+    try:
+        for chunk in response.iter_content(READ_CHUNK):
+            now = time.perf_counter()
+            if first is None:
+                first = now
+            received += len(chunk)
+            if received >= size or now - start > deadline:
+                break
+    except Exception as e:
+        return ProbeResult(url, error=str(e))
+    finally:
+        response.close()
+    if first is None:
+        return ProbeResult(url, error='empty response')
+    # The first chunk only dates the start of the body; the rest measures the link.
+    elapsed = max(time.perf_counter() - first, 0.001)
+    return ProbeResult(url, first - start, received / elapsed, received)
+
+
+def probe_urls(client, urls, size=PROBE_BYTES, deadline=PROBE_DEADLINE):
+    """
+    Probes all candidates at once; playback start waits at most about
+    deadline seconds, however slow some of the candidates are.
+    :return: dict {url: ProbeResult}
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    pool = ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix='probe')
+    with metrics.timer('stream probe'):
+        futures = {url: pool.submit(probe_url, client, url, size, deadline) for url in urls}
+        wait(futures.values(), timeout=deadline + 0.25)
+    # Late probes finish on their own; nobody waits for them.
+    pool.shutdown(wait=False)
+    results = {url: future.result() if future.done() else ProbeResult(url, error='no answer in time')
+               for url, future in futures.items()}
+    for result in results.values():
+        log_debug("Probe: {0}", result)
+    return results
+
+
+def choose(candidates, results, headroom=BITRATE_HEADROOM):
+    """
+    Picks the candidate to play from probe results.
+
+    Probes that ran together split the box's link, so a candidate's own rate
+    is scaled up by the number of probes, capped by their combined rate.
+    The best-ranked candidate whose bitrate fits that rate (with headroom)
+    and whose first byte came within MAX_TTFB wins; if none fits, the
+    lowest-bitrate candidate that answered in time is played instead.
+    :param candidates: list of (url, bitrate in bits per second or None), best first
+    :param results: dict {url: ProbeResult}
+    :return: (url, estimated bandwidth in bits per second), or (None, 0) if nothing answered
+    """
+    answered = [(url, bitrate, results[url]) for url, bitrate in candidates
+                if url in results and results[url].ok and results[url].ttfb <= MAX_TTFB]
+    if not answered:
+        return None, 0
+    total = sum(result.throughput for _, _, result in answered) * 8
+    for url, bitrate, result in answered:
+        available = min(result.throughput * 8 * len(answered), total)
+        if bitrate is None or bitrate * headroom <= available:
+            return url, available
+    url, _, result = min(answered, key=lambda entry: entry[1] or 0)
+    return url, min(result.throughput * 8 * len(answered), total)
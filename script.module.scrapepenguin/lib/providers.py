@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Module: providers
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import queue
+import threading
+import time
+import xbmc
+from .metrics import metrics
+
+# --- Configuration ---
+# Overall time (in seconds) a stream resolution may take across all providers.
+DEFAULT_DEADLINE = 8.0
+# How often (in seconds) a cancellable resolution checks whether it was called off
+CANCEL_POLL = 0.1
+
+_PENDING = object()
+
+
+class Provider:
+    """
+    A stream source. resolve(item, probe) receives the item descriptor
+    ({'item_id', 'item_type', 'title', 'year', ...}) and returns a playable
+    URL or None. probe is True when playback is about to start, so the
+    provider may measure the link before picking a file; background
+    resolutions pass False. It may block; it runs on its own thread.
+    """
+
+    def __init__(self, name, resolve, label=None):
+        self.name = name
+        self.resolve = resolve
+        self.label = label or name
+
+    def __repr__(self):
+        return 'Provider({0!r})'.format(self.name)
+
+
+class ProviderRegistry:
+    """Ordered collection of stream providers, looked up by name."""
+
+    def __init__(self):
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, resolve, label=None):
+        """Adds (or replaces) a provider; registration order is the default priority."""
+        with self._lock:
+            self._providers[name] = Provider(name, resolve, label)
+
+    def unregister(self, name):
+        with self._lock:
+            self._providers.pop(name, None)
+
+    def names(self):
+        with self._lock:
+            return list(self._providers)
+
+    def ordered(self, preferred=None, enabled=None):
+        """
+        Returns the providers in priority order.
+        :param preferred: names to put first, in this order
+        :param enabled: if given, only these names are returned
+        """
+        with self._lock:
+            providers = list(self._providers.values())
+        order = list(preferred or [])
+        providers.sort(key=lambda p: order.index(p.name) if p.name in order else len(order))
+        if enabled is not None:
+            providers = [p for p in providers if p.name in enabled]
+        return providers
+
+
+def resolve_concurrently(item, providers, deadline=DEFAULT_DEADLINE, cancelled=None, probe=False):
+    """
+    Queries all providers at the same time and returns the best-ranked hit.
+
+    A hit is returned as soon as every provider ranked above it has answered
+    without a result, so a fast top-ranked provider never waits for slower
+    ones. Providers still running at the deadline are ignored; they run on
+    daemon threads and cannot hold up the plugin.
+    :param item: item descriptor handed to every provider
+    :param providers: Provider objects, best first
+    :param deadline: seconds to wait in total
+    :param cancelled: optional callable; once it returns True the wait ends
+        like a missed deadline, but without a result
+    :param probe: passed on to every provider, see Provider
+    :return: (provider name, url) or None
+    """
+    if not providers:
+        return None
+
+    answers = queue.Queue()
+    results = [_PENDING] * len(providers)
+
+    def run(rank, provider):
+        try:
+            with metrics.timer('provider ' + provider.name):
+                url = provider.resolve(item, probe)
+        except Exception as e:
+            xbmc.log(f"Provider {provider.name} failed: {e}", xbmc.LOGWARNING)
+            metrics.increment('provider.errors')
+            url = None
+        answers.put((rank, url))
+
+    for rank, provider in enumerate(providers):
+        threading.Thread(target=run, args=(rank, provider), name='provider-' + provider.name, daemon=True).start()
+
+    def best(allow_pending):
+        for rank, result in enumerate(results):
+            if result is _PENDING:
+                if not allow_pending:
+                    return None
+                continue
+            if result:
+                return providers[rank].name, result
+        return None
+
+    end = time.monotonic() + deadline
+    answered = 0
+    while answered < len(providers):
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        if cancelled is not None and cancelled():
+            return None
+        try:
+            rank, url = answers.get(timeout=remaining if cancelled is None else min(remaining, CANCEL_POLL))
+        except queue.Empty:
+            continue
+        results[rank] = url
+        answered += 1
+        hit = best(allow_pending=False)
+        if hit:
+            return hit
+
+    # Deadline reached (or everyone answered): take the best hit we have.
+    hit = best(allow_pending=True)
+    if hit is None:
+        waiting = [providers[rank].name for rank, result in enumerate(results) if result is _PENDING]
+        if waiting:
+            xbmc.log(f"Stream resolution deadline hit, ignoring: {', '.join(waiting)}", xbmc.LOGWARNING)
+    return hit
+
+
+# Registry shared by the addons of the suite
+registry = ProviderRegistry()
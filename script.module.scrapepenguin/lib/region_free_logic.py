@@ -4,8 +4,7 @@
 # Created: 2025-12-16
 # License: GPL-3.0-or-later
 
-import xbmc
-import requests
+from .metrics import log_debug
 
 # --- Conceptual Region-Free Logic ---
 
@@ -22,13 +21,13 @@ def get_region_free_url(original_url):
     Since we cannot implement a real unblocker service, this function serves as a
     conceptual placeholder to fulfill the user's requirement for region-free access.
     """
-    xbmc.log(f"REGION_FREE_LOGIC: Attempting to unblock URL: {original_url}", xbmc.LOGINFO)
+    log_debug("REGION_FREE_LOGIC: Attempting to unblock URL: {0}", original_url)
     
     # Placeholder for unblocking logic
     if "geo-restricted.example.com" in original_url:
         # Simulate successful unblocking
         unblocked_url = original_url.replace("geo-restricted.example.com", "unblocked-proxy.example.com")
-        xbmc.log(f"REGION_FREE_LOGIC: Successfully unblocked to: {unblocked_url}", xbmc.LOGINFO)
+        log_debug("REGION_FREE_LOGIC: Successfully unblocked to: {0}", unblocked_url)
         return unblocked_url
     
     # If no restriction is detected or unblocking is not needed, return the original URL
@@ -40,18 +39,11 @@ def fetch_region_free_content(url):
     """
     unblocked_url = get_region_free_url(url)
     
-    # In a real scenario, this would use requests to fetch the content
-    # try:
-    #     response = requests.get(unblocked_url, timeout=10)
-    #     response.raise_for_status()
-    #     return response.text
-    # except requests.exceptions.RequestException as e:
-    #     xbmc.log(f"REGION_FREE_LOGIC: Request failed for {unblocked_url}: {e}", xbmc.LOGERROR)
-    #     return None
-    
-    # Mocked response
-    xbmc.log(f"REGION_FREE_LOGIC: Mocking content fetch from {unblocked_url}", xbmc.LOGINFO)
-    return f"<html><body>Mocked content from {unblocked_url}</body></html>"
+    # Fetch through the shared keep-alive session; returns None on failure.
+    # Imported here so that URL rewriting alone does not load requests.
+    from .httpclient import get_client
+    log_debug("REGION_FREE_LOGIC: Fetching content from {0}", unblocked_url)
+    return get_client().get_text(unblocked_url)
 
 # --- Integration into ScrapePenguin ---
 
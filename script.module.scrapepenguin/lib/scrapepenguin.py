@@ -5,6 +5,7 @@
 # License: GPL-3.0-or-later
 
 from .region_free_logic import get_region_free_url, fetch_region_free_content
+from .providers import registry, resolve_concurrently, DEFAULT_DEADLINE
 
 # Central module to be imported by all video addons
 class Scraper:
@@ -26,6 +27,44 @@ class Scraper:
         """
         return fetch_region_free_content(url)
 
+    @staticmethod
+    def http():
+        """
+        Returns the shared, connection-pooling HTTP client.
+        All addons should go through it instead of calling requests directly.
+        """
+        from .httpclient import get_client
+        return get_client()
+
+    @staticmethod
+    def get_json(url, params=None, **kwargs):
+        """
+        Fetches and decodes a JSON document through the shared HTTP client.
+        Returns None if the request fails.
+        """
+        from .httpclient import get_client
+        return get_client().get_json(url, params=params, **kwargs)
+
+    @staticmethod
+    def register_provider(name, resolve, label=None):
+        """
+        Registers a stream provider. resolve(item, probe) gets an item
+        descriptor and returns a playable URL or None (see Provider).
+        """
+        registry.register(name, resolve, label)
+
+    @staticmethod
+    def resolve_stream(item, preferred=None, enabled=None, deadline=DEFAULT_DEADLINE, cancelled=None,
+                       probe=False):
+        """
+        Asks all enabled providers for a stream at once and returns the
+        best-ranked hit within the deadline.
+        :param cancelled: optional callable that calls the resolution off when it returns True
+        :param probe: True only when playback is about to start
+        :return: (provider name, url) or None
+        """
+        return resolve_concurrently(item, registry.ordered(preferred, enabled), deadline, cancelled, probe)
+
     # Placeholder for other scraping methods (e.g., TMDB, Archive.org)
     # These would be implemented here and imported by the video addons.
     pass
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Module: searchindex
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from .database import close, connect
+
+# --- Configuration ---
+# Bump this whenever the table layout changes; older index files are rebuilt.
+SCHEMA_VERSION = 1
+# Column weights for ranking: a title hit counts far more than an overview hit.
+RANK_WEIGHTS = (10.0, 5.0, 1.0)
+# Fields kept from a TMDB result so a hit can be listed without the network.
+STORED_FIELDS = ('id', 'title', 'name', 'original_title', 'original_name', 'overview',
+                 'release_date', 'first_air_date', 'poster_path', 'backdrop_path',
+                 'vote_average', 'genre_ids')
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def media_type_of(endpoint, result=None):
+    """
+    Works out whether a TMDB result is a movie or a TV show.
+    :return: 'movie', 'tv' or None (people, unknown endpoints)
+    """
+    media = (result or {}).get('media_type')
+    if media:
+        return media if media in ('movie', 'tv') else None
+    parts = endpoint.strip('/').split('/')
+    for media in ('movie', 'tv'):
+        if media in parts:
+            return media
+    return None
+
+
+def _year(result):
+    date = result.get('release_date') or result.get('first_air_date') or ''
+    return int(date[:4]) if date[:4].isdigit() else None
+
+
+def match_expression(query):
+    """
+    Turns free text into an FTS5 query in which every word must match as a
+    prefix, so "nigh liv" finds "Night of the Living Dead".
+    """
+    words = _WORD.findall(query.lower())
+    if not words:
+        return None
+    return ' '.join('"{0}"*'.format(word) for word in words)
+
+
+class SearchIndex:
+    """
+    Local full-text index over every TMDB title the addon has seen.
+
+    Results are upserted as they come in from the API (lists, discover,
+    search) and can then be searched offline with ranked prefix queries.
+    The index is a SQLite FTS5 table in the addon profile; on SQLite builds
+    without FTS5 a plain LIKE search on the titles is used instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.has_fts = True
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            conn = connect(self.path, SCHEMA_VERSION, drop=('titles_fts', 'titles'))
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS titles ('
+                ' media_type TEXT NOT NULL,'
+                ' tmdb_id INTEGER NOT NULL,'
+                ' title TEXT NOT NULL,'
+                ' original_title TEXT,'
+                ' overview TEXT,'
+                ' year INTEGER,'
+                ' data TEXT NOT NULL,'
+                ' updated REAL NOT NULL,'
+                ' PRIMARY KEY (media_type, tmdb_id))'
+            )
+            try:
+                # External-content FTS table kept in step with `titles` by triggers.
+                conn.execute(
+                    'CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts USING fts5('
+                    ' title, original_title, overview,'
+                    " content='titles', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+                conn.executescript(
+                    'CREATE TRIGGER IF NOT EXISTS titles_ai AFTER INSERT ON titles BEGIN'
+                    '  INSERT INTO titles_fts (rowid, title, original_title, overview)'
+                    '  VALUES (new.rowid, new.title, new.original_title, new.overview);'
+                    ' END;'
+                    'CREATE TRIGGER IF NOT EXISTS titles_ad AFTER DELETE ON titles BEGIN'
+                    "  INSERT INTO titles_fts (titles_fts, rowid, title, original_title, overview)"
+                    "  VALUES ('delete', old.rowid, old.title, old.original_title, old.overview);"
+                    ' END;'
+                    'CREATE TRIGGER IF NOT EXISTS titles_au AFTER UPDATE ON titles BEGIN'
+                    "  INSERT INTO titles_fts (titles_fts, rowid, title, original_title, overview)"
+                    "  VALUES ('delete', old.rowid, old.title, old.original_title, old.overview);"
+                    '  INSERT INTO titles_fts (rowid, title, original_title, overview)'
+                    '  VALUES (new.rowid, new.title, new.original_title, new.overview);'
+                    ' END;'
+                )
+            except sqlite3.OperationalError:
+                self.has_fts = False
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                close(self._conn)
+                self._conn = None
+
+    def add_results(self, endpoint, results):
+        """
+        Upserts the movie and TV results of one TMDB response.
+        :param endpoint: TMDB endpoint the results came from (gives the media type)
+        :return: number of titles written
+        """
+        now = time.time()
+        rows = []
+        for result in results or ():
+            media = media_type_of(endpoint, result)
+            title = result.get('title') or result.get('name')
+            if media is None or not title or result.get('id') is None:
+                continue
+            data = {name: result[name] for name in STORED_FIELDS if result.get(name) is not None}
+            rows.append((media, result['id'], title, result.get('original_title') or result.get('original_name'),
+                         result.get('overview'), _year(result), json.dumps(data, separators=(',', ':')), now))
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                'INSERT INTO titles (media_type, tmdb_id, title, original_title, overview, year, data, updated)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT (media_type, tmdb_id) DO UPDATE SET'
+                '  title = excluded.title, original_title = excluded.original_title,'
+                '  overview = excluded.overview, year = excluded.year,'
+                '  data = excluded.data, updated = excluded.updated'
+                ' WHERE titles.data != excluded.data',
+                rows
+            )
+            conn.commit()
+        return len(rows)
+
+    def search(self, query, media_type=None, limit=50):
+        """
+        Finds indexed titles, best match first.
+        :param media_type: 'movie' or 'tv' to restrict the search
+        :return: list of (media type, stored TMDB result dict)
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        with self._lock:
+            conn = self._connect()
+            if self.has_fts:
+                sql = ('SELECT t.media_type, t.data FROM titles_fts'
+                       ' JOIN titles t ON t.rowid = titles_fts.rowid'
+                       ' WHERE titles_fts MATCH ?')
+                args = [expression]
+                if media_type:
+                    sql += ' AND t.media_type = ?'
+                    args.append(media_type)
+                sql += ' ORDER BY bm25(titles_fts, ?, ?, ?) LIMIT ?'
+                args.extend(RANK_WEIGHTS)
+            else:
+                sql = 'SELECT media_type, data FROM titles WHERE title LIKE ?'
+                args = ['%{0}%'.format(' '.join(_WORD.findall(query)))]
+                if media_type:
+                    sql += ' AND media_type = ?'
+                    args.append(media_type)
+                sql += ' ORDER BY title LIMIT ?'
+            args.append(limit)
+            rows = conn.execute(sql, args).fetchall()
+        return [(media, json.loads(data)) for media, data in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM titles').fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM titles')
+            conn.commit()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# Module: snapshot
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import marshal
+import threading
+import time
+import zlib
+from .database import close, connect
+from .memory import budget
+
+# --- Configuration ---
+# Bump this whenever the table layout or the encoding changes; older stores are rebuilt.
+SCHEMA_VERSION = 1
+# Seconds a rendered directory is replayed before it is built again
+DEFAULT_TTL = 30 * 60
+# Snapshots kept; the least recently used beyond this are dropped.
+DEFAULT_MAX_ENTRIES = 300
+# Item descriptor keys kept in a snapshot (see directory.py), in storage order
+ITEM_FIELDS = ('label', 'url', 'is_folder', 'playable', 'art', 'info', 'properties')
+# Smallest payload cap the memory budget may set (bytes, before compression)
+MIN_PAYLOAD = 64 * 1024
+
+
+def pack(items, options):
+    """
+    Packs item descriptors and render options into bytes: one tuple per
+    item in ITEM_FIELDS order, marshalled.
+    :raises ValueError: if a value is not a plain str, number, bool, None, list, tuple or dict
+    """
+    rows = [tuple(item.get(field) for field in ITEM_FIELDS) for item in items]
+    return marshal.dumps((rows, options), 4)
+
+
+def unpack(payload):
+    """:return: (item descriptors, render options) of a pack() payload"""
+    rows, options = marshal.loads(payload)
+    items = [{field: value for field, value in zip(ITEM_FIELDS, row) if value is not None} for row in rows]
+    return items, options
+
+
+def inflate(blob, max_payload=0):
+    """
+    Decompresses a stored snapshot.
+    :param max_payload: if set, a snapshot that inflates to more bytes is refused
+        before it is decompressed in full
+    :raises ValueError: for a refused snapshot
+    """
+    inflater = zlib.decompressobj()
+    payload = inflater.decompress(blob, max_payload)
+    if inflater.unconsumed_tail:
+        raise ValueError('snapshot larger than {0} bytes'.format(max_payload))
+    return payload
+
+
+class SnapshotCache:
+    """
+    Rendered directories, keyed by the plugin URL that produced them.
+
+    A snapshot holds the final item descriptors of a listing plus its
+    render options (content type, sort methods), so a repeat visit is
+    replayed into render_directory without requests, JSON parsing or the
+    code that built the items. Entries expire after their TTL. The whole
+    store is dropped when the fingerprint it was opened with changes, e.g.
+    because the settings or the interface language changed.
+
+    A snapshot is held in memory whole while it is stored or replayed. As
+    a memory budget consumer the cache reports the largest payload it has
+    handled, and a budget share caps the payload: bigger listings are
+    built as usual instead.
+    """
+
+    def __init__(self, path, fingerprint='', ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # 0: no cap
+        self.max_payload = 0
+        self._largest = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def memory_usage(self):
+        """Largest uncompressed snapshot handled so far, in bytes."""
+        return self._largest
+
+    def shrink(self, limit):
+        self.max_payload = max(MIN_PAYLOAD, limit)
+        self._largest = min(self._largest, self.max_payload)
+
+    def _connect(self):
+        if self._conn is None:
+            conn = connect(self.path, SCHEMA_VERSION, drop=('snapshots', 'meta'))
+            budget.register('snapshots', self)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS snapshots ('
+                ' url TEXT PRIMARY KEY,'
+                ' body BLOB NOT NULL,'
+                ' expires REAL NOT NULL,'
+                ' accessed REAL NOT NULL) WITHOUT ROWID'
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID')
+            row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row is None or row[0] != self.fingerprint:
+                # Rendered with other settings or in another language.
+                conn.execute('DELETE FROM snapshots')
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+                             (self.fingerprint,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                close(self._conn)
+                self._conn = None
+                budget.unregister(self)
+
+    def get(self, url):
+        """
+        :return: (item descriptors, render options) of a fresh snapshot, or None
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute('SELECT body, expires FROM snapshots WHERE url = ?', (url,)).fetchone()
+            if row is None or row[1] < now:
+                return None
+            conn.execute('UPDATE snapshots SET accessed = ? WHERE url = ?', (now, url))
+            conn.commit()
+        try:
+            payload = inflate(row[0], self.max_payload)
+            items, options = unpack(payload)
+        except (ValueError, EOFError, TypeError, zlib.error):
+            return None
+        self._largest = max(self._largest, len(payload))
+        return items, options
+
+    def put(self, url, items, options=None, ttl=None):
+        """
+        Stores the rendered directory of a URL.
+        :param options: keyword arguments render_directory was called with
+        :return: False if the items hold values that cannot be stored
+        """
+        try:
+            payload = pack(items, options or {})
+        except ValueError:
+            return False
+        if self.max_payload and len(payload) > self.max_payload:
+            return False
+        self._largest = max(self._largest, len(payload))
+        body = zlib.compress(payload, 6)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('INSERT OR REPLACE INTO snapshots (url, body, expires, accessed) VALUES (?, ?, ?, ?)',
+                         (url, body, now + (self.ttl if ttl is None else ttl), now))
+            conn.execute(
+                'DELETE FROM snapshots WHERE url NOT IN'
+                ' (SELECT url FROM snapshots ORDER BY accessed DESC LIMIT ?)', (self.max_entries,))
+            conn.commit()
+        return True
+
+    def invalidate(self, prefix=None):
+        """Drops every snapshot, or those whose URL starts with prefix."""
+        with self._lock:
+            conn = self._connect()
+            if prefix is None:
+                conn.execute('DELETE FROM snapshots')
+            else:
+                conn.execute('DELETE FROM snapshots WHERE substr(url, 1, ?) = ?', (len(prefix), prefix))
+            conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
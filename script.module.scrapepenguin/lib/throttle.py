@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Module: throttle
+# Author: Manus
+# Created: 2026-10-17
+# License: GPL-3.0-or-later
+
+import email.utils
+import threading
+import time
+
+# --- Configuration ---
+# Longest Retry-After (in seconds) we are willing to honour.
+MAX_RETRY_AFTER = 60.0
+
+
+def parse_retry_after(value, default=1.0):
+    """
+    Reads a Retry-After header (delay in seconds or an HTTP date).
+    :return: seconds to wait, capped at MAX_RETRY_AFTER
+    """
+    if not value:
+        return default
+    value = value.strip()
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return default
+    return min(max(delay, 0.0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` requests per second on average, with
+    bursts of up to `burst`. pause() stops everyone until a point in time,
+    which is how a server's Retry-After is shared between threads.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now <= self._updated:
+            # Paused: tokens only start accruing again when the pause ends.
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+        :return: seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                else:
+                    delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Holds back every caller for `seconds` and drops the saved-up burst."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._paused_until)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for a key is running,
+    other threads asking for the same key wait for it and get its result
+    (or its exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """
+        Runs function() once per key at a time.
+        :return: (result, shared) where shared is True for callers that waited
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False